@@ -37,15 +37,18 @@ def find_excel_file(paths: List[str]) -> Optional[str]:
     return None
 
 
+# Domain words written in upper case
+DOMAIN_ACRONYMS = {"nlp", "ai", "ml", "cv", "iot", "vlsi", "rfid", "hci"}
+
+
 def normalize_domain(s: str) -> str:
     s = " ".join(str(s or "").strip().split())
     if not s:
         return s
-    acronyms = {"nlp", "ai", "ml", "cv", "iot", "vlsi", "rfid", "hci"}
     lw = s.lower()
-    if lw in acronyms:
+    if lw in DOMAIN_ACRONYMS:
         return lw.upper()
-    return " ".join(w.upper() if w.lower() in acronyms else w.capitalize() for w in s.split())
+    return " ".join(w.upper() if w.lower() in DOMAIN_ACRONYMS else w.capitalize() for w in s.split())
 
 
 def load_excel_domains(excel_path: str) -> Dict[str, List[str]]:
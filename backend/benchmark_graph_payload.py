@@ -0,0 +1,89 @@
+"""
+Measure knowledge-graph payload size and JSON encode time per format.
+
+Usage:
+    python benchmark_graph_payload.py [--professors 5000] [--domains 5] [--repeat 5] [--from-db]
+"""
+
+import argparse
+import json
+import logging
+import random
+import time
+
+from field_classifier import SUBFIELD_TO_FIELD_MAP
+from knowledge_graph_builder import DynamicKnowledgeGraph
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+logger = logging.getLogger("benchmark_graph_payload")
+
+
+def synthetic_professors(count, domains_per_professor, seed=42):
+    """Professor rows shaped like the database output, with a realistic domain vocabulary"""
+    rng = random.Random(seed)
+    vocabulary = [keyword.title() for keyword in SUBFIELD_TO_FIELD_MAP] + [f"Topic {i}" for i in range(count // 10)]
+    professors = []
+    for i in range(count):
+        domains = rng.sample(vocabulary, domains_per_professor)
+        professors.append({
+            'id': i + 1,
+            'name': f"Professor {i + 1}",
+            'college': f"College {rng.randint(1, 40)}",
+            'email': f"prof{i + 1}@example.edu",
+            'phd_thesis': "Studies in " + " and ".join(domains[:2]),
+            'google_scholar_url': f"https://scholar.google.com/citations?user=u{i + 1}",
+            'profile_link': f"https://example.edu/faculty/{i + 1}",
+            'domain_expertise': " | ".join(domains),
+            'expertise_array': domains,
+            'citations_count': int(rng.paretovariate(1.2) * 50),
+            'h_index': rng.randint(0, 60),
+            'i10_index': rng.randint(0, 120),
+        })
+    return professors
+
+
+def measure(payload, repeat):
+    """Best-of-N encode time in milliseconds and encoded size in bytes"""
+    best = float('inf')
+    encoded = b''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encoded = json.dumps(payload).encode('utf-8')
+        best = min(best, time.perf_counter() - start)
+    return len(encoded), best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare knowledge-graph payload formats")
+    parser.add_argument('--professors', type=int, default=5000, help='Synthetic professor count')
+    parser.add_argument('--domains', type=int, default=5, help='Domains per synthetic professor')
+    parser.add_argument('--repeat', type=int, default=5, help='Encode repetitions (best is reported)')
+    parser.add_argument('--from-db', action='store_true', help='Use professors from the database instead')
+    args = parser.parse_args()
+
+    if args.from_db:
+        import database
+        professors = database.load_professors_data()
+    else:
+        professors = synthetic_professors(args.professors, args.domains)
+
+    graph = DynamicKnowledgeGraph()
+    start = time.perf_counter()
+    graph.update(professors, version=1)
+    logger.info(f"Built graph for {len(professors)} professors in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    payloads = {
+        'full': graph.graph,
+        'compact': graph.compact(),
+        'columnar': graph.compact(columnar=True),
+    }
+    baseline = None
+    print(f"{'format':<10}{'bytes':>14}{'ratio':>8}{'encode ms':>12}")
+    for name, payload in payloads.items():
+        size, elapsed = measure(payload, args.repeat)
+        baseline = baseline or size
+        print(f"{name:<10}{size:>14,}{size / baseline:>8.2f}{elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+Canonicalize domain names and merge near-duplicates.
+
+The domains table collects variants of the same research area ("Machine
+learning", "machine-learning", "ML", "Machine Learnings"). This script:
+- Groups names with the same key (case, punctuation and spacing removed)
+- Merges near-duplicates by character trigram Jaccard similarity. Candidate
+  pairs come from prefix-filtering blocking on rare trigrams, not all pairs
+- Merges acronyms ("ML", "IoT") into the one multi-word name they abbreviate
+- Records alias -> canonical links in the domain_aliases table
+- Optionally rewrites prof_domain links to the canonical domains in bulk
+
+Behavior:
+- Canonical names are the most linked name of each group; names are only
+  merged into a canonical name directly, never through a chain of aliases
+- Names with different numbers ("Industry 4.0" / "Industry 5.0") never merge
+- Idempotent: aliases recorded by earlier runs are reused
+- Prints BEFORE/AFTER counts for verification
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set
+
+from backfill_prof_domains import DOMAIN_ACRONYMS, normalize_domain
+
+logger = logging.getLogger("canonicalize_domains")
+
+# Minimum trigram Jaccard similarity of merged names
+DEFAULT_THRESHOLD = 0.8
+NGRAM_SIZE = 3
+
+# Words that acronyms may skip ("Internet of Things" -> "IT" or "IOT")
+ACRONYM_STOPWORDS = {"of", "and", "for", "in", "the", "on", "to", "with"}
+
+ALIAS_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS domain_aliases (
+        AliasKey VARCHAR(255) PRIMARY KEY,
+        AliasName VARCHAR(255) NOT NULL,
+        AliasDomainID INT NULL,
+        DomainID INT NOT NULL,
+        Similarity FLOAT,
+        MatchRule VARCHAR(16),
+        UpdatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        INDEX idx_alias_domain (AliasDomainID),
+        FOREIGN KEY (DomainID) REFERENCES domains(DomainID) ON DELETE CASCADE
+    )
+"""
+
+
+def domain_key(name: str) -> str:
+    """Comparison key: lower case ASCII words; '+' and '#' are kept for C++ / C#"""
+    text = unicodedata.normalize("NFKD", str(name or "")).encode("ascii", "ignore").decode("ascii").lower()
+    return " ".join(re.sub(r"[^a-z0-9+#]+", " ", text).split())
+
+
+def char_ngrams(key: str, n: int = NGRAM_SIZE) -> Set[str]:
+    padded = f" {key} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def is_acronym_name(name: str) -> bool:
+    """'ML', 'IoT', 'nlp': one short word written in capitals or a known acronym"""
+    words = str(name or "").split()
+    if len(words) != 1 or not words[0].isalpha() or not 2 <= len(words[0]) <= 6:
+        return False
+    word = words[0]
+    return word.lower() in DOMAIN_ACRONYMS or sum(c.isupper() for c in word) >= 2
+
+
+def acronyms_of(key: str) -> Set[str]:
+    """Acronyms a multi-word key can be abbreviated to, with and without stopwords"""
+    words = key.split()
+    if len(words) < 2:
+        return set()
+    content = [w for w in words if w not in ACRONYM_STOPWORDS]
+    result = {"".join(w[0] for w in words)}
+    if len(content) >= 2:
+        result.add("".join(w[0] for w in content))
+    return result
+
+
+def find_duplicates(domains: List[Dict], threshold: float = DEFAULT_THRESHOLD,
+                    known_aliases: Optional[Dict[str, int]] = None) -> List[Dict]:
+    """
+    Find domains that duplicate another domain.
+
+    Args:
+        domains: Dicts with 'id', 'name' and 'links' (number of prof_domain rows)
+        threshold: Minimum trigram Jaccard similarity for a fuzzy merge
+        known_aliases: Alias key -> canonical domain id recorded by earlier runs
+
+    Returns:
+        One merge per duplicate: {'alias_id', 'alias', 'canonical_id',
+        'canonical', 'similarity', 'rule'} with rule 'alias', 'exact',
+        'ngram' or 'acronym'
+    """
+    known_aliases = known_aliases or {}
+    by_id = {d["id"]: d for d in domains}
+    keys = {d["id"]: domain_key(d["name"]) for d in domains}
+
+    # Canonical candidates first: full names before acronyms, most linked, tidy spelling
+    order = sorted(
+        (d for d in domains if keys[d["id"]]),
+        key=lambda d: (is_acronym_name(d["name"]), -int(d.get("links") or 0),
+                       d["name"] != normalize_domain(d["name"]), d["name"].lower(), d["id"]),
+    )
+
+    grams = {d["id"]: char_ngrams(keys[d["id"]]) for d in order}
+    frequency: Dict[str, int] = {}
+    for gram_set in grams.values():
+        for gram in gram_set:
+            frequency[gram] = frequency.get(gram, 0) + 1
+
+    def prefix(domain_id) -> List[str]:
+        # Sets with Jaccard >= threshold share a gram among their rarest |x| - ceil(t|x|) + 1
+        ranked = sorted(grams[domain_id], key=lambda g: (frequency[g], g))
+        return ranked[:len(ranked) - math.ceil(threshold * len(ranked)) + 1]
+
+    leaders_by_key: Dict[str, int] = {}
+    leaders_by_gram: Dict[str, List[int]] = {}
+    leaders_by_acronym: Dict[str, Set[int]] = {}
+    merges = []
+
+    def merge(domain, leader_id, similarity, rule):
+        leader = by_id[leader_id]
+        merges.append({
+            "alias_id": domain["id"],
+            "alias": domain["name"],
+            "canonical_id": leader_id,
+            "canonical": leader["name"],
+            "similarity": round(similarity, 4),
+            "rule": rule,
+        })
+
+    for domain in order:
+        domain_id, key = domain["id"], keys[domain["id"]]
+
+        recorded = known_aliases.get(key)
+        if recorded is not None and recorded != domain_id and recorded in by_id:
+            merge(domain, recorded, 1.0, "alias")
+            continue
+
+        leader_id = leaders_by_key.get(key)
+        if leader_id is not None:
+            merge(domain, leader_id, 1.0, "exact")
+            continue
+
+        if is_acronym_name(domain["name"]):
+            # Only an unambiguous expansion: "CV" stays when two names abbreviate to it
+            expansions = leaders_by_acronym.get(key, set())
+            if len(expansions) == 1:
+                merge(domain, next(iter(expansions)), 1.0, "acronym")
+                continue
+
+        best_id, best_similarity = None, 0.0
+        digits = re.findall(r"\d+", key)
+        candidates = {c for gram in prefix(domain_id) for c in leaders_by_gram.get(gram, ())}
+        for candidate in candidates:
+            if re.findall(r"\d+", keys[candidate]) != digits:
+                continue
+            similarity = jaccard(grams[domain_id], grams[candidate])
+            if similarity > best_similarity:
+                best_id, best_similarity = candidate, similarity
+        if best_id is not None and best_similarity >= threshold:
+            merge(domain, best_id, best_similarity, "ngram")
+            continue
+
+        # A new canonical name
+        leaders_by_key[key] = domain_id
+        for gram in prefix(domain_id):
+            leaders_by_gram.setdefault(gram, []).append(domain_id)
+        for acronym in acronyms_of(key):
+            leaders_by_acronym.setdefault(acronym, set()).add(domain_id)
+
+    return merges
+
+
+def ensure_alias_table(cursor) -> None:
+    cursor.execute(ALIAS_TABLE_DDL)
+
+
+def load_domains(cursor) -> List[Dict]:
+    cursor.execute(
+        """
+        SELECT d.DomainID, d.DomainName, COUNT(pd.ProfID)
+        FROM domains d
+        LEFT JOIN prof_domain pd ON pd.DomainId = d.DomainID
+        GROUP BY d.DomainID, d.DomainName
+        """
+    )
+    return [{"id": int(r[0]), "name": r[1] or "", "links": int(r[2] or 0)} for r in cursor.fetchall()]
+
+
+def load_aliases(cursor) -> Dict[str, int]:
+    cursor.execute("SELECT AliasKey, DomainID FROM domain_aliases")
+    return {r[0]: int(r[1]) for r in cursor.fetchall()}
+
+
+def store_aliases(cursor, merges: Iterable[Dict]) -> int:
+    rows = [
+        (domain_key(m["alias"]), m["alias"], m["alias_id"], m["canonical_id"], m["similarity"], m["rule"])
+        for m in merges
+    ]
+    if not rows:
+        return 0
+    cursor.executemany(
+        """
+        INSERT INTO domain_aliases (AliasKey, AliasName, AliasDomainID, DomainID, Similarity, MatchRule)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE AliasName=VALUES(AliasName), AliasDomainID=VALUES(AliasDomainID),
+            DomainID=VALUES(DomainID), Similarity=VALUES(Similarity), MatchRule=VALUES(MatchRule)
+        """,
+        rows,
+    )
+    # Aliases recorded against a domain that is now an alias itself point at its canonical domain
+    cursor.execute(
+        """
+        UPDATE domain_aliases a
+        JOIN domain_aliases b ON a.DomainID = b.AliasDomainID
+        SET a.DomainID = b.DomainID
+        WHERE b.DomainID <> b.AliasDomainID
+        """
+    )
+    return len(rows)
+
+
+def rewrite_links(cursor) -> int:
+    """Move prof_domain links from alias domains to their canonical domains; returns links moved"""
+    cursor.execute(
+        """
+        INSERT INTO prof_domain (ProfID, DomainId)
+        SELECT DISTINCT pd.ProfID, a.DomainID
+        FROM prof_domain pd
+        JOIN domain_aliases a ON pd.DomainId = a.AliasDomainID
+        WHERE a.DomainID <> a.AliasDomainID
+          AND NOT EXISTS (
+              SELECT 1 FROM prof_domain x WHERE x.ProfID = pd.ProfID AND x.DomainId = a.DomainID
+          )
+        """
+    )
+    cursor.execute(
+        """
+        DELETE pd FROM prof_domain pd
+        JOIN domain_aliases a ON pd.DomainId = a.AliasDomainID
+        WHERE a.DomainID <> a.AliasDomainID
+        """
+    )
+    return int(cursor.rowcount or 0)
+
+
+def delete_merged_domains(cursor) -> int:
+    """Delete alias domain rows left without links; the alias names stay in domain_aliases"""
+    cursor.execute(
+        """
+        DELETE d FROM domains d
+        JOIN domain_aliases a ON d.DomainID = a.AliasDomainID
+        LEFT JOIN prof_domain pd ON pd.DomainId = d.DomainID
+        WHERE a.DomainID <> a.AliasDomainID AND pd.ProfID IS NULL
+        """
+    )
+    deleted = int(cursor.rowcount or 0)
+    cursor.execute("UPDATE domain_aliases a LEFT JOIN domains d ON d.DomainID = a.AliasDomainID "
+                   "SET a.AliasDomainID = NULL WHERE d.DomainID IS NULL")
+    return deleted
+
+
+def count_linked_domains(cursor) -> int:
+    cursor.execute("SELECT COUNT(DISTINCT DomainId) FROM prof_domain")
+    return int(cursor.fetchone()[0])
+
+
+def main():
+    from database import get_connection, close_connection
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    parser = argparse.ArgumentParser(description="Merge near-duplicate domain names into canonical domains")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Minimum trigram Jaccard similarity for fuzzy merges (default {DEFAULT_THRESHOLD})")
+    parser.add_argument("--rewrite-links", action="store_true", help="Move prof_domain links to canonical domains")
+    parser.add_argument("--delete-merged", action="store_true",
+                        help="Delete alias domain rows left without links (implies --rewrite-links)")
+    parser.add_argument("--show", type=int, default=20, help="Number of merges to log")
+    parser.add_argument("--dry-run", action="store_true", help="Do not commit DB changes")
+    args = parser.parse_args()
+
+    conn = None
+    cur = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        ensure_alias_table(cur)
+
+        domains = load_domains(cur)
+        logger.info(f"Domains BEFORE: {len(domains)} ({count_linked_domains(cur)} linked)")
+
+        merges = find_duplicates(domains, args.threshold, load_aliases(cur))
+        by_rule: Dict[str, int] = {}
+        for m in merges:
+            by_rule[m["rule"]] = by_rule.get(m["rule"], 0) + 1
+        logger.info(f"Duplicates found: {len(merges)} {by_rule}")
+        for m in merges[:args.show]:
+            logger.info(f"  {m['alias']!r} -> {m['canonical']!r} ({m['rule']}, {m['similarity']})")
+
+        logger.info(f"Aliases recorded: {store_aliases(cur, merges)}")
+        if args.rewrite_links or args.delete_merged:
+            logger.info(f"Links moved to canonical domains: {rewrite_links(cur)}")
+        if args.delete_merged:
+            logger.info(f"Merged domains deleted: {delete_merged_domains(cur)}")
+
+        if args.dry_run:
+            logger.info("Dry-run mode: rolling back changes")
+            conn.rollback()
+        else:
+            conn.commit()
+
+        logger.info(f"Domains AFTER: {len(load_domains(cur))} ({count_linked_domains(cur)} linked)")
+
+    finally:
+        close_connection(conn, cur)
+
+
+if __name__ == "__main__":
+    main()
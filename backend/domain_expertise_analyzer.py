@@ -1,120 +1,316 @@
 from typing import List, Dict, Optional
-import sqlite3
-from collections import Counter
+
+import numpy as np
+
+from field_classifier import classify_domain
+from professor_index import ProfessorIndex, bits_to_mask, normalize_key
+
+# Minimum expertise score for each expertise level
+EXPERTISE_LEVELS = {
+    "Expert": 0.8,
+    "Advanced": 0.6,
+    "Intermediate": 0.3,
+    "Basic": 0.0
+}
+
+LEVEL_NAMES = list(EXPERTISE_LEVELS)
+
+# Weights of the citation and h-index percentiles in the expertise score
+CITATION_WEIGHT = 0.6
+H_INDEX_WEIGHT = 0.4
+
+# Domains with fewer professors are ranked within their research field instead
+MIN_DOMAIN_GROUP_SIZE = 5
+
+
+def group_percentiles(groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Percentile rank of every value within its group, in one vectorized pass.
+
+    The percentile is the fraction of the group with a value lower than or
+    equal to the value itself, so the best member of a field gets 1.0.
+    Zero values (no data) always get 0.0.
+    """
+    if not len(values):
+        return np.zeros(0)
+
+    order = np.lexsort((values, groups))
+    g = groups[order]
+    v = values[order]
+    positions = np.arange(len(v))
+
+    # First position of each group and last position of each run of equal values
+    group_starts = np.maximum.accumulate(np.where(np.r_[True, g[1:] != g[:-1]], positions, 0))
+    run_last = np.r_[(g[1:] != g[:-1]) | (v[1:] != v[:-1]), True]
+    run_ends = np.minimum.accumulate(np.where(run_last, positions, len(v))[::-1])[::-1]
+    sizes = np.bincount(g)[g]
+
+    sorted_percentiles = (run_ends - group_starts + 1) / sizes
+    sorted_percentiles[v <= 0] = 0.0
+
+    percentiles = np.empty(len(values))
+    percentiles[order] = sorted_percentiles
+    return percentiles
+
 
 class DomainExpertiseAnalyzer:
-    def __init__(self, db_path: str = "professors.db"):
-        self.db_path = db_path
-        
-    def _get_connection(self) -> sqlite3.Connection:
-        """Create a database connection"""
-        return sqlite3.connect(self.db_path)
-
-    def calculate_expertise_score(self, citations: int, h_index: int) -> float:
-        """Calculate expertise score based on citations and h-index"""
-        if not citations and not h_index:
-            return 0.0
-            
-        # Normalize citation count (assuming max realistic citations is 100000)
-        citation_score = min(citations, 100000) / 100000 * 0.6
-        
-        # Normalize h-index (assuming max realistic h-index is 100)
-        h_index_score = min(h_index, 100) / 100 * 0.4
-        
-        return round(citation_score + h_index_score, 2)
+    """
+    Expertise scoring engine over the in-memory professor index.
+
+    Every (professor, domain) pair is scored in a single vectorized pass from
+    the professor's citation and h-index percentiles *within that domain*, or
+    within the domain's research field when the domain has fewer than
+    MIN_DOMAIN_GROUP_SIZE professors, so scores are relative to the field
+    instead of fixed global caps and a niche domain is no free "Expert". Results are
+    computed lazily and stay valid for the index snapshot (data version) the
+    analyzer was created with.
+    """
+
+    def __init__(self, index: Optional[ProfessorIndex] = None):
+        self.index = index if index is not None else ProfessorIndex([])
+        self._pairs = None
+        self._statistics = None
+        self._professor_scores = None
+        self._boards: Dict[tuple, tuple] = {}
+
+    @property
+    def version(self) -> int:
+        return self.index.version
+
+    @property
+    def has_metrics(self) -> bool:
+        """Whether any professor has citation or h-index data; without it every score is 0"""
+        columns = self.index.columns
+        return bool(columns['citations'].any() or columns['h_index'].any())
+
+    def calculate_expertise_score(self, citation_percentile: float, h_index_percentile: float) -> float:
+        """Calculate expertise score from field-relative citation and h-index percentiles"""
+        return round(CITATION_WEIGHT * citation_percentile + H_INDEX_WEIGHT * h_index_percentile, 2)
 
     def get_expertise_level(self, score: float) -> str:
         """Convert score to expertise level"""
-        if score >= 0.8:
-            return "Expert"
-        elif score >= 0.6:
-            return "Advanced"
-        elif score >= 0.3:
-            return "Intermediate"
-        else:
-            return "Basic"
+        for level, threshold in EXPERTISE_LEVELS.items():
+            if score >= threshold:
+                return level
+        return "Basic"
+
+    def _score_pairs(self) -> Dict:
+        """Score every (professor, domain) pair of the index at once"""
+        if self._pairs is not None:
+            return self._pairs
+
+        index = self.index
+        domain_keys = list(index.bitmaps['domain'])
+        domain_ids = {key: i for i, key in enumerate(domain_keys)}
+
+        pair_professors = []
+        pair_domains = []
+        for ordinal, domains in enumerate(index.domains):
+            for domain in domains:
+                pair_professors.append(ordinal)
+                pair_domains.append(domain_ids[normalize_key(domain)])
+
+        professors = np.array(pair_professors, dtype=np.int64)
+        domains = np.array(pair_domains, dtype=np.int64)
+        # Research field of every domain, as an index into field_keys
+        field_keys = []
+        field_ids = {}
+        domain_fields = []
+        for key in domain_keys:
+            field_key = normalize_key(classify_domain(index.labels['domain'][key]))
+            if field_key not in field_ids:
+                field_ids[field_key] = len(field_keys)
+                field_keys.append(field_key)
+            domain_fields.append(field_ids[field_key])
+        fields = np.array(domain_fields, dtype=np.int64)[domains]
+        citations = index.columns['citations'][professors]
+        h_index = index.columns['h_index'][professors]
+
+        # Field ranks count each professor once per field, however many of its domains are in it
+        field_pairs, field_of_pair = np.unique(professors * max(len(field_keys), 1) + fields, return_inverse=True)
+        field_professors = field_pairs // max(len(field_keys), 1)
+        field_groups = field_pairs % max(len(field_keys), 1)
+        small = np.bincount(domains, minlength=len(domain_keys))[domains] < MIN_DOMAIN_GROUP_SIZE
+
+        def percentiles(column):
+            by_domain = group_percentiles(domains, index.columns[column][professors])
+            by_field = group_percentiles(field_groups, index.columns[column][field_professors])[field_of_pair]
+            return np.where(small, by_field, by_domain)
+
+        citation_percentiles = percentiles('citations')
+        h_index_percentiles = percentiles('h_index')
+        scores = np.round(CITATION_WEIGHT * citation_percentiles + H_INDEX_WEIGHT * h_index_percentiles, 2)
+
+        # Level code per pair: 0 = Expert ... 3 = Basic
+        thresholds = np.array(list(EXPERTISE_LEVELS.values()))
+        levels = np.argmax(scores[:, None] >= thresholds[None, :], axis=1)
+
+        self._pairs = {
+            'domain_keys': domain_keys,
+            'field_keys': field_keys,
+            'professors': professors,
+            'domains': domains,
+            'fields': fields,
+            'citations': citations,
+            'h_index': h_index,
+            'citation_percentiles': citation_percentiles,
+            'h_index_percentiles': h_index_percentiles,
+            'scores': scores,
+            'levels': levels,
+        }
+        return self._pairs
+
+    def _matching_pairs(self, value: str, facet: str = 'domain') -> np.ndarray:
+        """Boolean mask over pairs whose domain (or its research field) contains ``value`` as whole words"""
+        pairs = self._score_pairs()
+        keys = pairs['field_keys'] if facet == 'field' else pairs['domain_keys']
+        ids = {key: i for i, key in enumerate(keys)}
+        matched = [ids[key] for key in self.index.matching_keys(facet, value) if key in ids]
+        return np.isin(pairs['fields' if facet == 'field' else 'domains'], matched)
+
+    def _best_pairs(self, mask: np.ndarray) -> np.ndarray:
+        """
+        The best-scoring pair of every professor among ``mask``, ordered by
+        descending score (ties by ordinal)
+        """
+        pairs = self._score_pairs()
+        selected = np.flatnonzero(mask)
+        order = selected[np.lexsort((pairs['professors'][selected], -pairs['scores'][selected]))]
+        _, first = np.unique(pairs['professors'][order], return_index=True)
+        return order[np.sort(first)]
+
+    @property
+    def professor_scores(self) -> np.ndarray:
+        """Best field-relative score of every professor over all their domains"""
+        if self._professor_scores is None:
+            pairs = self._score_pairs()
+            scores = np.zeros(self.index.size)
+            np.maximum.at(scores, pairs['professors'], pairs['scores'])
+            self._professor_scores = scores
+        return self._professor_scores
+
+    def leaderboard(self, facet: str, value: str, within: Optional[int] = None) -> tuple:
+        """
+        Professors matching a facet value as ``(ordinals, scores)``, sorted by
+        descending field-relative score.
+
+        Domain and field boards rank each professor by their best score among
+        the matching domains; college boards by their best score overall.
+        Boards are memoized for this data version. ``within`` optionally
+        restricts the board to a bitmap (e.g. a college).
+        """
+        key = (facet, normalize_key(value))
+        board = self._boards.get(key)
+        if board is None:
+            if facet == 'college':
+                ordinals = np.flatnonzero(bits_to_mask(self.index.match_bitmap(facet, value), self.index.size))
+                scores = self.professor_scores[ordinals]
+                order = np.lexsort((ordinals, -scores))
+                board = (ordinals[order], scores[order])
+            else:
+                pairs = self._score_pairs()
+                best = self._best_pairs(self._matching_pairs(value, facet))
+                board = (pairs['professors'][best], pairs['scores'][best])
+            self._boards[key] = board
+
+        if within is not None:
+            ordinals, scores = board
+            keep = bits_to_mask(within, self.index.size)[ordinals]
+            board = (ordinals[keep], scores[keep])
+        return board
+
+    @staticmethod
+    def count_at_least(board: tuple, min_score: float) -> int:
+        """Length of the board prefix with a score of at least ``min_score``"""
+        return int(np.searchsorted(-board[1], -min_score, side='right'))
 
     def search_domain_experts(self, domain: str, min_expertise_level: str = "Advanced") -> List[Dict]:
         """
         Search for professors with high expertise in a specific domain
-        
+
         Args:
             domain: The domain/field to search for
             min_expertise_level: Minimum expertise level (Expert, Advanced, Intermediate, Basic)
-            
+
         Returns:
             List of professors with their expertise details
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Search with case-insensitive domain matching in research interests and publications
-        query = """
-        SELECT DISTINCT 
-            p.id,
-            p.name,
-            p.email,
-            p.research_interests,
-            p.citations,
-            p.h_index,
-            p.google_scholar_url
-        FROM professors p
-        WHERE 
-            LOWER(p.research_interests) LIKE LOWER(?) OR
-            EXISTS (
-                SELECT 1 
-                FROM publications pub 
-                WHERE pub.professor_id = p.id 
-                AND LOWER(pub.title) LIKE LOWER(?)
-            )
-        """
-        
-        search_term = f"%{domain}%"
-        cursor.execute(query, (search_term, search_term))
-        professors = cursor.fetchall()
-        
-        # Calculate expertise scores and filter by minimum level
-        expertise_levels = {
-            "Expert": 0.8,
-            "Advanced": 0.6,
-            "Intermediate": 0.3,
-            "Basic": 0.0
-        }
-        min_score = expertise_levels.get(min_expertise_level, 0.0)
-        
+        pairs = self._score_pairs()
+        # A professor matching several domains keeps their best field-relative score
+        selected = self._best_pairs(self._matching_pairs(domain))
+        min_score = EXPERTISE_LEVELS.get(min_expertise_level, 0.0)
+        selected = selected[pairs['scores'][selected] >= min_score]
+
         results = []
-        for prof in professors:
-            score = self.calculate_expertise_score(prof[4] or 0, prof[5] or 0)
-            level = self.get_expertise_level(score)
-            
-            if score >= min_score:
-                results.append({
-                    "id": prof[0],
-                    "name": prof[1],
-                    "email": prof[2],
-                    "research_interests": prof[3],
-                    "citations": prof[4],
-                    "h_index": prof[5],
-                    "google_scholar_url": prof[6],
-                    "expertise_score": score,
-                    "expertise_level": level
-                })
-        
-        # Sort by expertise score in descending order
-        results.sort(key=lambda x: x["expertise_score"], reverse=True)
-        conn.close()
+        for pair in selected.tolist():
+            professor = self.index.professors[pairs['professors'][pair]]
+            score = float(pairs['scores'][pair])
+            results.append({
+                "id": professor.get('id'),
+                "name": professor.get('name'),
+                "email": professor.get('email'),
+                "college": professor.get('college'),
+                "research_interests": professor.get('domain_expertise'),
+                "matched_domain": self.index.labels['domain'][pairs['domain_keys'][pairs['domains'][pair]]],
+                "citations": int(pairs['citations'][pair]),
+                "h_index": int(pairs['h_index'][pair]),
+                "google_scholar_url": professor.get('google_scholar_url'),
+                "citation_percentile": round(float(pairs['citation_percentiles'][pair]), 4),
+                "h_index_percentile": round(float(pairs['h_index_percentiles'][pair]), 4),
+                "expertise_score": score,
+                "expertise_level": self.get_expertise_level(score)
+            })
         return results
 
+    def get_all_domain_statistics(self) -> Dict[str, Dict]:
+        """
+        Expertise statistics for every domain, computed with one group-by pass
+        over all (professor, domain) pairs and cached for this data version.
+        """
+        if self._statistics is not None:
+            return self._statistics
+
+        pairs = self._score_pairs()
+        domain_count = len(pairs['domain_keys'])
+        domains = pairs['domains']
+
+        counts = np.bincount(domains, minlength=domain_count)
+        citation_sums = np.bincount(domains, weights=pairs['citations'], minlength=domain_count)
+        h_index_sums = np.bincount(domains, weights=pairs['h_index'], minlength=domain_count)
+        level_counts = np.bincount(
+            domains * len(LEVEL_NAMES) + pairs['levels'], minlength=domain_count * len(LEVEL_NAMES)
+        ).reshape(domain_count, len(LEVEL_NAMES))
+
+        statistics = {}
+        for i, key in enumerate(pairs['domain_keys']):
+            total = int(counts[i])
+            statistics[self.index.labels['domain'][key]] = {
+                "total_experts": total,
+                "expertise_distribution": {
+                    level: int(level_counts[i, j]) for j, level in enumerate(LEVEL_NAMES) if level_counts[i, j]
+                },
+                "average_citations": round(float(citation_sums[i]) / total, 2) if total else 0,
+                "average_h_index": round(float(h_index_sums[i]) / total, 2) if total else 0
+            }
+        self._statistics = statistics
+        return statistics
+
     def get_domain_statistics(self, domain: str) -> Dict:
         """
         Get statistics about expertise levels in a specific domain
-        
+
         Args:
             domain: The domain/field to analyze
-            
+
         Returns:
             Dictionary with expertise level distribution and other statistics
         """
+        key = normalize_key(domain)
+        # The precomputed per-domain statistics only cover a phrase matching that single domain
+        if self.index.matching_keys('domain', domain) == [key]:
+            return self.get_all_domain_statistics()[self.index.labels['domain'][key]]
+
+        # Phrases spanning several domains are aggregated from the search results
         experts = self.search_domain_experts(domain, "Basic")  # Get all levels
         if not experts:
             return {
@@ -123,14 +319,16 @@ class DomainExpertiseAnalyzer:
                 "average_citations": 0,
                 "average_h_index": 0
             }
-            
-        expertise_counts = Counter(expert["expertise_level"] for expert in experts)
-        total_citations = sum(expert["citations"] or 0 for expert in experts)
-        total_h_index = sum(expert["h_index"] or 0 for expert in experts)
-        
+
+        distribution = {}
+        for expert in experts:
+            distribution[expert["expertise_level"]] = distribution.get(expert["expertise_level"], 0) + 1
+        total_citations = sum(expert["citations"] for expert in experts)
+        total_h_index = sum(expert["h_index"] for expert in experts)
+
         return {
             "total_experts": len(experts),
-            "expertise_distribution": dict(expertise_counts),
+            "expertise_distribution": distribution,
             "average_citations": round(total_citations / len(experts), 2),
             "average_h_index": round(total_h_index / len(experts), 2)
         }
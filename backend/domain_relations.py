@@ -0,0 +1,181 @@
+"""
+Domain co-occurrence relationships for the knowledge graph.
+
+Professors x domains form a sparse 0/1 incidence matrix A. The co-occurrence
+counts of every domain pair are the off-diagonal entries of A^T A, computed
+here by expanding each professor's domain list into its pairs (COO) and
+summing duplicate pair codes, so the cost is proportional to the number of
+co-occurring pairs rather than to D^2. Pairs are scored with normalized PMI
+or Jaccard and the strongest ones become RELATED_TO edges.
+"""
+
+import hashlib
+import threading
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+import numpy as np
+
+METRICS = ('pmi', 'jaccard')
+DEFAULT_METRIC = 'pmi'
+# Pairs seen for fewer professors than this are too noisy to link
+DEFAULT_MIN_COUNT = 2
+# Strongest related domains kept for each domain
+DEFAULT_PER_DOMAIN = 3
+DEFAULT_MAX_EDGES = 500
+
+
+def incidence_matrix(memberships: Sequence[Sequence[Hashable]]) -> Tuple[np.ndarray, np.ndarray, List[Hashable]]:
+    """
+    Build the professor x domain incidence matrix in COO form.
+
+    Args:
+        memberships: For every professor, the domain keys they belong to
+
+    Returns:
+        (rows, cols, keys) with one entry per distinct (professor, domain) and
+        ``keys[col]`` the domain key of each column
+    """
+    column_of: Dict[Hashable, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    for row, domains in enumerate(memberships):
+        for column in sorted({column_of.setdefault(domain, len(column_of)) for domain in domains}):
+            rows.append(row)
+            cols.append(column)
+    return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), list(column_of)
+
+
+def cooccurrence_counts(rows: np.ndarray, cols: np.ndarray, domain_count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Upper-triangular part of A^T A for an incidence matrix sorted by row.
+
+    Every entry is paired with the entries after it in the same row, which
+    enumerates each professor's domain pairs once; equal pair codes are then
+    summed.
+
+    Returns:
+        (left, right, counts) with left < right
+    """
+    if not len(rows):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+
+    positions = np.arange(len(rows))
+    row_ends = np.searchsorted(rows, rows, side='right')
+    lengths = row_ends - positions - 1
+    total = int(lengths.sum())
+    if not total:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+
+    # Partner of the n-th pair of entry p is entry p + 1 + n
+    starts = np.cumsum(lengths) - lengths
+    partners = np.repeat(positions + 1 - starts, lengths) + np.arange(total)
+    first = np.repeat(cols, lengths)
+    second = cols[partners]
+
+    left = np.minimum(first, second)
+    right = np.maximum(first, second)
+    codes, counts = np.unique(left * domain_count + right, return_counts=True)
+    return codes // domain_count, codes % domain_count, counts
+
+
+def score_pairs(left: np.ndarray, right: np.ndarray, counts: np.ndarray, frequencies: np.ndarray,
+                total: int, metric: str = DEFAULT_METRIC) -> np.ndarray:
+    """
+    Association score of every co-occurring pair.
+
+    'pmi' is normalized PMI, log(p(a,b) / p(a)p(b)) / -log p(a,b), in [-1, 1];
+    'jaccard' is |a & b| / |a | b|, in [0, 1].
+    """
+    counts = counts.astype(np.float64)
+    if metric == 'jaccard':
+        return counts / (frequencies[left] + frequencies[right] - counts)
+    if metric != 'pmi':
+        raise ValueError(f"Unknown metric: {metric}")
+
+    joint = counts / total
+    pmi = np.log(joint / ((frequencies[left] / total) * (frequencies[right] / total)))
+    denominator = -np.log(joint)
+    # Pairs present for every professor are perfectly associated
+    return np.where(denominator > 0, pmi / np.where(denominator > 0, denominator, 1.0), 1.0)
+
+
+def related_domains(memberships: Sequence[Sequence[Hashable]], metric: str = DEFAULT_METRIC,
+                    min_count: int = DEFAULT_MIN_COUNT, per_domain: int = DEFAULT_PER_DOMAIN,
+                    max_edges: int = DEFAULT_MAX_EDGES) -> List[Dict]:
+    """
+    Strongest co-occurrence relationships between domains.
+
+    An edge is kept when it is among the ``per_domain`` best-scoring pairs of
+    either endpoint; the result is capped at ``max_edges``, best first.
+
+    Returns:
+        List of {'source', 'target', 'score', 'count'} dicts keyed by domain key
+    """
+    rows, cols, keys = incidence_matrix(memberships)
+    left, right, counts = cooccurrence_counts(rows, cols, len(keys))
+
+    keep = counts >= max(min_count, 1)
+    left, right, counts = left[keep], right[keep], counts[keep]
+    if not len(counts):
+        return []
+
+    frequencies = np.bincount(cols, minlength=len(keys)).astype(np.float64)
+    scores = score_pairs(left, right, counts, frequencies, len(memberships), metric)
+
+    # Only positively associated pairs are related
+    associated = np.isfinite(scores) & (scores > 0)
+    left, right, counts, scores = left[associated], right[associated], counts[associated], scores[associated]
+    if not len(scores):
+        return []
+
+    # Rank each pair within both of its endpoints (best score, then most shared professors)
+    endpoints = np.concatenate([left, right])
+    pair_ids = np.concatenate([np.arange(len(scores))] * 2)
+    order = np.lexsort((-np.concatenate([counts] * 2), -np.concatenate([scores] * 2), endpoints))
+    sorted_endpoints = endpoints[order]
+    group_starts = np.searchsorted(sorted_endpoints, sorted_endpoints, side='left')
+    ranks = np.arange(len(order)) - group_starts
+    selected = np.unique(pair_ids[order][ranks < per_domain])
+
+    selected = selected[np.lexsort((-counts[selected], -scores[selected]))][:max_edges]
+    return [
+        {
+            'source': keys[left[pair]],
+            'target': keys[right[pair]],
+            'score': round(float(scores[pair]), 4),
+            'count': int(counts[pair]),
+        }
+        for pair in selected.tolist()
+    ]
+
+
+_cache = {'key': None, 'edges': None}
+_cache_lock = threading.Lock()
+
+
+def memberships_signature(memberships: Sequence[Sequence[Hashable]]) -> str:
+    """Content hash of a membership list, so the cache never serves edges of other data"""
+    digest = hashlib.sha1()
+    for domains in memberships:
+        digest.update(repr(list(domains)).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def get_related_domains(memberships: Sequence[Sequence[Hashable]], version=None, **options) -> List[Dict]:
+    """
+    Related-domain edges cached per data version and membership content.
+    Without a version the edges are always recomputed.
+    """
+    if version is None:
+        return related_domains(memberships, **options)
+
+    key = (version, memberships_signature(memberships), tuple(sorted(options.items())))
+    with _cache_lock:
+        if _cache['key'] == key:
+            return _cache['edges']
+        edges = related_domains(memberships, **options)
+        _cache.update({'key': key, 'edges': edges})
+        return edges
@@ -0,0 +1,277 @@
+"""
+Boolean expertise query language.
+Queries such as ``(computer vision OR image processing) AND college:"X" AND NOT blockchain``
+are parsed once into a small expression tree and evaluated against the bitmaps
+of a ProfessorIndex, so AND/OR/NOT become bitwise operations on Python ints.
+
+Operators are upper-case AND, OR and NOT; lower-case words are part of a phrase.
+
+Supported predicates:
+    - bare words or "quoted phrases": professors with a matching domain
+    - domain:"..."                  : same as a bare phrase
+    - college:"..."                 : professors from a matching college
+    - field:"..."                   : professors with a domain in a matching research field
+    - has_scholar:true|false        : has a Google or Semantic Scholar profile
+    - citations>=N, h_index>N, i10_index<=N (also written citations:>=N)
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from professor_index import ProfessorIndex, iter_bits, popcount
+
+# Metric aliases accepted in comparisons, mapped to ProfessorIndex columns
+METRIC_FIELDS = {
+    'citations': 'citations',
+    'citations_count': 'citations',
+    'h_index': 'h_index',
+    'hindex': 'h_index',
+    'i10_index': 'i10_index',
+    'i10': 'i10_index',
+}
+
+BOOLEAN_FIELDS = {
+    'has_scholar': ('has_gs', 'has_ss'),
+    'has_google_scholar': ('has_gs',),
+    'has_semantic_scholar': ('has_ss',),
+}
+
+TEXT_FIELDS = ('domain', 'college', 'field')
+
+KEYWORDS = {'AND', 'OR', 'NOT'}
+
+_TOKEN_PATTERN = re.compile(r'''
+    \s*(?:
+        (?P<lparen>\()
+      | (?P<rparen>\))
+      | (?P<compare>(?P<metric>[A-Za-z_][A-Za-z0-9_]*)\s*:?\s*(?P<op>>=|<=|>|<|=)\s*(?P<number>\d+))
+      | (?P<field>(?P<name>[A-Za-z_][A-Za-z0-9_]*):(?:"(?P<fquoted>[^"]*)"|(?P<fword>[^\s()"]+)))
+      | "(?P<quoted>[^"]*)"
+      | (?P<word>[^\s()"]+)
+    )''', re.VERBOSE)
+
+
+class QuerySyntaxError(ValueError):
+    """Raised when an expertise query cannot be parsed"""
+
+
+def _tokenize(query: str) -> List[Tuple]:
+    tokens = []
+    position = 0
+    query = query.rstrip()
+    while position < len(query):
+        match = _TOKEN_PATTERN.match(query, position)
+        if not match or match.end() == position:
+            raise QuerySyntaxError(f"Unexpected character at position {position}: {query[position:position + 10]!r}")
+        position = match.end()
+
+        if match.group('lparen'):
+            tokens.append(('(',))
+        elif match.group('rparen'):
+            tokens.append((')',))
+        elif match.group('compare'):
+            metric = match.group('metric').lower()
+            if metric not in METRIC_FIELDS:
+                raise QuerySyntaxError(f"Unknown metric: {metric}")
+            tokens.append(('compare', METRIC_FIELDS[metric], match.group('op'), int(match.group('number'))))
+        elif match.group('field'):
+            name = match.group('name').lower()
+            value = match.group('fquoted') if match.group('fquoted') is not None else match.group('fword')
+            if name in BOOLEAN_FIELDS:
+                if value.lower() not in ('true', 'false', 'yes', 'no', '1', '0'):
+                    raise QuerySyntaxError(f"Expected true or false for {name}, got {value!r}")
+                tokens.append(('flag', name, value.lower() in ('true', 'yes', '1')))
+            elif name in TEXT_FIELDS:
+                tokens.append(('term', name, value))
+            else:
+                # Not a known field (e.g. "web3:0"), treat it as a plain word
+                tokens.append(('word', match.group('field')))
+        elif match.group('quoted') is not None:
+            tokens.append(('term', 'domain', match.group('quoted')))
+        else:
+            word = match.group('word')
+            # Only upper-case operators, so "signal and image processing" stays one phrase
+            if word in KEYWORDS:
+                tokens.append((word,))
+            else:
+                tokens.append(('word', word))
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser producing nested tuples"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise QuerySyntaxError("Empty query")
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise QuerySyntaxError(f"Unexpected token: {self.peek()[0]}")
+        return node
+
+    def parse_or(self):
+        nodes = [self.parse_and()]
+        while self.peek() == ('OR',):
+            self.take()
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else ('or',) + tuple(nodes)
+
+    def parse_and(self):
+        nodes = [self.parse_not()]
+        while True:
+            token = self.peek()
+            if token == ('AND',):
+                self.take()
+            elif token is None or token[0] in ('OR', ')'):
+                break
+            # Adjacent operands without an operator are AND-ed
+            nodes.append(self.parse_not())
+        return nodes[0] if len(nodes) == 1 else ('and',) + tuple(nodes)
+
+    def parse_not(self):
+        if self.peek() == ('NOT',):
+            self.take()
+            return ('not', self.parse_not())
+        return self.parse_primary()
+
+    def parse_primary(self):
+        token = self.take()
+        if token is None:
+            raise QuerySyntaxError("Unexpected end of query")
+        kind = token[0]
+        if kind == '(':
+            node = self.parse_or()
+            if self.take() != (')',):
+                raise QuerySyntaxError("Missing closing parenthesis")
+            return node
+        if kind == 'word':
+            # Consecutive bare words form a single phrase, e.g. computer vision
+            words = [token[1]]
+            while self.peek() is not None and self.peek()[0] == 'word':
+                words.append(self.take()[1])
+            return ('term', 'domain', " ".join(words))
+        if kind in ('term', 'flag', 'compare'):
+            return token
+        raise QuerySyntaxError(f"Unexpected token: {kind}")
+
+
+def _describe(node) -> str:
+    kind = node[0]
+    if kind in ('and', 'or'):
+        return "(" + f" {kind.upper()} ".join(_describe(child) for child in node[1:]) + ")"
+    if kind == 'not':
+        return f"NOT {_describe(node[1])}"
+    if kind == 'term':
+        return f'{node[1]}:"{node[2]}"'
+    if kind == 'flag':
+        return f"{node[1]}:{'true' if node[2] else 'false'}"
+    return f"{node[1]}{node[2]}{node[3]}"
+
+
+class CompiledQuery:
+    """A parsed expertise query that can be evaluated against any ProfessorIndex"""
+
+    def __init__(self, text: str, tree):
+        self.text = text
+        self.tree = tree
+
+    def __str__(self):
+        return _describe(self.tree)
+
+    def positive_terms(self) -> List[Tuple]:
+        """Domain/college terms that are not under a NOT, used for ranking"""
+        terms = []
+
+        def walk(node, negated):
+            kind = node[0]
+            if kind in ('and', 'or'):
+                for child in node[1:]:
+                    walk(child, negated)
+            elif kind == 'not':
+                walk(node[1], not negated)
+            elif kind == 'term' and not negated:
+                terms.append(node)
+
+        walk(self.tree, False)
+        return terms
+
+    def evaluate(self, index: ProfessorIndex) -> int:
+        """Return the bitmap of professors matching the query"""
+
+        def visit(node):
+            kind = node[0]
+            if kind == 'and':
+                bits = index.all_bits
+                for child in node[1:]:
+                    bits &= visit(child)
+                    if not bits:
+                        break
+                return bits
+            if kind == 'or':
+                bits = 0
+                for child in node[1:]:
+                    bits |= visit(child)
+                return bits
+            if kind == 'not':
+                return index.all_bits & ~visit(node[1])
+            if kind == 'term':
+                return index.match_bitmap(node[1], node[2])
+            if kind == 'flag':
+                bits = 0
+                for key in BOOLEAN_FIELDS[node[1]]:
+                    bits |= index.flag_bitmap(key)
+                return bits if node[2] else index.all_bits & ~bits
+            return index.threshold_bitmap(node[1], node[2], node[3])
+
+        return visit(self.tree)
+
+    def search(self, index: ProfessorIndex, offset: int = 0, limit: Optional[int] = None) -> Dict:
+        """
+        Evaluate the query and rank the matches.
+        Professors matching more of the positive terms come first, then by
+        citations and h-index.
+        """
+        hits = self.evaluate(index)
+        term_bits = [index.match_bitmap(term[1], term[2]) for term in self.positive_terms()]
+
+        citations = index.columns['citations']
+        h_index = index.columns['h_index']
+        ranked = []
+        for ordinal in iter_bits(hits):
+            bit = 1 << ordinal
+            matched_terms = sum(1 for bits in term_bits if bits & bit)
+            ranked.append((-matched_terms, -int(citations[ordinal]), -int(h_index[ordinal]), ordinal, matched_terms))
+        ranked.sort()
+
+        end = offset + limit if limit is not None else None
+        results = []
+        for entry in ranked[offset:end]:
+            professor = dict(index.professors[entry[3]])
+            professor['matched_terms'] = entry[4]
+            results.append(professor)
+
+        return {
+            'hits': hits,
+            'total_count': popcount(hits),
+            'professors': results,
+        }
+
+
+@lru_cache(maxsize=256)
+def compile_query(text: str) -> CompiledQuery:
+    """Parse a query string once; compiled queries are cached by text"""
+    tree = _Parser(_tokenize(text or '')).parse()
+    return CompiledQuery(text, tree)
@@ -0,0 +1,230 @@
+"""
+Research-field classifier for domain strings.
+Domains are assigned to the field of the first keyword of SUBFIELD_TO_FIELD_MAP
+(in map order) that occurs in them. All keywords are compiled into one
+Aho-Corasick automaton, so a domain is scanned once whatever the size of the
+map, and results are memoized per normalized domain string.
+"""
+
+from collections import deque
+from typing import Dict, List
+
+# Define field-to-subfield mappings for common research areas
+# This maps subfield keywords to their parent field
+SUBFIELD_TO_FIELD_MAP = {
+    # Machine Learning & AI
+    'machine learning': 'Artificial Intelligence',
+    'deep learning': 'Artificial Intelligence',
+    'neural network': 'Artificial Intelligence',
+    'nlp': 'Artificial Intelligence',
+    'natural language processing': 'Artificial Intelligence',
+    'computer vision': 'Artificial Intelligence',
+    'reinforcement learning': 'Artificial Intelligence',
+    'artificial intelligence': 'Artificial Intelligence',
+    'pattern recognition': 'Artificial Intelligence',
+    'image processing': 'Artificial Intelligence',
+    'speech recognition': 'Artificial Intelligence',
+    'robotics': 'Artificial Intelligence',
+
+    # Data Science
+    'data mining': 'Data Science',
+    'data analytics': 'Data Science',
+    'big data': 'Data Science',
+    'data science': 'Data Science',
+    'statistics': 'Data Science',
+    'predictive analytics': 'Data Science',
+
+    # Cloud & Distributed Systems
+    'cloud computing': 'Cloud & Distributed Systems',
+    'distributed systems': 'Cloud & Distributed Systems',
+    'edge computing': 'Cloud & Distributed Systems',
+    'fog computing': 'Cloud & Distributed Systems',
+    'virtualization': 'Cloud & Distributed Systems',
+    'containerization': 'Cloud & Distributed Systems',
+    'microservices': 'Cloud & Distributed Systems',
+
+    # Cybersecurity
+    'cybersecurity': 'Cybersecurity',
+    'network security': 'Cybersecurity',
+    'cryptography': 'Cybersecurity',
+    'information security': 'Cybersecurity',
+    'malware': 'Cybersecurity',
+    'intrusion detection': 'Cybersecurity',
+    'blockchain': 'Cybersecurity',
+
+    # Networks & Communications
+    'computer networks': 'Networks & Communications',
+    'wireless networks': 'Networks & Communications',
+    'sensor networks': 'Networks & Communications',
+    'iot': 'Networks & Communications',
+    'internet of things': 'Networks & Communications',
+    '5g': 'Networks & Communications',
+    'mobile computing': 'Networks & Communications',
+    'adhoc networks': 'Networks & Communications',
+    'vanet': 'Networks & Communications',
+    'manet': 'Networks & Communications',
+    'wsn': 'Networks & Communications',
+    'wireless sensor': 'Networks & Communications',
+
+    # Software Engineering
+    'software engineering': 'Software Engineering',
+    'software testing': 'Software Engineering',
+    'agile': 'Software Engineering',
+    'devops': 'Software Engineering',
+    'software quality': 'Software Engineering',
+
+    # Signal & Image Processing
+    'signal processing': 'Signal & Image Processing',
+    'image analysis': 'Signal & Image Processing',
+    'digital signal': 'Signal & Image Processing',
+    'bio-signal': 'Signal & Image Processing',
+    'medical imaging': 'Signal & Image Processing',
+
+    # Hardware & VLSI
+    'vlsi': 'Hardware & Electronics',
+    'embedded systems': 'Hardware & Electronics',
+    'fpga': 'Hardware & Electronics',
+    'circuit design': 'Hardware & Electronics',
+    'semiconductor': 'Hardware & Electronics',
+    'mems': 'Hardware & Electronics',
+    'antenna': 'Hardware & Electronics',
+
+    # Databases
+    'database': 'Database Systems',
+    'sql': 'Database Systems',
+    'nosql': 'Database Systems',
+    'data warehouse': 'Database Systems',
+
+    # HCI & Graphics
+    'human computer interaction': 'HCI & Visualization',
+    'hci': 'HCI & Visualization',
+    'computer graphics': 'HCI & Visualization',
+    'visualization': 'HCI & Visualization',
+    'virtual reality': 'HCI & Visualization',
+    'augmented reality': 'HCI & Visualization',
+
+    # Bioinformatics
+    'bioinformatics': 'Computational Biology',
+    'computational biology': 'Computational Biology',
+    'genomics': 'Computational Biology',
+    'healthcare': 'Computational Biology',
+
+    # Optimization & Algorithms
+    'optimization': 'Algorithms & Theory',
+    'algorithm': 'Algorithms & Theory',
+    'computational complexity': 'Algorithms & Theory',
+    'graph theory': 'Algorithms & Theory',
+}
+
+# Field colors
+FIELD_COLORS = {
+    'Artificial Intelligence': '#8B5CF6',
+    'Data Science': '#10B981',
+    'Cloud & Distributed Systems': '#A855F7',
+    'Cybersecurity': '#6366F1',
+    'Networks & Communications': '#84CC16',
+    'Software Engineering': '#14B8A6',
+    'Signal & Image Processing': '#F59E0B',
+    'Hardware & Electronics': '#EC4899',
+    'Database Systems': '#F97316',
+    'HCI & Visualization': '#06B6D4',
+    'Computational Biology': '#22C55E',
+    'Algorithms & Theory': '#EAB308',
+    'General Computing': '#6B7280',
+}
+
+
+DEFAULT_FIELD = 'General Computing'
+
+def normalize_key(value) -> str:
+    """Lowercase and collapse whitespace (same normalization as professor_index)"""
+    return " ".join(str(value or "").strip().lower().split())
+
+
+# Distinct domains are bounded by the domains table; the memo is reset if that ever stops holding
+MAX_MEMO_SIZE = 100000
+
+
+class FieldClassifier:
+    """
+    Multi-keyword substring matcher with deterministic priority.
+
+    Every automaton state stores the highest-priority (lowest map position)
+    keyword ending there or at any of its failure-link suffixes, so the best
+    match is known after a single pass over the text.
+    """
+
+    def __init__(self, keyword_map: Dict[str, str], default: str = DEFAULT_FIELD):
+        self.keywords: List[str] = list(keyword_map)
+        self.fields: List[str] = [keyword_map[keyword] for keyword in self.keywords]
+        self.default = default
+        self._memo: Dict[str, str] = {}
+
+        no_match = len(self.keywords)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[int] = [no_match]
+        for priority, keyword in enumerate(self.keywords):
+            state = 0
+            for char in normalize_key(keyword):
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(no_match)
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._best[state] = min(self._best[state], priority)
+
+        # Breadth-first failure links; a state inherits the best match of its suffix
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._best[child] = min(self._best[child], self._best[self._fail[child]])
+                queue.append(child)
+
+    def best_match(self, text: str) -> int:
+        """Map position of the highest-priority keyword occurring in ``text`` (len(keywords) if none)"""
+        goto, fail, best_of = self._goto, self._fail, self._best
+        state = 0
+        best = len(self.keywords)
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if best_of[state] < best:
+                best = best_of[state]
+                if best == 0:
+                    break
+        return best
+
+    def classify(self, domain: str) -> str:
+        """Field of a domain string, memoized by normalized domain"""
+        key = normalize_key(domain)
+        field = self._memo.get(key)
+        if field is None:
+            best = self.best_match(key)
+            field = self.fields[best] if best < len(self.fields) else self.default
+            if len(self._memo) >= MAX_MEMO_SIZE:
+                self._memo.clear()
+            self._memo[key] = field
+        return field
+
+    def classify_terms(self, terms: List[str]) -> Dict[str, List[str]]:
+        """Group terms by field, keeping the order in which fields first appear"""
+        fields: Dict[str, List[str]] = {}
+        for term in terms:
+            fields.setdefault(self.classify(term), []).append(term)
+        return fields
+
+
+FIELD_CLASSIFIER = FieldClassifier(SUBFIELD_TO_FIELD_MAP)
+
+
+def classify_domain(domain: str) -> str:
+    """Determine parent field for a domain/subfield"""
+    return FIELD_CLASSIFIER.classify(domain)
@@ -0,0 +1,330 @@
+"""
+Dynamic knowledge graph built from professor data.
+The Field -> Subfield -> Person hierarchy is kept between requests and updated
+incrementally: only professors whose data changed are re-read, and only the
+subfields and fields they belong to (or left) are rebuilt. Published graphs
+are never mutated afterwards, so handlers can serve them without copying.
+"""
+
+import hashlib
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from domain_relations import get_related_domains
+from field_classifier import FIELD_COLORS, classify_domain
+from knowledge_graph_changes import ChangeLog, diff_graphs
+from professor_index import normalize_key, split_domains
+
+GRAPH_CONTEXT = {
+    "@vocab": "https://schema.org/",
+    "kg": "https://example.org/knowledge-graph/",
+    "RELATED_TO": "kg:relatedTo"
+}
+
+
+def field_node_id(field_name: str) -> str:
+    return f"field-{field_name.lower().replace(' ', '-').replace('&', 'and')}"
+
+
+def subfield_node_id(subfield_name: str) -> str:
+    return f"subfield-{subfield_name.lower().replace(' ', '-').replace('/', '-').replace('&', 'and')}"
+
+
+def person_node(prof: Dict) -> Dict:
+    """Person node for a professor"""
+    return {
+        "id": f"person-{prof.get('id', '')}",
+        "type": "Person",
+        "label": prof.get('name', 'Unknown'),
+        "description": prof.get('research_interests', ''),
+        "email": prof.get('email', ''),
+        "college": prof.get('college', ''),
+        "citations": prof.get('citations_count', 0),
+        "hIndex": prof.get('h_index', 0),
+        "i10Index": prof.get('i10_index', 0),
+        "scholarUrl": prof.get('google_scholar_url', ''),
+        "profilePicture": prof.get('profile_picture_url', '') or prof.get('scholar_profile_picture', ''),
+        "profileLink": prof.get('profile_link', ''),
+        "domainExpertise": prof.get('domain_expertise', ''),
+        "phdThesis": prof.get('phd_thesis', ''),
+        "professorData": prof
+    }
+
+
+# Person attributes carried by the columnar people table
+PERSON_COLUMNS = (
+    'id', 'label', 'description', 'email', 'college', 'citations', 'hIndex', 'i10Index',
+    'scholarUrl', 'profilePicture', 'profileLink', 'domainExpertise', 'phdThesis',
+)
+
+
+def compact_graph(graph: Dict, columnar: bool = False) -> Dict:
+    """
+    Reference-based form of a graph.
+
+    Person children are replaced by a ``members`` list of references and every
+    person appears once in a top-level ``people`` table, instead of once per
+    subfield. ``professorData`` is dropped since the person attributes already
+    carry the displayed fields.
+
+    Args:
+        graph: Graph dict as built by DynamicKnowledgeGraph (or the static file)
+        columnar: Reference people by row number in a column-oriented table
+                  instead of by node id in a dict of person objects
+    """
+    rows: Dict[str, int] = {}
+    people: List[Dict] = []
+
+    def visit(node: Dict) -> Dict:
+        children = node.get('children')
+        if not children:
+            return node
+        compact = {key: value for key, value in node.items() if key != 'children'}
+        nested, members = [], []
+        for child in children:
+            if child.get('type') != 'Person':
+                nested.append(visit(child))
+                continue
+            row = rows.get(child['id'])
+            if row is None:
+                row = rows[child['id']] = len(people)
+                people.append(child)
+            members.append(row if columnar else child['id'])
+        if nested:
+            compact['children'] = nested
+        if members:
+            compact['members'] = members
+        return compact
+
+    result = dict(graph)
+    result['@graph'] = [visit(node) for node in graph.get('@graph', [])]
+    if columnar:
+        result['people'] = {column: [person.get(column) for person in people] for column in PERSON_COLUMNS}
+    else:
+        result['people'] = {
+            person['id']: {key: value for key, value in person.items() if key != 'professorData'}
+            for person in people
+        }
+    result['metadata'] = dict(graph.get('metadata', {}), format='columnar' if columnar else 'compact')
+    return result
+
+
+def professor_signature(prof: Dict) -> str:
+    """Hash of a professor row, used to detect changed professors between snapshots"""
+    return hashlib.sha1(repr(sorted(prof.items(), key=lambda item: item[0])).encode('utf-8')).hexdigest()
+
+
+class DynamicKnowledgeGraph:
+    """
+    Incrementally maintained Field -> Subfield -> Person graph.
+
+    ``update`` diffs a professor list against the previous one by per-row
+    signature and rebuilds only the affected subfield and field nodes; the
+    resulting ``graph`` dict is a fresh top-level object that shares every
+    unchanged node with the previous version.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.graph = None
+        self.last_update: Dict = {}
+        # Patches between recent versions, for clients catching up
+        self.changes = ChangeLog()
+        # professor id -> {'signature', 'node', 'subfields': [(key, label)]}
+        self._professors: Dict = {}
+        # (field, subfield key) -> {'members': {professor id: person node}, 'labels': Counter, 'node'}
+        self._subfields: Dict[Tuple[str, str], Dict] = {}
+        # field -> set of subfield keys / built field node
+        self._field_subfields: Dict[str, set] = {}
+        self._field_nodes: Dict[str, Dict] = {}
+        self._relationships: List[Dict] = []
+        # Derived forms of the current graph, built on first use
+        self._compact: Dict[bool, Dict] = {}
+
+    def update(self, professors: List[Dict], version=None) -> Dict:
+        """
+        Bring the graph up to date with ``professors``.
+
+        Returns:
+            Summary of what changed: added, updated and removed professor ids,
+            the touched subfield and field keys and the graph 'operations'
+            (see knowledge_graph_changes)
+        """
+        seen = set()
+        added, updated = [], []
+        touched = set()
+        # Relationships only depend on who belongs to which subfield
+        memberships_changed = False
+
+        for prof in professors:
+            prof_id = prof.get('id', '')
+            if prof_id in seen:
+                continue
+
+            signature = professor_signature(prof)
+            entry = self._professors.get(prof_id)
+            if entry is not None and entry['signature'] == signature:
+                seen.add(prof_id)
+                continue
+            # Professors without domains are left out (and removed below if they had some)
+            domains = split_domains(prof)
+            if not domains:
+                continue
+            seen.add(prof_id)
+            if entry is not None:
+                self._leave(prof_id, entry, touched)
+                updated.append(prof_id)
+            else:
+                added.append(prof_id)
+
+            node = person_node(prof)
+            memberships = []
+            for domain in domains:
+                key = (classify_domain(domain), normalize_key(domain))
+                subfield = self._subfields.get(key)
+                if subfield is None:
+                    subfield = self._subfields[key] = {'members': {}, 'labels': Counter(), 'node': None}
+                    self._field_subfields.setdefault(key[0], set()).add(key)
+                subfield['members'][prof_id] = node
+                subfield['labels'][domain] += 1
+                memberships.append((key, domain))
+                touched.add(key)
+            if entry is None or entry['subfields'] != memberships:
+                memberships_changed = True
+            self._professors[prof_id] = {'signature': signature, 'node': node, 'subfields': memberships}
+
+        removed = [prof_id for prof_id in self._professors if prof_id not in seen]
+        for prof_id in removed:
+            self._leave(prof_id, self._professors.pop(prof_id), touched)
+            memberships_changed = True
+
+        changed_fields = set()
+        removed_subfields = set()
+        for key in touched:
+            subfield = self._subfields[key]
+            changed_fields.add(key[0])
+            if subfield['members']:
+                subfield['node'] = self._build_subfield(subfield)
+            else:
+                del self._subfields[key]
+                self._field_subfields[key[0]].discard(key)
+                removed_subfields.add(key)
+
+        for field_name in changed_fields:
+            keys = self._field_subfields.get(field_name)
+            if keys:
+                self._field_nodes[field_name] = self._build_field(field_name, keys)
+            else:
+                self._field_subfields.pop(field_name, None)
+                self._field_nodes.pop(field_name, None)
+
+        if memberships_changed or self.graph is None:
+            self._relationships = self._build_relationships(version)
+
+        previous, previous_version = self.graph, self.version
+        self.version = version
+        self.graph = self._assemble(version)
+        self._compact = {}
+        operations = []
+        if previous is not None:
+            operations = diff_graphs(previous, self.graph)
+            self.changes.record(previous_version, version, operations, self.graph.get('metadata'))
+        self.last_update = {
+            'version': version,
+            'added': added,
+            'updated': updated,
+            'removed': removed,
+            'subfields': touched - removed_subfields,
+            'removed_subfields': removed_subfields,
+            'fields': changed_fields,
+            'operations': operations,
+        }
+        return self.last_update
+
+    def compact(self, columnar: bool = False) -> Dict:
+        """Reference-based form of the current graph (see compact_graph), cached until the next update"""
+        compact = self._compact.get(columnar)
+        if compact is None:
+            compact = self._compact[columnar] = compact_graph(self.graph, columnar)
+        return compact
+
+    def _leave(self, prof_id, entry: Dict, touched: set):
+        """Remove a professor from every subfield they belonged to"""
+        for key, label in entry['subfields']:
+            subfield = self._subfields[key]
+            subfield['members'].pop(prof_id, None)
+            subfield['labels'][label] -= 1
+            if subfield['labels'][label] <= 0:
+                del subfield['labels'][label]
+            touched.add(key)
+
+    def _build_subfield(self, subfield: Dict) -> Dict:
+        # Sort professors by citations
+        professors = sorted(subfield['members'].values(), key=lambda p: (-(p.get("citations") or 0), p["label"] or ''))
+        # The most common spelling names the subfield
+        label = min(subfield['labels'].items(), key=lambda item: (-item[1], item[0]))[0]
+        return {
+            "id": subfield_node_id(label),
+            "type": "Subfield",
+            "label": label,
+            "children": professors,
+            "professorCount": len(professors),
+            "totalCitations": sum(p.get("citations") or 0 for p in professors)
+        }
+
+    def _build_field(self, field_name: str, keys) -> Dict:
+        # Sort subfields by professor count
+        subfield_nodes = sorted(
+            (self._subfields[key]['node'] for key in keys),
+            key=lambda s: (-s["professorCount"], s["label"])
+        )
+        return {
+            "id": field_node_id(field_name),
+            "type": "Field",
+            "label": field_name,
+            "color": FIELD_COLORS.get(field_name, '#6B7280'),
+            "children": subfield_nodes,
+            "subfieldCount": len(subfield_nodes),
+            "professorCount": sum(s["professorCount"] for s in subfield_nodes),
+            "totalCitations": sum(s["totalCitations"] for s in subfield_nodes)
+        }
+
+    def _build_relationships(self, version) -> List[Dict]:
+        """Link subfields that co-occur across professors more than chance predicts"""
+        memberships = [[key for key, _ in entry['subfields']] for entry in self._professors.values()]
+        relationships = []
+        for edge in get_related_domains(memberships, version=version):
+            source = self._subfields.get(edge['source'])
+            target = self._subfields.get(edge['target'])
+            if source is None or target is None or source['node']['id'] == target['node']['id']:
+                continue
+            relationships.append({
+                "source": source['node']['id'],
+                "target": target['node']['id'],
+                "type": "RELATED_TO",
+                "label": "co-occurs with",
+                "weight": edge['score'],
+                "sharedProfessors": edge['count'],
+                "crossField": edge['source'][0] != edge['target'][0]
+            })
+        return relationships
+
+    def _assemble(self, version) -> Dict:
+        # Sort fields by professor count
+        field_nodes = sorted(self._field_nodes.values(), key=lambda f: (-f["professorCount"], f["label"]))
+        return {
+            "@context": dict(GRAPH_CONTEXT),
+            "@graph": field_nodes,
+            "relationships": self._relationships,
+            "metadata": {
+                "version": "2.0.0",
+                "generated": datetime.now().isoformat(),
+                "dataVersion": version,
+                "totalFields": len(field_nodes),
+                "totalSubfields": sum(f["subfieldCount"] for f in field_nodes),
+                "totalProfessors": len(self._professors),
+                "totalRelationships": len(self._relationships),
+                "hierarchy": "Field -> Subfield -> Person"
+            }
+        }
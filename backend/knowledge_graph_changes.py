@@ -0,0 +1,137 @@
+"""
+Change log of the dynamic knowledge graph.
+Each graph update is diffed against the previous graph into a compact patch
+of node operations, and recent patches are kept so live clients can catch up
+with ``/api/knowledge-graph/changes?since=<version>`` instead of re-fetching
+the whole graph. Unchanged subtrees are shared between graph versions, so the
+diff only descends into nodes that were rebuilt.
+
+Operations, applied in order:
+    - {'op': 'add', 'id', 'parent', 'node'}: new child of 'parent' (None for
+      top-level nodes), appended to its children
+    - {'op': 'remove', 'id', 'parent'}
+    - {'op': 'move', 'id', 'from', 'to'}: child moved between parents
+    - {'op': 'update', 'id', 'node'}: new attributes of an existing node
+    - {'op': 'order', 'id', 'children'}: new order of a node's children
+    - {'op': 'relationships', 'added', 'removed'}: RELATED_TO edges, removed
+      ones as [source, target] pairs
+Node attributes ('node') never include children; a node's data is sent once
+per patch, on its first add, move or update.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional
+
+# Patches kept, and the most operations returned before asking for a reload
+DEFAULT_MAX_PATCHES = 50
+DEFAULT_MAX_OPERATIONS = 5000
+
+
+def node_attributes(node: Dict) -> Dict:
+    return {key: value for key, value in node.items() if key != 'children'}
+
+
+def diff_graphs(old: Dict, new: Dict) -> List[Dict]:
+    """Operations turning graph ``old`` into graph ``new``"""
+    # First pass: structural operations, holding the old/new node objects
+    operations: List[Dict] = []
+
+    def diff_children(parent_id, old_children, new_children):
+        old_by_id = {child['id']: child for child in old_children}
+        new_by_id = {child['id']: child for child in new_children}
+
+        for child_id, child in old_by_id.items():
+            if child_id not in new_by_id:
+                operations.append({'op': 'remove', 'id': child_id, 'parent': parent_id, 'old': child})
+
+        added = []
+        for child_id, child in new_by_id.items():
+            previous = old_by_id.get(child_id)
+            if previous is None:
+                added.append(child_id)
+                operations.append({'op': 'add', 'id': child_id, 'parent': parent_id, 'new': child})
+                # The children of a new node are new as well
+                diff_children(child_id, [], child.get('children', []))
+            elif previous is not child:
+                if node_attributes(previous) != node_attributes(child):
+                    operations.append({'op': 'update', 'id': child_id, 'new': child})
+                diff_children(child_id, previous.get('children', []), child.get('children', []))
+
+        # Clients append added children; send the order when that is not the new order
+        expected = [child_id for child_id in old_by_id if child_id in new_by_id] + added
+        if expected != list(new_by_id):
+            operations.append({'op': 'order', 'id': parent_id, 'children': list(new_by_id)})
+
+    diff_children(None, old.get('@graph', []), new.get('@graph', []))
+
+    # Second pass: a remove and an add of the same node become a move
+    adds: Dict[str, deque] = {}
+    for operation in operations:
+        if operation['op'] == 'add':
+            adds.setdefault(operation['id'], deque()).append(operation)
+    paired = []
+    for operation in operations:
+        if operation['op'] == 'remove' and adds.get(operation['id']):
+            add = adds[operation['id']].popleft()
+            add.update({'op': 'move', 'from': operation['parent'], 'to': add.pop('parent'), 'old': operation['old']})
+        else:
+            paired.append(operation)
+
+    # Third pass: attach node attributes once per node, and only where the client lacks them
+    sent = set()
+    patch = []
+    for operation in paired:
+        node = operation.pop('new', None)
+        previous = operation.pop('old', None)
+        kind = operation['op']
+        if kind == 'remove' or kind == 'order':
+            patch.append(operation)
+            continue
+        # A moved node only needs its data when it also changed
+        needs_data = kind != 'move' or node_attributes(node) != node_attributes(previous)
+        if needs_data and operation['id'] not in sent:
+            sent.add(operation['id'])
+            operation['node'] = node_attributes(node)
+        elif kind == 'update':
+            # Already sent with a newer add, move or update in this patch
+            continue
+        patch.append(operation)
+
+    old_edges = {(edge['source'], edge['target']): edge for edge in old.get('relationships', [])}
+    new_edges = {(edge['source'], edge['target']): edge for edge in new.get('relationships', [])}
+    added_edges = [edge for key, edge in new_edges.items() if old_edges.get(key) != edge]
+    removed_edges = [list(key) for key in old_edges if key not in new_edges]
+    if added_edges or removed_edges:
+        patch.append({'op': 'relationships', 'added': added_edges, 'removed': removed_edges})
+    return patch
+
+
+class ChangeLog:
+    """Recent graph patches, each taking the graph from one version to the next"""
+
+    def __init__(self, max_patches: int = DEFAULT_MAX_PATCHES, max_operations: int = DEFAULT_MAX_OPERATIONS):
+        self.max_operations = max_operations
+        self._patches = deque(maxlen=max_patches)
+
+    def record(self, from_version, to_version, operations: List[Dict], metadata: Optional[Dict] = None):
+        self._patches.append({
+            'from': from_version,
+            'to': to_version,
+            'operations': operations,
+            'metadata': metadata,
+        })
+
+    def since(self, version) -> Optional[List[Dict]]:
+        """
+        Patches from ``version`` to the latest version, in order.
+        None when ``version`` is not in the log (too old or unknown) or the
+        patches add up to more than ``max_operations``: reload the graph instead.
+        """
+        patches = list(self._patches)
+        for start, patch in enumerate(patches):
+            if patch['from'] == version:
+                selected = patches[start:]
+                if sum(len(patch['operations']) for patch in selected) > self.max_operations:
+                    return None
+                return selected
+        return None
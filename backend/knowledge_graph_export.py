@@ -0,0 +1,179 @@
+"""
+Server-side conversions of the knowledge graph for export.
+Produces the Cytoscape element lists the frontend renders (same ids, edge
+relations and collapsed-node handling as the client-side mapper) and GraphML.
+Serializers yield the output in chunks so large graphs can be streamed.
+"""
+
+import json
+from typing import Dict, Iterable, Iterator, List, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+# Number of elements serialized per streamed chunk
+CHUNK_SIZE = 500
+
+# Edge relation by child node type
+CHILD_RELATIONS = {
+    'Person': 'HAS_MEMBER',
+    'Subfield': 'HAS_SUBFIELD',
+    'Skill': 'HAS_SKILL',
+}
+
+# GraphML attribute keys: (name, GraphML type)
+GRAPHML_NODE_KEYS = (
+    ('label', 'string'),
+    ('type', 'string'),
+    ('description', 'string'),
+    ('color', 'string'),
+    ('depth', 'int'),
+    ('childCount', 'int'),
+    ('college', 'string'),
+    ('citations', 'int'),
+    ('hIndex', 'int'),
+    ('i10Index', 'int'),
+    ('professorCount', 'int'),
+    ('totalCitations', 'int'),
+)
+GRAPHML_EDGE_KEYS = (
+    ('relation', 'string'),
+    ('label', 'string'),
+)
+
+
+def cytoscape_elements(graph: Dict, collapsed: Iterable[str] = ()) -> Dict[str, List[Dict]]:
+    """
+    Map a hierarchical graph to Cytoscape elements.
+
+    Children of collapsed nodes are left out. A node listed under several
+    parents (a Person in several subfields) becomes one node with an edge
+    from each parent, and RELATED_TO edges are kept only between nodes that
+    are shown.
+
+    Args:
+        graph: Graph dict with '@graph' (or a plain list of top-level nodes)
+        collapsed: Ids of nodes whose children are hidden
+
+    Returns:
+        Dict with 'nodes' and 'edges' lists of {'data': {...}} elements
+    """
+    collapsed = set(collapsed)
+    roots = graph.get('@graph', []) if isinstance(graph, dict) else graph
+    nodes = []
+    edges = []
+    seen_nodes = set()
+    seen_edges = set()
+
+    stack = [(node, None, 0) for node in reversed(roots)]
+    while stack:
+        node, parent_id, depth = stack.pop()
+        node_id = node.get('id')
+        if parent_id is not None:
+            edge_id = f"{parent_id}->{node_id}"
+            if edge_id not in seen_edges:
+                seen_edges.add(edge_id)
+                edges.append({'data': {
+                    'id': edge_id,
+                    'source': parent_id,
+                    'target': node_id,
+                    'relation': CHILD_RELATIONS.get(node.get('type'), 'HAS_CHILD'),
+                }})
+        if node_id in seen_nodes:
+            continue
+        seen_nodes.add(node_id)
+
+        children = node.get('children') or ()
+        is_collapsed = node_id in collapsed
+        data = {key: value for key, value in node.items() if key != 'children'}
+        data['description'] = node.get('description') or ''
+        data['hasChildren'] = len(children) > 0
+        data['childCount'] = len(children)
+        data['isCollapsed'] = is_collapsed
+        data['depth'] = depth
+        nodes.append({'data': data, 'classes': 'collapsed' if is_collapsed else ''})
+
+        if not is_collapsed:
+            for child in reversed(children):
+                stack.append((child, node_id, depth + 1))
+
+    if isinstance(graph, dict):
+        for relationship in graph.get('relationships', []):
+            source, target = relationship.get('source'), relationship.get('target')
+            if source not in seen_nodes or target not in seen_nodes:
+                continue
+            edges.append({'data': {
+                'id': f"{source}->{target}-rel",
+                'source': source,
+                'target': target,
+                'relation': relationship.get('type') or 'RELATED_TO',
+                'label': relationship.get('label'),
+            }})
+
+    return {'nodes': nodes, 'edges': edges}
+
+
+def _batches(items: List, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def iter_cytoscape_json(elements: Dict[str, List[Dict]], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Serialize Cytoscape elements as one JSON object, ``chunk_size`` elements per chunk"""
+    for position, name in enumerate(('nodes', 'edges')):
+        yield ('{' if position == 0 else '],') + f'"{name}":['
+        for number, batch in enumerate(_batches(elements[name], chunk_size)):
+            text = ','.join(json.dumps(element, separators=(',', ':')) for element in batch)
+            yield text if number == 0 else ',' + text
+    yield ']}'
+
+
+def _graphml_data(data: Dict, keys) -> str:
+    parts = []
+    for name, _ in keys:
+        value = data.get(name)
+        if value is None or isinstance(value, (dict, list, tuple)) or value == '':
+            continue
+        if isinstance(value, bool):
+            value = int(value)
+        parts.append(f'<data key={quoteattr(name)}>{escape(str(value))}</data>')
+    return ''.join(parts)
+
+
+def iter_graphml(elements: Dict[str, List[Dict]], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Serialize Cytoscape elements as a directed GraphML document, in chunks"""
+    header = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n',
+    ]
+    for name, attr_type in GRAPHML_NODE_KEYS:
+        header.append(f'<key id="{name}" for="node" attr.name="{name}" attr.type="{attr_type}"/>\n')
+    for name, attr_type in GRAPHML_EDGE_KEYS:
+        header.append(f'<key id="{name}" for="edge" attr.name="{name}" attr.type="{attr_type}"/>\n')
+    header.append('<graph id="knowledge-graph" edgedefault="directed">\n')
+    yield ''.join(header)
+
+    for batch in _batches(elements['nodes'], chunk_size):
+        yield ''.join(
+            f'<node id={quoteattr(str(element["data"]["id"]))}>'
+            f'{_graphml_data(element["data"], GRAPHML_NODE_KEYS)}</node>\n'
+            for element in batch
+        )
+    for batch in _batches(elements['edges'], chunk_size):
+        yield ''.join(
+            f'<edge id={quoteattr(element["data"]["id"])} '
+            f'source={quoteattr(str(element["data"]["source"]))} '
+            f'target={quoteattr(str(element["data"]["target"]))}>'
+            f'{_graphml_data(element["data"], GRAPHML_EDGE_KEYS)}</edge>\n'
+            for element in batch
+        )
+    yield '</graph>\n</graphml>\n'
+
+
+def element_count(elements: Dict[str, List[Dict]]) -> int:
+    return len(elements['nodes']) + len(elements['edges'])
+
+
+def parse_collapsed(value: Optional[str]) -> frozenset:
+    """Collapsed node ids from a comma-separated query parameter"""
+    if not value:
+        return frozenset()
+    return frozenset(node_id.strip() for node_id in value.split(',') if node_id.strip())
@@ -0,0 +1,120 @@
+"""
+Node-id index over a hierarchical knowledge graph.
+Built once per graph version, it maps every node id to its node, parents and
+depth so subtrees can be served by lookup instead of a tree search.
+"""
+
+from typing import Dict, List, Optional
+
+
+def copy_node(value):
+    """Deep copy of a node (or any JSON-like value) as plain dicts and lists"""
+    if isinstance(value, dict):
+        return {key: copy_node(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [copy_node(item) for item in value]
+    return value
+
+
+def collapse_node(node: Dict) -> Dict:
+    """Copy of a node without its children, for collapsed views"""
+    collapsed = {key: copy_node(value) for key, value in node.items() if key != 'children'}
+    collapsed['hasChildren'] = len(node['children']) > 0
+    collapsed['childCount'] = len(node['children'])
+    return collapsed
+
+
+def truncate_node(node: Dict, levels: Optional[int]) -> Dict:
+    """Copy of a node with at most ``levels`` levels of descendants (None keeps the whole subtree)"""
+    if levels is None or 'children' not in node:
+        return copy_node(node)
+    if levels <= 0:
+        return collapse_node(node)
+    truncated = {key: copy_node(value) for key, value in node.items() if key != 'children'}
+    truncated['children'] = [truncate_node(child, levels - 1) for child in node['children']]
+    return truncated
+
+
+class GraphIndex:
+    """
+    Id -> node lookup with parent pointers and depths.
+
+    Top-level nodes have depth 1. A node id reached through several parents
+    (a Person listed under several subfields) keeps its first occurrence and
+    records every parent.
+    """
+
+    def __init__(self, graph: Dict):
+        self.nodes: Dict[str, Dict] = {}
+        self.parents: Dict[str, List[str]] = {}
+        self.depths: Dict[str, int] = {}
+        self.max_depth = 0
+
+        stack = [(node, None, 1) for node in reversed(graph.get('@graph', []))]
+        while stack:
+            node, parent_id, depth = stack.pop()
+            node_id = node.get('id')
+            if node_id is None:
+                continue
+            if node_id in self.nodes:
+                if parent_id is not None and parent_id not in self.parents[node_id]:
+                    self.parents[node_id].append(parent_id)
+                continue
+            self.nodes[node_id] = node
+            self.parents[node_id] = [parent_id] if parent_id is not None else []
+            self.depths[node_id] = depth
+            self.max_depth = max(self.max_depth, depth)
+            for child in reversed(node.get('children', [])):
+                stack.append((child, node_id, depth + 1))
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self.nodes
+
+    def parent(self, node_id: str) -> Optional[str]:
+        parents = self.parents.get(node_id)
+        return parents[0] if parents else None
+
+    def path(self, node_id: str) -> List[str]:
+        """Ancestor ids from the top level down to (excluding) the node"""
+        path = []
+        parent_id = self.parent(node_id)
+        while parent_id is not None:
+            path.append(parent_id)
+            parent_id = self.parent(parent_id)
+        return path[::-1]
+
+    def subtree(self, node_id: str, depth: Optional[int] = None, offset: int = 0,
+                limit: Optional[int] = None) -> Optional[Dict]:
+        """
+        A node with its descendants, as a new dict that is safe to modify.
+
+        Args:
+            node_id: Id of the node
+            depth: Levels of descendants to include (None for all, 0 for none)
+            offset: Index of the first direct child to include
+            limit: Maximum number of direct children to include
+
+        Returns:
+            The node dict, with 'childCount', 'childOffset' and 'hasMore' when
+            it has children, or None when the id is unknown
+        """
+        node = self.nodes.get(node_id)
+        if node is None:
+            return None
+
+        result = {key: copy_node(value) for key, value in node.items() if key != 'children'}
+        children = node.get('children')
+        if children is not None:
+            stop = offset + limit if limit is not None else None
+            page = children[offset:stop]
+            if depth is None or depth > 0:
+                result['children'] = [truncate_node(child, None if depth is None else depth - 1) for child in page]
+            result['hasChildren'] = len(children) > 0
+            result['childCount'] = len(children)
+            result['childOffset'] = offset
+            result['hasMore'] = stop is not None and stop < len(children)
+
+        result['parentId'] = self.parent(node_id)
+        result['depth'] = self.depths[node_id]
+        result['path'] = self.path(node_id)
+        return result
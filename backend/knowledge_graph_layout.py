@@ -0,0 +1,78 @@
+"""
+Server-side radial tree layout for the knowledge graph.
+
+Nodes are placed on concentric rings by depth. Each node gets an angular wedge
+proportional to the number of leaves under it, so subtrees never overlap.
+Because nodes are numbered in pre-order, the leaves preceding a node are
+exactly those of earlier subtrees; the wedge start is therefore a prefix sum
+over leaf flags, and the whole layout is a handful of NumPy passes.
+"""
+
+import math
+from typing import Dict
+
+import numpy as np
+
+from knowledge_graph_index import GraphIndex
+
+# Minimum distance between neighbouring leaves on the outer ring and between rings
+LEAF_SPACING = 40.0
+RING_SPACING = 220.0
+
+
+def radial_layout(graph: Dict, leaf_spacing: float = LEAF_SPACING, ring_spacing: float = RING_SPACING) -> Dict:
+    """
+    Compute node positions for a Field -> Subfield -> ... hierarchy.
+
+    A node listed under several parents is placed once, under its first parent.
+
+    Args:
+        graph: Graph dict, or an already built GraphIndex of it
+
+    Returns:
+        Dict with parallel 'ids', 'x' and 'y' lists plus the layout 'bounds'
+    """
+    index = graph if isinstance(graph, GraphIndex) else GraphIndex(graph)
+    ids = list(index.nodes)
+    count = len(ids)
+    if not count:
+        return {'algorithm': 'radial', 'ids': [], 'x': [], 'y': [], 'bounds': [0.0, 0.0, 0.0, 0.0]}
+
+    ordinal = {node_id: i for i, node_id in enumerate(ids)}
+    parent_ids = [index.parent(node_id) for node_id in ids]
+    parent = np.array([ordinal[p] if p is not None else -1 for p in parent_ids], dtype=np.int64)
+    depth = np.array([index.depths[node_id] for node_id in ids], dtype=np.int64)
+
+    # Leaves of the layout tree: nodes that are nobody's first parent
+    has_children = np.zeros(count, dtype=bool)
+    has_children[parent[parent >= 0]] = True
+    is_leaf = (~has_children).astype(np.float64)
+
+    # Leaves under every node, accumulated bottom-up one depth level at a time
+    leaves = is_leaf.copy()
+    for level in range(int(depth.max()), 1, -1):
+        at_level = depth == level
+        np.add.at(leaves, parent[at_level], leaves[at_level])
+
+    # Pre-order numbering makes the wedge start a prefix sum of the leaf flags
+    starts = np.cumsum(is_leaf) - is_leaf
+    total_leaves = float(is_leaf.sum())
+    angles = 2 * math.pi * (starts + leaves / 2) / total_leaves
+
+    # Rings far enough apart that outer-ring leaves are at least leaf_spacing apart
+    max_depth = int(depth.max())
+    ring = max(ring_spacing, leaf_spacing * total_leaves / (2 * math.pi * max_depth))
+    radii = depth * ring
+    # A single top-level node sits at the centre
+    if (depth == 1).sum() == 1:
+        radii = (depth - 1) * ring
+
+    x = np.round(radii * np.cos(angles), 2)
+    y = np.round(radii * np.sin(angles), 2)
+    return {
+        'algorithm': 'radial',
+        'ids': ids,
+        'x': x.tolist(),
+        'y': y.tolist(),
+        'bounds': [float(x.min()), float(y.min()), float(x.max()), float(y.max())],
+    }
@@ -0,0 +1,123 @@
+"""
+Neighbourhood queries over the knowledge graph.
+An adjacency index over hierarchy edges (in both directions) and relationship
+edges is built once per graph version. A neighbourhood is a breadth-first
+search from one node that expands at most ``limit`` new neighbours per node
+and stops at ``depth`` hops or ``max_nodes`` nodes, so the response size is
+bounded whatever the size of the graph.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from knowledge_graph_export import CHILD_RELATIONS
+from knowledge_graph_index import GraphIndex, copy_node
+
+DEFAULT_DEPTH = 1
+MAX_DEPTH = 3
+DEFAULT_LIMIT = 25
+MAX_NODES = 500
+
+# Neighbour entry: (neighbour id, relation, edge source, edge target)
+Neighbour = Tuple[str, str, str, str]
+
+
+class AdjacencyIndex:
+    """
+    Neighbour lists of every node.
+
+    Each node lists its children in graph order (people most cited first),
+    then its parents, then related nodes by descending relationship weight,
+    so fan-out caps keep the most relevant neighbours.
+    """
+
+    def __init__(self, graph: Dict, index: Optional[GraphIndex] = None):
+        self.index = index if index is not None else GraphIndex(graph)
+        children: Dict[str, List[Neighbour]] = {node_id: [] for node_id in self.index.nodes}
+        parents: Dict[str, List[Neighbour]] = {node_id: [] for node_id in self.index.nodes}
+        related: Dict[str, List[Tuple[float, Neighbour]]] = {node_id: [] for node_id in self.index.nodes}
+
+        for node_id, node in self.index.nodes.items():
+            seen = set()
+            for child in node.get('children', []):
+                child_id = child.get('id')
+                if child_id in seen or child_id not in self.index.nodes:
+                    continue
+                seen.add(child_id)
+                relation = CHILD_RELATIONS.get(child.get('type'), 'HAS_CHILD')
+                children[node_id].append((child_id, relation, node_id, child_id))
+                parents[child_id].append((node_id, relation, node_id, child_id))
+
+        for relationship in graph.get('relationships', []):
+            source, target = relationship.get('source'), relationship.get('target')
+            if source not in self.index.nodes or target not in self.index.nodes:
+                continue
+            relation = relationship.get('type') or 'RELATED_TO'
+            weight = float(relationship.get('weight') or 0)
+            related[source].append((weight, (target, relation, source, target)))
+            related[target].append((weight, (source, relation, source, target)))
+
+        self.neighbours: Dict[str, List[Neighbour]] = {}
+        for node_id in self.index.nodes:
+            ranked = sorted(related[node_id], key=lambda entry: -entry[0])
+            self.neighbours[node_id] = children[node_id] + parents[node_id] + [entry for _, entry in ranked]
+
+    def neighborhood(self, node_id: str, depth: int = DEFAULT_DEPTH, limit: int = DEFAULT_LIMIT,
+                     max_nodes: int = MAX_NODES) -> Optional[Dict]:
+        """
+        Nodes within ``depth`` hops of a node.
+
+        Args:
+            node_id: Id of the centre node
+            depth: Maximum number of hops
+            limit: Maximum number of new neighbours expanded per node
+            max_nodes: Maximum number of nodes returned
+
+        Returns:
+            Dict with 'nodes' (without children, with 'distance' and
+            'childCount'), the 'edges' between them and 'truncated' when a
+            cap left neighbours out, or None when the id is unknown
+        """
+        if node_id not in self.index:
+            return None
+
+        distances = {node_id: 0}
+        edges = {}
+        truncated = False
+        queue = deque([node_id])
+        while queue:
+            current = queue.popleft()
+            if distances[current] >= depth:
+                continue
+            expanded = 0
+            for neighbour, relation, source, target in self.neighbours[current]:
+                if neighbour in distances:
+                    # Edge to an already included node, e.g. a shared person's second subfield
+                    edges.setdefault((source, target, relation), None)
+                    continue
+                if expanded >= limit or len(distances) >= max_nodes:
+                    truncated = True
+                    break
+                distances[neighbour] = distances[current] + 1
+                edges[(source, target, relation)] = None
+                queue.append(neighbour)
+                expanded += 1
+
+        nodes = []
+        for included, distance in distances.items():
+            node = self.index.nodes[included]
+            summary = {key: copy_node(value) for key, value in node.items() if key != 'children'}
+            summary['childCount'] = len(node.get('children', []))
+            summary['distance'] = distance
+            nodes.append(summary)
+
+        return {
+            'center': node_id,
+            'nodes': nodes,
+            'edges': [
+                {'source': source, 'target': target, 'relation': relation}
+                for source, target, relation in edges
+                if source in distances and target in distances
+            ],
+            'truncated': truncated,
+        }
@@ -0,0 +1,154 @@
+"""
+Cursor pagination of the Person children of knowledge-graph subfields.
+People of a subfield are sorted once per graph version for each ordering;
+a page is a binary search for the cursor position plus a slice. Cursors are
+keyset cursors (the sort key of the last person returned), so paging keeps
+its place when people are added or removed between requests.
+"""
+
+import base64
+import bisect
+import json
+from typing import Dict, List, Optional, Tuple
+
+from knowledge_graph_index import GraphIndex, copy_node
+
+# Server-side orderings of a subfield's people
+PERSON_ORDERS = ('citations', 'hIndex', 'name')
+
+# People per subfield embedded in the default dynamic graph response
+DEFAULT_PEOPLE_LIMIT = 20
+
+
+def _metric(value) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def person_sort_key(node: Dict, order: str) -> Tuple:
+    """Sort key of a Person node; ids break ties so every key is unique"""
+    label = (node.get('label') or '').lower()
+    if order == 'citations':
+        return (-_metric(node.get('citations')), label, node.get('id'))
+    if order == 'hIndex':
+        return (-_metric(node.get('hIndex')), label, node.get('id'))
+    return (label, node.get('id'))
+
+
+def encode_cursor(order: str, key: Tuple) -> str:
+    payload = json.dumps([order, list(key)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Tuple]:
+    """Order and sort key of a cursor; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        order, key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if order not in PERSON_ORDERS or not isinstance(key, list):
+        raise ValueError("Invalid cursor")
+    # Keys must compare with the sort keys of that order
+    expected = (str, str) if order == 'name' else (int, str, str)
+    if len(key) != len(expected) or not all(
+        isinstance(part, kind) or (part is None and kind is str) for part, kind in zip(key, expected)
+    ):
+        raise ValueError("Invalid cursor")
+    return order, tuple(key)
+
+
+class PersonPages:
+    """
+    Sorted Person children per subfield, built lazily per (subfield, order)
+    for one graph version.
+    """
+
+    def __init__(self, index: GraphIndex):
+        self.index = index
+        self._sorted: Dict[Tuple[str, str], Tuple[List[Tuple], List[Dict]]] = {}
+
+    def _people(self, node_id: str, order: str) -> Tuple[List[Tuple], List[Dict]]:
+        cache_key = (node_id, order)
+        entry = self._sorted.get(cache_key)
+        if entry is None:
+            node = self.index.nodes[node_id]
+            people = {}
+            for child in node.get('children', []):
+                if child.get('type') == 'Person':
+                    people.setdefault(child.get('id'), child)
+            ranked = sorted((person_sort_key(person, order), person) for person in people.values())
+            entry = ([key for key, _ in ranked], [person for _, person in ranked])
+            self._sorted[cache_key] = entry
+        return entry
+
+    def page(self, node_id: str, order: str = 'citations', limit: int = DEFAULT_PEOPLE_LIMIT,
+             cursor: Optional[str] = None) -> Optional[Dict]:
+        """
+        One page of a node's Person children.
+
+        Args:
+            node_id: Id of the subfield
+            order: One of PERSON_ORDERS; ignored when a cursor is given
+            limit: Page size
+            cursor: 'nextCursor' of the previous page
+
+        Returns:
+            Dict with 'people' (copies), 'total', 'order' and 'nextCursor'
+            (None on the last page), or None when the node is unknown
+        """
+        if node_id not in self.index:
+            return None
+        if cursor:
+            order, after = decode_cursor(cursor)
+            keys, people = self._people(node_id, order)
+            start = bisect.bisect_right(keys, after)
+        else:
+            if order not in PERSON_ORDERS:
+                raise ValueError(f"order must be one of: {', '.join(PERSON_ORDERS)}")
+            keys, people = self._people(node_id, order)
+            start = 0
+
+        stop = start + max(limit, 0)
+        return {
+            'people': [copy_node(person) for person in people[start:stop]],
+            'total': len(people),
+            'offset': start,
+            'order': order,
+            'nextCursor': encode_cursor(order, keys[stop - 1]) if stop < len(people) and stop > start else None,
+        }
+
+
+def trim_people(graph: Dict, pages: PersonPages, limit: int = DEFAULT_PEOPLE_LIMIT) -> Dict:
+    """
+    View of a graph in which every node keeps only its ``limit`` most cited
+    Person children. Trimmed nodes get 'childCount', 'hasMore' and the
+    'nextCursor' for the people endpoint. Nodes that are not trimmed are
+    shared with the source graph.
+    """
+
+    def visit(node: Dict) -> Dict:
+        children = node.get('children')
+        if not children:
+            return node
+        if any(child.get('type') == 'Person' for child in children):
+            page = pages.page(node['id'], 'citations', limit)
+            if page['total'] <= limit:
+                return node
+            others = [child for child in children if child.get('type') != 'Person']
+            trimmed = {key: value for key, value in node.items() if key != 'children'}
+            trimmed['children'] = [visit(child) for child in others] + page['people']
+            trimmed['childCount'] = len(others) + page['total']
+            trimmed['hasMore'] = True
+            trimmed['nextCursor'] = page['nextCursor']
+            return trimmed
+        visited = [visit(child) for child in children]
+        if all(new is old for new, old in zip(visited, children)):
+            return node
+        return dict(node, children=visited)
+
+    view = dict(graph)
+    view['@graph'] = [visit(node) for node in graph.get('@graph', [])]
+    return view
@@ -3,11 +3,24 @@ Knowledge Graph API routes for Flask application.
 This module provides endpoints for the hierarchical knowledge graph visualization.
 """
 
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, request, jsonify, send_file
+import hashlib
 import logging
-import json
 import os
+import threading
+import time
 from datetime import datetime
+from knowledge_graph_builder import DynamicKnowledgeGraph, compact_graph
+from knowledge_graph_export import (
+    cytoscape_elements, element_count, iter_cytoscape_json, iter_graphml, parse_collapsed
+)
+from knowledge_graph_index import collapse_node
+from knowledge_graph_layout import radial_layout
+from knowledge_graph_neighborhood import AdjacencyIndex, DEFAULT_DEPTH, DEFAULT_LIMIT, MAX_DEPTH, MAX_NODES
+from knowledge_graph_pagination import DEFAULT_PEOPLE_LIMIT, PersonPages, trim_people
+from knowledge_graph_search import GraphSearchIndex
+from knowledge_graph_stats import graph_statistics
+from knowledge_graph_store import GraphFileLoader, GraphSnapshot
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,17 +34,12 @@ DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 KNOWLEDGE_GRAPH_FILE = os.path.join(DATA_DIR, 'knowledge-graph.example.json')
 
 def load_knowledge_graph():
-    """Load the knowledge graph from the JSON file."""
-    try:
-        if os.path.exists(KNOWLEDGE_GRAPH_FILE):
-            with open(KNOWLEDGE_GRAPH_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        else:
-            logger.warning(f"Knowledge graph file not found: {KNOWLEDGE_GRAPH_FILE}")
-            return get_default_knowledge_graph()
-    except Exception as e:
-        logger.error(f"Error loading knowledge graph: {e}")
-        return get_default_knowledge_graph()
+    """
+    Load the knowledge graph from the JSON file.
+    The parsed graph is cached and reloaded only when the file changes; it is
+    read-only, so copy nodes (or use graph_view) before changing them.
+    """
+    return _static_graph.snapshot().graph
 
 def get_default_knowledge_graph():
     """Return a minimal default knowledge graph if file is not found."""
@@ -73,11 +81,16 @@ def get_default_knowledge_graph():
         }
     }
 
-def build_hierarchical_graph_from_professors(professors_data):
+# Parsed static graph, re-read when the file's mtime changes
+_static_graph = GraphFileLoader(KNOWLEDGE_GRAPH_FILE, lambda: get_default_knowledge_graph())
+
+def build_hierarchical_graph_from_professors(professors_data, version=None):
     """
     Build a knowledge graph from professor domain expertise data.
     STRICTLY enforces hierarchy: Field -> Subfield -> Person
     Every Field MUST have at least one Subfield (no orphans).
+    Subfields that share many professors are linked with RELATED_TO
+    relationships; these are cached per data version when one is given.
     """
     import database
     
@@ -89,258 +102,72 @@ def build_hierarchical_graph_from_professors(professors_data):
             logger.error(f"Error loading professors: {e}")
             professors_data = []
     
-    # Define field-to-subfield mappings for common research areas
-    # This maps subfield keywords to their parent field
-    SUBFIELD_TO_FIELD_MAP = {
-        # Machine Learning & AI
-        'machine learning': 'Artificial Intelligence',
-        'deep learning': 'Artificial Intelligence',
-        'neural network': 'Artificial Intelligence',
-        'nlp': 'Artificial Intelligence',
-        'natural language processing': 'Artificial Intelligence',
-        'computer vision': 'Artificial Intelligence',
-        'reinforcement learning': 'Artificial Intelligence',
-        'artificial intelligence': 'Artificial Intelligence',
-        'pattern recognition': 'Artificial Intelligence',
-        'image processing': 'Artificial Intelligence',
-        'speech recognition': 'Artificial Intelligence',
-        'robotics': 'Artificial Intelligence',
-        
-        # Data Science
-        'data mining': 'Data Science',
-        'data analytics': 'Data Science',
-        'big data': 'Data Science',
-        'data science': 'Data Science',
-        'statistics': 'Data Science',
-        'predictive analytics': 'Data Science',
-        
-        # Cloud & Distributed Systems
-        'cloud computing': 'Cloud & Distributed Systems',
-        'distributed systems': 'Cloud & Distributed Systems',
-        'edge computing': 'Cloud & Distributed Systems',
-        'fog computing': 'Cloud & Distributed Systems',
-        'virtualization': 'Cloud & Distributed Systems',
-        'containerization': 'Cloud & Distributed Systems',
-        'microservices': 'Cloud & Distributed Systems',
-        
-        # Cybersecurity
-        'cybersecurity': 'Cybersecurity',
-        'network security': 'Cybersecurity',
-        'cryptography': 'Cybersecurity',
-        'information security': 'Cybersecurity',
-        'malware': 'Cybersecurity',
-        'intrusion detection': 'Cybersecurity',
-        'blockchain': 'Cybersecurity',
-        
-        # Networks & Communications
-        'computer networks': 'Networks & Communications',
-        'wireless networks': 'Networks & Communications',
-        'sensor networks': 'Networks & Communications',
-        'iot': 'Networks & Communications',
-        'internet of things': 'Networks & Communications',
-        '5g': 'Networks & Communications',
-        'mobile computing': 'Networks & Communications',
-        'adhoc networks': 'Networks & Communications',
-        'vanet': 'Networks & Communications',
-        'manet': 'Networks & Communications',
-        'wsn': 'Networks & Communications',
-        'wireless sensor': 'Networks & Communications',
-        
-        # Software Engineering
-        'software engineering': 'Software Engineering',
-        'software testing': 'Software Engineering',
-        'agile': 'Software Engineering',
-        'devops': 'Software Engineering',
-        'software quality': 'Software Engineering',
-        
-        # Signal & Image Processing
-        'signal processing': 'Signal & Image Processing',
-        'image analysis': 'Signal & Image Processing',
-        'digital signal': 'Signal & Image Processing',
-        'bio-signal': 'Signal & Image Processing',
-        'medical imaging': 'Signal & Image Processing',
-        
-        # Hardware & VLSI
-        'vlsi': 'Hardware & Electronics',
-        'embedded systems': 'Hardware & Electronics',
-        'fpga': 'Hardware & Electronics',
-        'circuit design': 'Hardware & Electronics',
-        'semiconductor': 'Hardware & Electronics',
-        'mems': 'Hardware & Electronics',
-        'antenna': 'Hardware & Electronics',
-        
-        # Databases
-        'database': 'Database Systems',
-        'sql': 'Database Systems',
-        'nosql': 'Database Systems',
-        'data warehouse': 'Database Systems',
-        
-        # HCI & Graphics
-        'human computer interaction': 'HCI & Visualization',
-        'hci': 'HCI & Visualization',
-        'computer graphics': 'HCI & Visualization',
-        'visualization': 'HCI & Visualization',
-        'virtual reality': 'HCI & Visualization',
-        'augmented reality': 'HCI & Visualization',
-        
-        # Bioinformatics
-        'bioinformatics': 'Computational Biology',
-        'computational biology': 'Computational Biology',
-        'genomics': 'Computational Biology',
-        'healthcare': 'Computational Biology',
-        
-        # Optimization & Algorithms
-        'optimization': 'Algorithms & Theory',
-        'algorithm': 'Algorithms & Theory',
-        'computational complexity': 'Algorithms & Theory',
-        'graph theory': 'Algorithms & Theory',
-    }
-    
-    # Field colors
-    FIELD_COLORS = {
-        'Artificial Intelligence': '#8B5CF6',
-        'Data Science': '#10B981',
-        'Cloud & Distributed Systems': '#A855F7',
-        'Cybersecurity': '#6366F1',
-        'Networks & Communications': '#84CC16',
-        'Software Engineering': '#14B8A6',
-        'Signal & Image Processing': '#F59E0B',
-        'Hardware & Electronics': '#EC4899',
-        'Database Systems': '#F97316',
-        'HCI & Visualization': '#06B6D4',
-        'Computational Biology': '#22C55E',
-        'Algorithms & Theory': '#EAB308',
-        'General Computing': '#6B7280',
-    }
-    
-    def get_parent_field(domain_str):
-        """Determine parent field for a domain/subfield"""
-        domain_lower = domain_str.lower()
-        for keyword, field in SUBFIELD_TO_FIELD_MAP.items():
-            if keyword in domain_lower:
-                return field
-        return 'General Computing'  # Default field for unclassified domains
-    
-    # Build hierarchy: Field -> Subfield -> Professors
-    # Structure: { field_name: { subfield_name: [professor_nodes] } }
-    hierarchy = {}
-    professor_nodes_map = {}
-    
-    for prof in professors_data:
-        if not prof.get('domain_expertise'):
-            continue
-        
-        prof_id = prof.get('id', '')
-        
-        # Create professor node (only once per professor)
-        if prof_id not in professor_nodes_map:
-            professor_nodes_map[prof_id] = {
-                "id": f"person-{prof_id}",
-                "type": "Person",
-                "label": prof.get('name', 'Unknown'),
-                "description": prof.get('research_interests', ''),
-                "email": prof.get('email', ''),
-                "college": prof.get('college', ''),
-                "citations": prof.get('citations_count', 0),
-                "hIndex": prof.get('h_index', 0),
-                "i10Index": prof.get('i10_index', 0),
-                "scholarUrl": prof.get('google_scholar_url', ''),
-                "profilePicture": prof.get('profile_picture_url', '') or prof.get('scholar_profile_picture', ''),
-                "profileLink": prof.get('profile_link', ''),
-                "domainExpertise": prof.get('domain_expertise', ''),
-                "phdThesis": prof.get('phd_thesis', ''),
-                "professorData": prof
-            }
-        
-        # Parse domain expertise - each domain becomes a subfield
-        domains = [d.strip() for d in prof.get('domain_expertise', '').split(',') if d.strip()]
-        
-        for domain in domains:
-            # Determine parent field
-            parent_field = get_parent_field(domain)
-            
-            # Initialize field if not exists
-            if parent_field not in hierarchy:
-                hierarchy[parent_field] = {}
-            
-            # Initialize subfield if not exists
-            if domain not in hierarchy[parent_field]:
-                hierarchy[parent_field][domain] = {
-                    "professor_ids": set(),
-                    "professors": []
-                }
-            
-            # Add professor to this subfield (avoid duplicates)
-            if prof_id not in hierarchy[parent_field][domain]["professor_ids"]:
-                hierarchy[parent_field][domain]["professor_ids"].add(prof_id)
-                hierarchy[parent_field][domain]["professors"].append(professor_nodes_map[prof_id].copy())
-    
-    # Convert hierarchy to graph format: Field -> Subfield -> Person
-    field_nodes = []
+    graph = DynamicKnowledgeGraph()
+    graph.update(professors_data, version)
+    return graph.graph
+
+
+# Dynamic graph kept across requests and updated when the professor index changes
+_dynamic_graph = DynamicKnowledgeGraph()
+_dynamic_graph_lock = threading.Lock()
+_dynamic_snapshot = None
+
+# Payload shapes accepted by the format parameter of /api/knowledge-graph
+GRAPH_FORMATS = ('full', 'compact', 'columnar')
+
+def get_dynamic_graph(payload_format='full'):
+    """
+    Get the dynamic knowledge graph for the current professor data version.
+    Only subfields and fields touched by changed professors are rebuilt.
+    The returned graph is shared and must not be mutated.
+    """
+    global _dynamic_snapshot
+    from professor_routes import get_professor_index
+    index = get_professor_index()
     
-    for field_name, subfields in hierarchy.items():
-        subfield_nodes = []
-        total_professors = 0
-        total_citations = 0
-        
-        for subfield_name, subfield_data in subfields.items():
-            professors = subfield_data["professors"]
-            if not professors:
-                continue
-                
-            # Sort professors by citations
-            professors.sort(key=lambda x: x.get("citations", 0), reverse=True)
-            
-            subfield_node = {
-                "id": f"subfield-{subfield_name.lower().replace(' ', '-').replace('/', '-').replace('&', 'and')}",
-                "type": "Subfield",
-                "label": subfield_name,
-                "children": professors,
-                "professorCount": len(professors),
-                "totalCitations": sum(p.get("citations", 0) for p in professors)
-            }
-            subfield_nodes.append(subfield_node)
-            total_professors += len(professors)
-            total_citations += subfield_node["totalCitations"]
-        
-        # IMPORTANT: Only add field if it has at least one subfield with professors
-        if subfield_nodes:
-            # Sort subfields by professor count
-            subfield_nodes.sort(key=lambda x: x["professorCount"], reverse=True)
-            
-            field_node = {
-                "id": f"field-{field_name.lower().replace(' ', '-').replace('&', 'and')}",
-                "type": "Field",
-                "label": field_name,
-                "color": FIELD_COLORS.get(field_name, '#6B7280'),
-                "children": subfield_nodes,
-                "subfieldCount": len(subfield_nodes),
-                "professorCount": total_professors,
-                "totalCitations": total_citations
-            }
-            field_nodes.append(field_node)
+    with _dynamic_graph_lock:
+        if _dynamic_graph.graph is None or _dynamic_graph.version != index.version:
+            start_time = time.time()
+            changes = _dynamic_graph.update(index.professors, index.version)
+            _dynamic_snapshot = GraphSnapshot(_dynamic_graph.graph, index.version, 'dynamic')
+            logger.info(f"Updated dynamic knowledge graph to v{index.version}: "
+                        f"{len(changes['subfields'])} subfields, {len(changes['fields'])} fields rebuilt "
+                        f"in {time.time() - start_time:.3f}s")
+        if payload_format == 'full':
+            return _dynamic_graph.graph
+        return _dynamic_graph.compact(columnar=payload_format == 'columnar')
+
+def graph_view(graph_data, field_filter=None, expand='all'):
+    """
+    Apply the field filter and expand options to a graph.
+    Returns a new top-level dict and copies only the nodes it changes, so
+    cached graphs are never modified.
+    """
+    view = dict(graph_data)
+    if '@graph' not in view:
+        return view
+    nodes = view['@graph']
     
-    # Sort fields by professor count
-    field_nodes.sort(key=lambda x: x["professorCount"], reverse=True)
+    # Filter to specific field if requested
+    if field_filter:
+        filtered = [node for node in nodes if node.get('id') == field_filter]
+        if filtered:
+            nodes = filtered
     
-    # Calculate totals
-    total_subfields = sum(f["subfieldCount"] for f in field_nodes)
+    # Handle expand parameter for lazy loading
+    if expand == 'none':
+        # Remove children for collapsed view
+        nodes = [collapse_node(node) if 'children' in node else node for node in nodes]
+    elif expand != 'all':
+        # Expand only specified fields
+        expand_ids = set(expand.split(','))
+        nodes = [
+            collapse_node(node) if node.get('id') not in expand_ids and 'children' in node else node
+            for node in nodes
+        ]
     
-    return {
-        "@context": {
-            "@vocab": "https://schema.org/",
-            "kg": "https://example.org/knowledge-graph/"
-        },
-        "@graph": field_nodes,
-        "metadata": {
-            "version": "2.0.0",
-            "generated": datetime.now().isoformat(),
-            "totalFields": len(field_nodes),
-            "totalSubfields": total_subfields,
-            "totalProfessors": len(professor_nodes_map),
-            "hierarchy": "Field -> Subfield -> Person"
-        }
-    }
+    view['@graph'] = nodes
+    return view
 
 
 @knowledge_graph_bp.route('/api/knowledge-graph', methods=['GET'])
@@ -353,6 +180,12 @@ def get_knowledge_graph():
         - include_professors: 'true' or 'false' (include professor nodes)
         - field: filter to specific field ID
         - expand: 'all', 'none', or comma-separated field IDs to expand
+        - format: 'full' (default) embeds Person nodes under every subfield;
+                  'compact' lists person ids per subfield with one 'people' table;
+                  'columnar' is compact with row numbers and a column-oriented table
+        - people: Person nodes per subfield in the dynamic graph (default 20, most
+                  cited first) or 'all'; trimmed subfields carry 'hasMore' and a
+                  'nextCursor' for /api/knowledge-graph/subfield/<id>/people
     
     Returns:
         JSON-LD formatted knowledge graph
@@ -362,53 +195,59 @@ def get_knowledge_graph():
         include_professors = request.args.get('include_professors', 'false').lower() == 'true'
         field_filter = request.args.get('field', None)
         expand = request.args.get('expand', 'all')
-        
-        if source == 'dynamic':
-            # Build graph from professor data
-            import database
-            professors = database.load_professors_data()
-            graph_data = build_hierarchical_graph_from_professors(professors)
+        payload_format = request.args.get('format', 'full')
+        people = request.args.get('people', str(DEFAULT_PEOPLE_LIMIT))
+        
+        if payload_format not in GRAPH_FORMATS:
+            return jsonify({'error': f"format must be one of: {', '.join(GRAPH_FORMATS)}"}), 400
+        if people != 'all' and not people.isdigit():
+            return jsonify({'error': "people must be a number or 'all'"}), 400
+        people_limit = None if people == 'all' else int(people)
+        
+        # The unfiltered dynamic graph is served as cached, in the requested shape
+        serve_cached = source == 'dynamic' and not field_filter and expand == 'all'
+        
+        snapshot = get_graph_snapshot('dynamic' if source == 'dynamic' else 'static')
+        versions = [snapshot.source, snapshot.version]
+        if source != 'dynamic' and include_professors:
+            try:
+                versions.append(get_graph_snapshot('dynamic').version)
+            except Exception as e:
+                # Served without professor data below; keep the ETag of that response
+                logger.warning(f"Could not load professor data version: {e}")
+        etag = graph_etag(*versions, sorted(request.args.items(multi=True)))
+        if request.if_none_match.contains(etag):
+            return not_modified(etag)
+        
+        if source == 'dynamic' and people_limit is not None:
+            if serve_cached:
+                graph_data = dict(get_people_view(snapshot, people_limit, payload_format))
+            else:
+                graph_data = graph_view(get_people_view(snapshot, people_limit), field_filter, expand)
+        elif serve_cached:
+            graph_data = dict(get_dynamic_graph(payload_format))
         else:
-            # Load static knowledge graph
-            graph_data = load_knowledge_graph()
+            graph_data = graph_view(snapshot.graph, field_filter, expand)
             
-            # Optionally merge with professor data
-            if include_professors:
+            # Optionally merge professor data into the static graph
+            if source != 'dynamic' and include_professors:
                 try:
-                    import database
-                    professors = database.load_professors_data()
-                    prof_graph = build_hierarchical_graph_from_professors(professors)
+                    prof_graph = get_dynamic_graph()
                     graph_data['professors'] = prof_graph.get('professors', [])
                     graph_data['professorFields'] = prof_graph.get('@graph', [])
                 except Exception as e:
                     logger.warning(f"Could not include professor data: {e}")
         
-        # Filter to specific field if requested
-        if field_filter and '@graph' in graph_data:
-            filtered = [node for node in graph_data['@graph'] if node.get('id') == field_filter]
-            if filtered:
-                graph_data['@graph'] = filtered
+        if payload_format != 'full' and not serve_cached:
+            graph_data = compact_graph(graph_data, columnar=payload_format == 'columnar')
         
-        # Handle expand parameter for lazy loading
-        if expand == 'none' and '@graph' in graph_data:
-            # Remove children for collapsed view
-            for node in graph_data['@graph']:
-                if 'children' in node:
-                    node['hasChildren'] = len(node['children']) > 0
-                    node['childCount'] = len(node['children'])
-                    del node['children']
-        elif expand != 'all' and '@graph' in graph_data:
-            # Expand only specified fields
-            expand_ids = set(expand.split(','))
-            for node in graph_data['@graph']:
-                if node.get('id') not in expand_ids and 'children' in node:
-                    node['hasChildren'] = len(node['children']) > 0
-                    node['childCount'] = len(node['children'])
-                    del node['children']
+        # Statistics of the whole graph version travel with its metadata
+        graph_data['metadata'] = dict(graph_data.get('metadata') or {}, stats=get_graph_stats(snapshot))
         
         # Set cache headers for performance
         response = jsonify(graph_data)
         response.headers['Cache-Control'] = 's-maxage=60, stale-while-revalidate=300'
+        response.set_etag(etag)
         return response
         
     except Exception as e:
@@ -419,26 +258,76 @@ def get_knowledge_graph():
         }), 500
 
 
+def get_graph_snapshot(source='static'):
+    """
+    Get the current snapshot of the static or dynamic graph.
+    Derived artefacts (node index, statistics, ...) are cached on the snapshot
+    and rebuilt only when the graph changes.
+    """
+    if source == 'dynamic':
+        get_dynamic_graph()
+        return _dynamic_snapshot
+    return _static_graph.snapshot()
+
+
+def get_graph_stats(snapshot):
+    """Statistics bundle of a snapshot, computed once per graph version"""
+    return snapshot.artifact('stats', lambda graph: graph_statistics(graph, snapshot.index))
+
+
+def get_person_pages(snapshot):
+    """Sorted people per subfield of a snapshot, for cursor pagination"""
+    return snapshot.artifact('person_pages', lambda graph: PersonPages(snapshot.index))
+
+
+def get_people_view(snapshot, limit, payload_format='full'):
+    """
+    Graph of a snapshot with at most ``limit`` people per subfield, in the
+    requested payload shape. The default page size is cached per graph version.
+    """
+    def build(graph):
+        trimmed = trim_people(graph, get_person_pages(snapshot), limit)
+        if payload_format == 'full':
+            return trimmed
+        return compact_graph(trimmed, columnar=payload_format == 'columnar')
+    
+    if limit == DEFAULT_PEOPLE_LIMIT:
+        return snapshot.artifact(f'people:{payload_format}', build)
+    return build(snapshot.graph)
+
+
+def graph_etag(*parts):
+    """ETag for a response derived from the given graph versions and options"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:20]
+
+
+def not_modified(etag):
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+
 @knowledge_graph_bp.route('/api/knowledge-graph/field/<field_id>', methods=['GET'])
 def get_field_details(field_id):
     """
     Get details for a specific field including its children.
     Used for lazy loading of subtrees.
+    
+    Query Parameters:
+        - source: 'static' (default) or 'dynamic'
+        - depth: levels of descendants to include (default: whole subtree)
+        - offset: first direct child to include (default 0)
+        - limit: maximum number of direct children to include
     """
     try:
-        graph_data = load_knowledge_graph()
-        
-        def find_node(nodes, target_id):
-            for node in nodes:
-                if node.get('id') == target_id:
-                    return node
-                if 'children' in node:
-                    found = find_node(node['children'], target_id)
-                    if found:
-                        return found
-            return None
+        source = request.args.get('source', 'static')
+        depth = request.args.get('depth', None, type=int)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = request.args.get('limit', None, type=int)
         
-        node = find_node(graph_data.get('@graph', []), field_id)
+        index = get_graph_snapshot(source).index
+        node = index.subtree(field_id, depth=depth, offset=offset,
+                             limit=max(limit, 0) if limit is not None else None)
         
         if node:
             return jsonify(node)
@@ -450,64 +339,155 @@ def get_field_details(field_id):
         return jsonify({'error': str(e)}), 500
 
 
+@knowledge_graph_bp.route('/api/knowledge-graph/subfield/<node_id>/people', methods=['GET'])
+def get_subfield_people(node_id):
+    """
+    Page through the Person children of a subfield.
+    
+    Query Parameters:
+        - source: 'dynamic' (default) or 'static'
+        - order: 'citations' (default), 'hIndex' or 'name'
+        - limit: page size (default 20)
+        - cursor: 'nextCursor' of the previous page (or of the graph response)
+    """
+    try:
+        source = request.args.get('source', 'dynamic')
+        order = request.args.get('order', 'citations')
+        limit = max(request.args.get('limit', DEFAULT_PEOPLE_LIMIT, type=int), 0)
+        cursor = request.args.get('cursor') or None
+        
+        snapshot = get_graph_snapshot(source)
+        try:
+            page = get_person_pages(snapshot).page(node_id, order=order, limit=limit, cursor=cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if page is None:
+            return jsonify({'error': 'Subfield not found'}), 404
+        return jsonify(dict(page, id=node_id, version=snapshot.version))
+        
+    except Exception as e:
+        logger.error(f"Error getting subfield people: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@knowledge_graph_bp.route('/api/knowledge-graph/neighborhood/<node_id>', methods=['GET'])
+def get_node_neighborhood(node_id):
+    """
+    Get the local neighbourhood of a node: its parents, children and related
+    nodes, up to a few hops away.
+    Answered by a bounded breadth-first search over an adjacency index built
+    once per graph version.
+    
+    Query Parameters:
+        - source: 'static' (default) or 'dynamic'
+        - depth: number of hops (default 1, at most 3)
+        - limit: new neighbours expanded per node (default 25)
+    """
+    try:
+        source = request.args.get('source', 'static')
+        depth = min(max(request.args.get('depth', DEFAULT_DEPTH, type=int), 0), MAX_DEPTH)
+        limit = min(max(request.args.get('limit', DEFAULT_LIMIT, type=int), 0), MAX_NODES)
+        
+        snapshot = get_graph_snapshot(source)
+        adjacency = snapshot.artifact('adjacency', lambda graph: AdjacencyIndex(graph, snapshot.index))
+        result = adjacency.neighborhood(node_id, depth=depth, limit=limit)
+        
+        if result is None:
+            return jsonify({'error': 'Node not found'}), 404
+        return jsonify(dict(result, depth=depth, limit=limit, version=snapshot.version))
+        
+    except Exception as e:
+        logger.error(f"Error getting node neighborhood: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@knowledge_graph_bp.route('/api/knowledge-graph/changes', methods=['GET'])
+def get_graph_changes():
+    """
+    Get the changes to the dynamic knowledge graph since a version, so live
+    clients can patch their copy instead of reloading the whole graph.
+    Patches apply to the full graph (people=all); when the version is too old
+    to be in the change log, the response asks for a full reload.
+    
+    Query Parameters:
+        - since: graph version the client has (metadata.dataVersion)
+    """
+    try:
+        since = request.args.get('since', type=int)
+        if since is None:
+            return jsonify({'error': 'since must be a graph version number'}), 400
+        
+        get_dynamic_graph()
+        with _dynamic_graph_lock:
+            version = _dynamic_graph.version
+            patches = [] if since == version else _dynamic_graph.changes.since(since)
+        
+        if patches is None:
+            return jsonify({'since': since, 'version': version, 'reload': True, 'patches': []})
+        return jsonify({'since': since, 'version': version, 'reload': False, 'patches': patches})
+        
+    except Exception as e:
+        logger.error(f"Error getting knowledge graph changes: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@knowledge_graph_bp.route('/api/knowledge-graph/layout', methods=['GET'])
+def get_knowledge_graph_layout():
+    """
+    Get precomputed node positions for the knowledge graph.
+    The radial tree layout is computed once per graph version, so the client
+    only has to render.
+    
+    Query Parameters:
+        - source: 'static' (default) or 'dynamic'
+    
+    Returns:
+        Parallel 'ids', 'x' and 'y' arrays and the layout bounds
+    """
+    try:
+        source = request.args.get('source', 'static')
+        snapshot = get_graph_snapshot(source)
+        layout = snapshot.artifact('layout', lambda graph: radial_layout(snapshot.index))
+        
+        response = jsonify(dict(layout, version=snapshot.version))
+        response.headers['Cache-Control'] = 's-maxage=60, stale-while-revalidate=300'
+        return response
+        
+    except Exception as e:
+        logger.error(f"Error getting knowledge graph layout: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @knowledge_graph_bp.route('/api/knowledge-graph/search', methods=['GET'])
 def search_knowledge_graph():
     """
     Search nodes in the knowledge graph.
+    Answered from an inverted index built once per graph version; results are
+    ranked exact label > label prefix > whole words > substring.
     
     Query Parameters:
         - q: search query string
         - type: filter by node type (Field, Subfield, Skill, Person)
         - limit: max results (default 20)
+        - source: 'static' (default) or 'dynamic'
     """
     try:
         query = request.args.get('q', '').lower()
         node_type = request.args.get('type', None)
         limit = int(request.args.get('limit', 20))
+        source = request.args.get('source', 'static')
         
         if not query:
             return jsonify({'results': [], 'total': 0})
         
-        graph_data = load_knowledge_graph()
-        results = []
-        
-        def search_nodes(nodes, parent_id=None):
-            for node in nodes:
-                # Check type filter
-                if node_type and node.get('type') != node_type:
-                    if 'children' in node:
-                        search_nodes(node['children'], node.get('id'))
-                    continue
-                
-                # Search in label and description
-                label = node.get('label', '').lower()
-                description = node.get('description', '').lower()
-                
-                if query in label or query in description:
-                    results.append({
-                        'id': node.get('id'),
-                        'type': node.get('type'),
-                        'label': node.get('label'),
-                        'description': node.get('description', ''),
-                        'parentId': parent_id,
-                        'hasChildren': 'children' in node and len(node['children']) > 0
-                    })
-                
-                # Recurse into children
-                if 'children' in node:
-                    search_nodes(node['children'], node.get('id'))
-        
-        search_nodes(graph_data.get('@graph', []))
-        
-        # Sort by relevance (exact matches first, then partial)
-        results.sort(key=lambda x: (
-            0 if x['label'].lower() == query else 1,
-            0 if x['label'].lower().startswith(query) else 1
-        ))
+        search_index = get_graph_snapshot(source).artifact('search', GraphSearchIndex)
+        result = search_index.search(query, node_type=node_type, limit=max(limit, 0))
         
         return jsonify({
-            'results': results[:limit],
-            'total': len(results),
+            'results': result['results'],
+            'total': result['total'],
+            'facets': result['facets'],
             'query': query
         })
         
@@ -516,17 +496,56 @@ def search_knowledge_graph():
         return jsonify({'error': str(e)}), 500
 
 
+# Exports with more elements than this are streamed as a chunked response
+STREAM_MIN_ELEMENTS = 2000
+
+def get_export_elements(snapshot, collapsed=frozenset()):
+    """
+    Cytoscape elements of a graph snapshot.
+    The fully expanded conversion is cached per graph version; views with
+    collapsed nodes only walk the visible part of the graph.
+    """
+    if not collapsed:
+        return snapshot.artifact('cytoscape', cytoscape_elements)
+    return cytoscape_elements(snapshot.graph, collapsed)
+
+
 @knowledge_graph_bp.route('/api/knowledge-graph/export', methods=['GET'])
 def export_knowledge_graph():
     """
     Export the knowledge graph in various formats.
     
     Query Parameters:
-        - format: 'json' (default), 'jsonld'
+        - format: 'json' (default), 'jsonld', 'cytoscape' (elements ready for
+                  cy.add) or 'graphml'
+        - source: 'static' (default) or 'dynamic'
+        - collapsed: comma-separated node ids whose children are left out
+                     (cytoscape and graphml only)
+    
+    Large cytoscape and graphml exports are streamed in chunks.
     """
     try:
         export_format = request.args.get('format', 'json')
-        graph_data = load_knowledge_graph()
+        source = request.args.get('source', 'static')
+        
+        if export_format in ('cytoscape', 'graphml'):
+            snapshot = get_graph_snapshot(source)
+            elements = get_export_elements(snapshot, parse_collapsed(request.args.get('collapsed')))
+            
+            if export_format == 'graphml':
+                chunks, mimetype, filename = iter_graphml(elements), 'application/graphml+xml', 'knowledge-graph.graphml'
+            else:
+                chunks, mimetype, filename = iter_cytoscape_json(elements), 'application/json', 'knowledge-graph.cyjs'
+            
+            if element_count(elements) < STREAM_MIN_ELEMENTS:
+                response = Response(''.join(chunks), mimetype=mimetype)
+            else:
+                response = Response(chunks, mimetype=mimetype)
+            response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+            response.headers['X-Graph-Version'] = str(snapshot.version)
+            return response
+        
+        graph_data = get_graph_snapshot(source).graph
         
         if export_format == 'jsonld':
             # Return full JSON-LD with context
@@ -549,36 +568,20 @@ def export_knowledge_graph():
 def get_knowledge_graph_stats():
     """
     Get statistics about the knowledge graph.
+    Served from the bundle computed once per graph version.
+    
+    Query Parameters:
+        - source: 'static' (default) or 'dynamic'
     """
     try:
-        graph_data = load_knowledge_graph()
+        snapshot = get_graph_snapshot(request.args.get('source', 'static'))
+        etag = graph_etag(snapshot.source, snapshot.version, 'stats')
+        if request.if_none_match.contains(etag):
+            return not_modified(etag)
         
-        stats = {
-            'totalFields': 0,
-            'totalSubfields': 0,
-            'totalSkills': 0,
-            'maxDepth': 0,
-            'totalRelationships': len(graph_data.get('relationships', []))
-        }
-        
-        def count_nodes(nodes, depth=1):
-            for node in nodes:
-                node_type = node.get('type', '')
-                if node_type == 'Field':
-                    stats['totalFields'] += 1
-                elif node_type == 'Subfield':
-                    stats['totalSubfields'] += 1
-                elif node_type == 'Skill':
-                    stats['totalSkills'] += 1
-                
-                stats['maxDepth'] = max(stats['maxDepth'], depth)
-                
-                if 'children' in node:
-                    count_nodes(node['children'], depth + 1)
-        
-        count_nodes(graph_data.get('@graph', []))
-        
-        return jsonify(stats)
+        response = jsonify(dict(get_graph_stats(snapshot), version=snapshot.version))
+        response.set_etag(etag)
+        return response
         
     except Exception as e:
         logger.error(f"Error getting knowledge graph stats: {e}")
@@ -0,0 +1,154 @@
+"""
+Inverted search index over knowledge-graph nodes.
+Built once per graph version, it answers label/description searches from
+posting lists instead of walking the tree: exact labels and label prefixes
+come from a sorted label list, whole-word matches from a token index, and
+arbitrary substrings from a trigram index whose candidates are verified
+(queries shorter than three characters use a 1- and 2-gram index).
+"""
+
+import bisect
+import re
+from typing import Dict, List, Optional, Set
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+# Match tiers, best first
+MATCH_TYPES = ('exact', 'prefix', 'token', 'substring')
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text)
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _short_grams(text: str) -> Set[str]:
+    """All 1- and 2-character substrings, for queries too short for trigrams"""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class GraphSearchIndex:
+    """
+    Token, prefix and trigram indexes over node labels and descriptions.
+
+    Nodes are numbered in tree order; a node id listed under several parents
+    is indexed once, at its first occurrence.
+    """
+
+    def __init__(self, graph: Dict):
+        self.entries: List[Dict] = []
+        self._texts: List[str] = []
+        self._labels: List[str] = []
+        self._tokens: Dict[str, Set[int]] = {}
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._short_grams: Dict[str, Set[int]] = {}
+        self.type_counts: Dict[str, int] = {}
+
+        seen = set()
+        stack = [(node, None) for node in reversed(graph.get('@graph', []))]
+        while stack:
+            node, parent_id = stack.pop()
+            node_id = node.get('id')
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            self._add(node, parent_id)
+            for child in reversed(node.get('children', [])):
+                stack.append((child, node_id))
+
+        # Sorted (label, ordinal) pairs for exact and prefix lookups
+        self._sorted_labels = sorted((label, ordinal) for ordinal, label in enumerate(self._labels))
+
+    def _add(self, node: Dict, parent_id: Optional[str]):
+        ordinal = len(self.entries)
+        label = (node.get('label') or '').lower()
+        description = (node.get('description') or '').lower()
+        node_type = node.get('type')
+        self.entries.append({
+            'id': node.get('id'),
+            'type': node_type,
+            'label': node.get('label'),
+            'description': node.get('description', ''),
+            'parentId': parent_id,
+            'hasChildren': 'children' in node and len(node['children']) > 0
+        })
+        self._labels.append(label)
+        self._texts.append(f"{label}\n{description}")
+        self.type_counts[node_type] = self.type_counts.get(node_type, 0) + 1
+
+        for token in set(_tokens(label)) | set(_tokens(description)):
+            self._tokens.setdefault(token, set()).add(ordinal)
+        for trigram in _trigrams(label) | _trigrams(description):
+            self._trigrams.setdefault(trigram, set()).add(ordinal)
+        for gram in _short_grams(label) | _short_grams(description):
+            self._short_grams.setdefault(gram, set()).add(ordinal)
+
+    def _label_range(self, query: str, prefix: bool) -> List[int]:
+        start = bisect.bisect_left(self._sorted_labels, (query, -1))
+        ordinals = []
+        for label, ordinal in self._sorted_labels[start:]:
+            if label == query or (prefix and label.startswith(query)):
+                ordinals.append(ordinal)
+            else:
+                break
+        return ordinals
+
+    def _token_matches(self, tokens: List[str]) -> Set[int]:
+        postings = [self._tokens.get(token, set()) for token in tokens]
+        if not postings:
+            return set()
+        postings.sort(key=len)
+        return set.intersection(*postings)
+
+    def _substring_matches(self, query: str) -> Set[int]:
+        if len(query) < 3:
+            # Short queries are their own 1- or 2-gram, so the posting list is the answer
+            return set(self._short_grams.get(query, ()))
+        postings = [self._trigrams.get(trigram, set()) for trigram in _trigrams(query)]
+        postings.sort(key=len)
+        candidates = set.intersection(*postings) if postings[0] else set()
+        return {ordinal for ordinal in candidates if query in self._texts[ordinal]}
+
+    def search(self, query: str, node_type: Optional[str] = None, limit: Optional[int] = 20) -> Dict:
+        """
+        Rank nodes matching ``query``: exact label > label prefix > all query
+        words present as words > substring of label or description. Ties keep
+        tree order.
+
+        Returns:
+            Dict with 'results', 'total' and per-type 'facets' of all matches
+        """
+        query = query.strip().lower()
+        if not query:
+            return {'results': [], 'total': 0, 'facets': {}}
+
+        tiers: Dict[int, int] = {}
+        for tier, ordinals in enumerate((
+            self._label_range(query, prefix=False),
+            self._label_range(query, prefix=True),
+            self._token_matches(_tokens(query)),
+            self._substring_matches(query),
+        )):
+            for ordinal in ordinals:
+                tiers.setdefault(ordinal, tier)
+
+        facets: Dict[str, int] = {}
+        for ordinal in tiers:
+            entry_type = self.entries[ordinal]['type']
+            facets[entry_type] = facets.get(entry_type, 0) + 1
+
+        matches = [
+            ordinal for ordinal in tiers
+            if node_type is None or self.entries[ordinal]['type'] == node_type
+        ]
+        matches.sort(key=lambda ordinal: (tiers[ordinal], ordinal))
+
+        results = []
+        for ordinal in matches[:limit] if limit is not None else matches:
+            result = dict(self.entries[ordinal])
+            result['matchType'] = MATCH_TYPES[tiers[ordinal]]
+            results.append(result)
+        return {'results': results, 'total': len(matches), 'facets': facets}
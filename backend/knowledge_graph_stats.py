@@ -0,0 +1,107 @@
+"""
+Statistics bundle for a knowledge graph version.
+Computed once per graph snapshot from its node index: node counts by type,
+a depth histogram, per-field citation totals and percentiles, and the largest
+subfields. A Person listed under several subfields is counted once, and once
+per field it belongs to.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from knowledge_graph_index import GraphIndex
+
+# Citation percentiles reported per field
+PERCENTILES = (50, 90, 99)
+
+# Number of subfields listed in 'largestSubfields'
+LARGEST_SUBFIELDS = 10
+
+
+def _percentiles(values: List[int]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {f'p{q}': None for q in PERCENTILES}
+    points = np.percentile(np.asarray(values, dtype=np.float64), PERCENTILES)
+    return {f'p{q}': round(float(point), 2) for q, point in zip(PERCENTILES, points)}
+
+
+def graph_statistics(graph: Dict, index: Optional[GraphIndex] = None,
+                     largest: int = LARGEST_SUBFIELDS) -> Dict:
+    """
+    Compute the statistics bundle of a graph.
+
+    Args:
+        graph: Graph dict
+        index: Node index of the graph, built when not given
+        largest: Number of subfields to list in 'largestSubfields'
+
+    Returns:
+        Dict with the overall counts ('totalFields', 'totalSubfields', ...),
+        'typeCounts', 'depthHistogram' (node counts for depth 1, 2, ...),
+        'fields' and 'largestSubfields'
+    """
+    index = index if index is not None else GraphIndex(graph)
+
+    type_counts: Dict[str, int] = {}
+    depth_histogram = [0] * index.max_depth
+    # Top-level ancestor of every node; first parents precede children in index order
+    top: Dict[str, str] = {}
+    field_people: Dict[str, Dict[str, int]] = {}
+
+    for node_id, node in index.nodes.items():
+        node_type = node.get('type') or 'Unknown'
+        type_counts[node_type] = type_counts.get(node_type, 0) + 1
+        depth_histogram[index.depths[node_id] - 1] += 1
+
+        parents = index.parents[node_id]
+        top[node_id] = top[parents[0]] if parents else node_id
+
+    # Later parents of a shared node may come after it, so fields are assigned once top is complete
+    for node_id, node in index.nodes.items():
+        if node.get('type') == 'Person':
+            citations = int(node.get('citations') or 0)
+            for field_id in {top[parent] for parent in index.parents[node_id]}:
+                field_people.setdefault(field_id, {})[node_id] = citations
+
+    fields = []
+    for node in graph.get('@graph', []):
+        field_id = node.get('id')
+        if field_id not in index.nodes or index.nodes[field_id] is not node:
+            continue
+        citations = list(field_people.get(field_id, {}).values())
+        fields.append({
+            'id': field_id,
+            'label': node.get('label'),
+            'subfieldCount': sum(1 for child in node.get('children', []) if child.get('type') == 'Subfield'),
+            'professorCount': len(citations),
+            'totalCitations': int(sum(citations)),
+            'maxCitations': max(citations) if citations else 0,
+            'citationPercentiles': _percentiles(citations),
+        })
+
+    subfields = [
+        {
+            'id': node_id,
+            'label': node.get('label'),
+            'fieldId': top[node_id],
+            'childCount': len(node.get('children', [])),
+        }
+        for node_id, node in index.nodes.items()
+        if node.get('type') == 'Subfield'
+    ]
+    subfields.sort(key=lambda subfield: (-subfield['childCount'], subfield['label'] or ''))
+
+    return {
+        'totalFields': type_counts.get('Field', 0),
+        'totalSubfields': type_counts.get('Subfield', 0),
+        'totalSkills': type_counts.get('Skill', 0),
+        'totalPeople': type_counts.get('Person', 0),
+        'totalNodes': len(index.nodes),
+        'maxDepth': index.max_depth,
+        'totalRelationships': len(graph.get('relationships', [])),
+        'typeCounts': type_counts,
+        'depthHistogram': depth_histogram,
+        'fields': fields,
+        'largestSubfields': subfields[:largest],
+    }
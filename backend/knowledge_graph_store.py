@@ -0,0 +1,167 @@
+"""
+In-memory knowledge-graph snapshots.
+A snapshot is one version of a graph plus the artefacts derived from it
+(node index, statistics, ...), each built lazily at most once. The static
+graph file is parsed once, frozen, and re-read only when a periodic mtime
+check sees it change; the new snapshot replaces the old one in a single
+reference swap, so requests always see a complete graph.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from knowledge_graph_index import GraphIndex
+
+logger = logging.getLogger(__name__)
+
+# Seconds between mtime checks of the static graph file
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict. It still serializes as a plain JSON object, while any
+    attempt to modify it raises TypeError; ``dict(frozen)`` or ``thaw`` give
+    a mutable copy.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("knowledge graph snapshots are read-only; copy the node before changing it")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+    # dict's in-place |= would update the snapshot before any check; | is blocked for symmetry
+    __ior__ = __or__ = __ror__ = _readonly
+
+    def copy(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively turn dicts into FrozenDicts and lists into tuples"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable deep copy of a frozen value"""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+class GraphSnapshot:
+    """
+    One version of a graph and its derived artefacts.
+
+    Artefacts are computed on first use through ``artifact`` and kept for the
+    lifetime of the snapshot, so each is built once per graph version.
+    """
+
+    def __init__(self, graph: Dict, version, source: str):
+        self.graph = graph
+        self.version = version
+        self.source = source
+        self.loaded_at = time.time()
+        self._artifacts: Dict[str, Any] = {}
+        # Re-entrant: an artefact may be built from another one (e.g. the index)
+        self._lock = threading.RLock()
+
+    def artifact(self, name: str, build: Callable[[Dict], Any]) -> Any:
+        """Return the artefact ``name``, building it from the graph the first time"""
+        value = self._artifacts.get(name)
+        if value is None:
+            with self._lock:
+                value = self._artifacts.get(name)
+                if value is None:
+                    value = build(self.graph)
+                    self._artifacts[name] = value
+        return value
+
+    @property
+    def index(self) -> GraphIndex:
+        return self.artifact('index', GraphIndex)
+
+
+class GraphFileLoader:
+    """
+    Keeps the parsed contents of a graph JSON file in memory.
+
+    The file's mtime and size are polled at most every ``poll_interval``
+    seconds; when they change the file is parsed into a new frozen snapshot.
+    If the file is missing or invalid, the previous snapshot (or the
+    ``fallback`` graph) stays in service.
+    """
+
+    def __init__(self, path: str, fallback: Callable[[], Dict], poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.path = path
+        self.fallback = fallback
+        self.poll_interval = poll_interval
+        self._snapshot: Optional[GraphSnapshot] = None
+        self._stamp = None
+        self._checked_at = 0.0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def snapshot(self) -> GraphSnapshot:
+        """Current snapshot, reloading the file first if it changed"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.time() - self._checked_at < self.poll_interval:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is not None and time.time() - self._checked_at < self.poll_interval:
+                return self._snapshot
+            self._checked_at = time.time()
+            stamp = self._file_stamp()
+            if self._snapshot is not None and stamp == self._stamp:
+                return self._snapshot
+            self._reload(stamp)
+            return self._snapshot
+
+    def _reload(self, stamp):
+        if stamp is None:
+            if self._snapshot is None or self._stamp is not None:
+                logger.warning(f"Knowledge graph file not found: {self.path}")
+                self._publish(self.fallback(), stamp)
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                graph = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading knowledge graph: {e}")
+            if self._snapshot is None:
+                self._publish(self.fallback(), stamp)
+            else:
+                # Keep serving the previous graph until the file changes again
+                self._stamp = stamp
+            return
+        self._publish(graph, stamp)
+        logger.info(f"Loaded knowledge graph v{self._version} from {self.path}")
+
+    def _publish(self, graph: Dict, stamp):
+        self._version += 1
+        self._stamp = stamp
+        # Single reference swap: readers see either the old or the new snapshot
+        self._snapshot = GraphSnapshot(freeze(graph), self._version, 'static')
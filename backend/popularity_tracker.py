@@ -0,0 +1,279 @@
+"""
+In-process popularity tracking of professor detail views and search queries.
+
+Counts live in count-min sketches, so memory is bounded whatever the
+traffic, and a small heavy-hitter list per sketch remembers which keys are
+hot. Counts decay exponentially (forward decay: later events get larger
+weights, so nothing has to be rescaled on a timer), with one sketch per
+window half-life.
+
+Each worker process keeps its own tracker. With a shared directory, workers
+periodically write their state there and trending lists merge the sketches
+of every worker: count-min sketches with the same shape and hashing add up
+cell by cell.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Window name -> half-life in seconds
+DEFAULT_WINDOWS = {'hour': 3600, 'day': 86400, 'week': 7 * 86400}
+# Tracked kinds of keys
+KINDS = ('professor', 'query')
+
+DEFAULT_WIDTH = 2048
+DEFAULT_DEPTH = 4
+# Heavy-hitter candidates kept per sketch
+DEFAULT_CAPACITY = 100
+# Seconds between writes of this worker's state to the shared directory
+DEFAULT_FLUSH_INTERVAL = 30
+# Queries longer than this are cut, so one sketch key stays small
+MAX_QUERY_LENGTH = 100
+
+# Decay exponent (in half-lives) past which counts are moved to a new landmark
+_RENORMALIZE_AFTER = 64
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case, single-spaced query without surrounding punctuation"""
+    text = unicodedata.normalize('NFKC', str(query or '')).lower()
+    return " ".join(text.split()).strip(" .,;:!?\"'")[:MAX_QUERY_LENGTH]
+
+
+def sketch_indexes(key: str, depth: int, width: int) -> np.ndarray:
+    """
+    Column of ``key`` in each sketch row, by double hashing one BLAKE2 digest.
+    Stable across processes (unlike hash()), so sketches of different
+    workers can be merged.
+    """
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return np.array([(h1 + row * h2) % width for row in range(depth)], dtype=np.int64)
+
+
+class CountMinSketch:
+    """Count-min sketch: estimates never undercount, overcounts are bounded by width"""
+
+    def __init__(self, width: int = DEFAULT_WIDTH, depth: int = DEFAULT_DEPTH,
+                 counts: Optional[np.ndarray] = None):
+        self.width = width
+        self.depth = depth
+        self.counts = counts if counts is not None else np.zeros((depth, width), dtype=np.float64)
+        self._rows = np.arange(depth)
+
+    def add(self, indexes: np.ndarray, amount: float) -> float:
+        """Add to a key's cells and return its new estimate"""
+        self.counts[self._rows, indexes] += amount
+        return float(self.counts[self._rows, indexes].min())
+
+    def estimate(self, indexes: np.ndarray) -> float:
+        return float(self.counts[self._rows, indexes].min())
+
+    def merge(self, other: 'CountMinSketch', scale: float = 1.0):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Only sketches of the same shape can be merged")
+        self.counts += other.counts * scale
+
+    def copy(self) -> 'CountMinSketch':
+        return CountMinSketch(self.width, self.depth, self.counts.copy())
+
+
+class DecayedHeavyHitters:
+    """
+    Exponentially decayed counts of one kind of key over one half-life: a
+    count-min sketch plus the ``capacity`` keys with the largest estimates.
+
+    Counts are stored relative to a landmark time: an event at time t adds
+    2 ** ((t - landmark) / half_life), and the decayed count at time ``now``
+    is the stored count divided by 2 ** ((now - landmark) / half_life).
+    """
+
+    def __init__(self, half_life: float, width: int = DEFAULT_WIDTH, depth: int = DEFAULT_DEPTH,
+                 capacity: int = DEFAULT_CAPACITY, landmark: Optional[float] = None):
+        self.half_life = float(half_life)
+        self.capacity = capacity
+        self.landmark = time.time() if landmark is None else landmark
+        self.sketch = CountMinSketch(width, depth)
+        # key -> stored (landmark-relative) estimate when last seen
+        self.candidates: Dict[str, float] = {}
+
+    def _weight(self, now: float) -> float:
+        return 2.0 ** ((now - self.landmark) / self.half_life)
+
+    def _move_landmark(self, landmark: float):
+        scale = 2.0 ** ((self.landmark - landmark) / self.half_life)
+        self.sketch.counts *= scale
+        self.candidates = {key: value * scale for key, value in self.candidates.items()}
+        self.landmark = landmark
+
+    def add(self, key: str, indexes: np.ndarray, now: float, amount: float = 1.0):
+        if (now - self.landmark) / self.half_life > _RENORMALIZE_AFTER:
+            self._move_landmark(now)
+        estimate = self.sketch.add(indexes, amount * self._weight(now))
+
+        if key in self.candidates or len(self.candidates) < self.capacity:
+            self.candidates[key] = estimate
+            return
+        coldest = min(self.candidates, key=self.candidates.get)
+        if estimate > self.candidates[coldest]:
+            del self.candidates[coldest]
+            self.candidates[key] = estimate
+
+    def merge(self, other: 'DecayedHeavyHitters'):
+        """Add another worker's counts; its candidates join this list"""
+        if other.half_life != self.half_life:
+            raise ValueError("Only counters with the same half-life can be merged")
+        scale = 2.0 ** ((other.landmark - self.landmark) / self.half_life)
+        self.sketch.merge(other.sketch, scale)
+        for key in other.candidates:
+            self.candidates.setdefault(key, 0.0)
+
+    def top(self, now: float, limit: int) -> List[Tuple[str, float]]:
+        """Hottest candidates with their decayed counts, re-estimated from the sketch"""
+        depth, width = self.sketch.depth, self.sketch.width
+        weight = self._weight(now)
+        scored = [
+            (key, self.sketch.estimate(sketch_indexes(key, depth, width)) / weight)
+            for key in self.candidates
+        ]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:max(limit, 0)]
+
+    def copy(self) -> 'DecayedHeavyHitters':
+        clone = DecayedHeavyHitters(self.half_life, self.sketch.width, self.sketch.depth,
+                                    self.capacity, self.landmark)
+        clone.sketch = self.sketch.copy()
+        clone.candidates = dict(self.candidates)
+        return clone
+
+
+class PopularityTracker:
+    """
+    Decayed view and query counts per window for one worker process, merged
+    with the other workers' saved state when a shared directory is set.
+    """
+
+    def __init__(self, windows: Optional[Dict[str, float]] = None, width: int = DEFAULT_WIDTH,
+                 depth: int = DEFAULT_DEPTH, capacity: int = DEFAULT_CAPACITY,
+                 shared_dir: Optional[str] = None, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.windows = dict(windows or DEFAULT_WINDOWS)
+        self.width = width
+        self.depth = depth
+        self.shared_dir = shared_dir
+        self.flush_interval = flush_interval
+        now = time.time()
+        self.counters = {
+            (kind, window): DecayedHeavyHitters(half_life, width, depth, capacity, landmark=now)
+            for kind in KINDS for window, half_life in self.windows.items()
+        }
+        self.worker = f"{socket.gethostname()}-{os.getpid()}"
+        self._lock = threading.Lock()
+        self._last_flush = now
+        # path -> (mtime, counters) of other workers' state files
+        self._peers: Dict[str, Tuple[float, Dict]] = {}
+
+    def record(self, kind: str, key, now: Optional[float] = None):
+        """Count one event: a professor id for 'professor', a raw search string for 'query'"""
+        key = normalize_query(key) if kind == 'query' else str(key)
+        if not key:
+            return
+        now = time.time() if now is None else now
+        indexes = sketch_indexes(key, self.depth, self.width)
+        with self._lock:
+            for window in self.windows:
+                self.counters[(kind, window)].add(key, indexes, now)
+            flush = self.shared_dir and now - self._last_flush >= self.flush_interval
+            if flush:
+                self._last_flush = now
+        if flush:
+            self.flush()
+
+    def trending(self, kind: str, window: str, limit: int = 10, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Hottest keys of a kind over a window, across all workers sharing the directory"""
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of: {', '.join(KINDS)}")
+        if window not in self.windows:
+            raise ValueError(f"window must be one of: {', '.join(self.windows)}")
+        now = time.time() if now is None else now
+        with self._lock:
+            merged = self.counters[(kind, window)].copy()
+        for counters in self._peer_states():
+            peer = counters.get((kind, window))
+            if peer is not None and peer.half_life == merged.half_life:
+                merged.merge(peer)
+        return merged.top(now, limit)
+
+    # Shared state of the worker processes
+
+    def _state_path(self) -> str:
+        return os.path.join(self.shared_dir, f"popularity-{self.worker}.npz")
+
+    def flush(self):
+        """Write this worker's counters to the shared directory (atomically)"""
+        if not self.shared_dir:
+            return
+        with self._lock:
+            arrays, meta = {}, {'worker': self.worker, 'width': self.width, 'depth': self.depth, 'counters': []}
+            for number, ((kind, window), counter) in enumerate(self.counters.items()):
+                arrays[f'counts_{number}'] = counter.sketch.counts.copy()
+                meta['counters'].append({
+                    'kind': kind, 'window': window, 'half_life': counter.half_life,
+                    'landmark': counter.landmark, 'capacity': counter.capacity,
+                    'candidates': list(counter.candidates),
+                })
+        os.makedirs(self.shared_dir, exist_ok=True)
+        path = self._state_path()
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as handle:
+            np.savez(handle, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(temp_path, path)
+
+    def _peer_states(self) -> List[Dict]:
+        """Counters saved by the other workers; files untouched for 4 of the longest half-lives are ignored"""
+        if not self.shared_dir:
+            return []
+        own = self._state_path()
+        stale_before = time.time() - 4 * max(self.windows.values())
+        states = []
+        paths = glob.glob(os.path.join(self.shared_dir, 'popularity-*.npz'))
+        for path in set(self._peers) - set(paths):
+            del self._peers[path]
+        for path in paths:
+            if path == own:
+                continue
+            try:
+                mtime = os.path.getmtime(path)
+                if mtime < stale_before:
+                    continue
+                cached = self._peers.get(path)
+                if cached is None or cached[0] != mtime:
+                    cached = self._peers[path] = (mtime, self._load_state(path))
+                states.append(cached[1])
+            except (OSError, ValueError, KeyError):
+                # Partly written or foreign file; the next flush replaces it
+                continue
+        return states
+
+    def _load_state(self, path: str) -> Dict:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if (meta['width'], meta['depth']) != (self.width, self.depth):
+                return {}
+            counters = {}
+            for number, entry in enumerate(meta['counters']):
+                counter = DecayedHeavyHitters(entry['half_life'], self.width, self.depth,
+                                              entry['capacity'], entry['landmark'])
+                counter.sketch.counts = data[f'counts_{number}'].astype(np.float64)
+                counter.candidates = {key: 0.0 for key in entry['candidates']}
+                counters[(entry['kind'], entry['window'])] = counter
+            return counters
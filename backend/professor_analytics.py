@@ -0,0 +1,223 @@
+"""
+Aggregate analytics over the professor index.
+Aggregates are computed with NumPy over per-professor code arrays and the
+index's columnar metrics, and memoized on the index, so each is built once
+per data version (professor rows and citation cache).
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from field_classifier import classify_domain
+from professor_index import METRIC_COLUMNS, ProfessorIndex, normalize_key
+
+# Column facets of the college heatmap
+HEATMAP_COLUMNS = ('field', 'subfield')
+
+# Facets metric distributions can be grouped by
+DISTRIBUTION_GROUPS = ('field', 'college')
+
+# Lower bounds of the histogram buckets of each metric; the last bucket is open-ended
+HISTOGRAM_EDGES = {
+    'citations': (0, 1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000),
+    'h_index': (0, 1, 2, 5, 10, 15, 20, 30, 40, 60, 80),
+    'i10_index': (0, 1, 5, 10, 20, 50, 100, 200, 500),
+}
+
+PERCENTILES = (50, 90, 99)
+
+
+def facet_codes(index: ProfessorIndex) -> Dict:
+    """
+    Integer codes of each professor's college and of its (professor, field)
+    and (professor, subfield) memberships, built once per index.
+
+    Returns:
+        Dict with 'college' (code per ordinal, -1 when missing), per facet the
+        'labels' of the codes, and per column facet the 'pairs' as two
+        arrays (ordinals, codes) without duplicate pairs
+    """
+
+    def build():
+        labels = {'college': [], 'field': [], 'subfield': []}
+        codes = {'college': {}, 'field': {}, 'subfield': {}}
+
+        def code(facet, key, label):
+            value = codes[facet].get(key)
+            if value is None:
+                value = codes[facet][key] = len(labels[facet])
+                labels[facet].append(label)
+            return value
+
+        colleges = np.full(index.size, -1, dtype=np.int64)
+        pairs = {'field': set(), 'subfield': set()}
+        for ordinal, professor in enumerate(index.professors):
+            college = " ".join(str(professor.get('college') or '').split())
+            if college:
+                colleges[ordinal] = code('college', normalize_key(college), index.labels['college'][normalize_key(college)])
+            for domain in index.domains[ordinal]:
+                domain_key = normalize_key(domain)
+                field = classify_domain(domain)
+                pairs['subfield'].add((ordinal, code('subfield', domain_key, index.labels['domain'][domain_key])))
+                pairs['field'].add((ordinal, code('field', normalize_key(field), field)))
+
+        result = {'college': colleges, 'labels': labels, 'pairs': {}}
+        for facet, members in pairs.items():
+            array = np.array(sorted(members), dtype=np.int64).reshape(-1, 2)
+            result['pairs'][facet] = (array[:, 0], array[:, 1])
+        return result
+
+    return index.memo(('analytics', 'codes'), build)
+
+
+def college_heatmap(index: ProfessorIndex, columns: str = 'field') -> Dict:
+    """
+    College x field (or subfield) matrices of professor counts and citation
+    totals, with one bincount over the (professor, column) pairs.
+    A professor counts once in every column it belongs to; professors
+    without a college are left out.
+
+    Returns:
+        Dict with 'rows' and 'columns' labels, 'professors' and 'citations'
+        matrices (rows x columns) and 'row_professors', the number of distinct
+        professors per college
+    """
+    if columns not in HEATMAP_COLUMNS:
+        raise ValueError(f"columns must be one of: {', '.join(HEATMAP_COLUMNS)}")
+
+    def build():
+        codes = facet_codes(index)
+        rows, cols = codes['labels']['college'], codes['labels'][columns]
+        ordinals, column_codes = codes['pairs'][columns]
+        colleges = codes['college'][ordinals]
+        known = colleges >= 0
+        cells = colleges[known] * len(cols) + column_codes[known]
+        size = len(rows) * len(cols)
+        citations = index.columns['citations'][ordinals[known]]
+        return {
+            'rows': rows,
+            'columns': cols,
+            'professors': np.bincount(cells, minlength=size).reshape(len(rows), len(cols)),
+            'citations': np.bincount(cells, weights=citations, minlength=size).astype(np.int64).reshape(len(rows), len(cols)),
+            'row_professors': np.bincount(codes['college'][codes['college'] >= 0], minlength=len(rows)),
+        }
+
+    return index.memo(('analytics', 'heatmap', columns), build)
+
+
+def heatmap_view(heatmap: Dict, limit: Optional[int] = None, min_professors: int = 0) -> Dict:
+    """
+    JSON-ready heatmap: rows and columns sorted by professor count (then
+    label), columns without ``min_professors`` dropped and the ``limit``
+    largest kept. Matrices are returned as nested lists.
+    """
+    professors = heatmap['professors']
+    column_totals = professors.sum(axis=0)
+    row_totals = heatmap['row_professors']
+
+    row_order = sorted(range(len(heatmap['rows'])), key=lambda i: (-row_totals[i], heatmap['rows'][i]))
+    column_order = [
+        j for j in sorted(range(len(heatmap['columns'])), key=lambda j: (-column_totals[j], heatmap['columns'][j]))
+        if column_totals[j] >= min_professors
+    ]
+    total_columns = len(column_order)
+    if limit is not None:
+        column_order = column_order[:max(limit, 0)]
+
+    rows, cols = np.array(row_order, dtype=np.int64), np.array(column_order, dtype=np.int64)
+    grid = np.ix_(rows, cols)
+    return {
+        'rows': [heatmap['rows'][i] for i in row_order],
+        'columns': [heatmap['columns'][j] for j in column_order],
+        'professors': professors[grid].tolist(),
+        'citations': heatmap['citations'][grid].tolist(),
+        'row_totals': row_totals[rows].tolist(),
+        'column_totals': column_totals[cols].tolist(),
+        'total_columns': total_columns,
+    }
+
+
+def _grouped_distribution(values: np.ndarray, groups: np.ndarray, group_count: int,
+                          edges: np.ndarray, include_zero: bool) -> Dict:
+    """
+    Histograms and percentiles of ``values`` per group code, vectorized:
+    one bincount for the histograms and one lexsort for the percentiles.
+    Percentiles interpolate linearly like np.percentile; they leave out
+    zeros (professors without data) unless ``include_zero`` is set.
+    """
+    bucket_count = len(edges)
+    buckets = np.maximum(np.searchsorted(edges, values, side='right') - 1, 0)
+    histograms = np.bincount(groups * bucket_count + buckets, minlength=group_count * bucket_count)
+
+    sampled = np.ones(len(values), dtype=bool) if include_zero else values > 0
+    sample, sample_groups = values[sampled].astype(np.float64), groups[sampled]
+    counts = np.bincount(sample_groups, minlength=group_count)
+    sums = np.bincount(sample_groups, weights=sample, minlength=group_count)
+    # Values sorted within each group, groups in code order
+    sample = sample[np.lexsort((sample, sample_groups))]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+
+    result = {
+        'count': np.bincount(groups, minlength=group_count).tolist(),
+        'with_data': np.bincount(groups[values > 0], minlength=group_count).tolist(),
+        'histograms': histograms.reshape(group_count, bucket_count).tolist(),
+        'mean': [round(float(total / count), 2) if count else None for total, count in zip(sums, counts)],
+    }
+    for q in PERCENTILES:
+        position = starts + (q / 100) * np.maximum(counts - 1, 0)
+        low = np.clip(np.floor(position).astype(np.int64), 0, max(len(sample) - 1, 0))
+        high = np.clip(np.ceil(position).astype(np.int64), 0, max(len(sample) - 1, 0))
+        if len(sample):
+            points = sample[low] + (sample[high] - sample[low]) * (position - low)
+        else:
+            points = np.zeros(group_count)
+        result[f'p{q}'] = [round(float(point), 2) if has else None for point, has in zip(points, present)]
+    return result
+
+
+def metric_distributions(index: ProfessorIndex, group: Optional[str] = None,
+                         include_zero: bool = False) -> Dict:
+    """
+    Histogram buckets and percentiles of every metric column, for the whole
+    faculty and per field or college.
+
+    A professor counts in every field it belongs to; professors without a
+    college or field are only counted in 'overall'.
+
+    Returns:
+        Dict of metric -> {'edges', 'overall', 'groups'} where 'overall' has
+        'count', 'with_data', 'histogram', 'mean' and the percentiles, and
+        'groups' (None without ``group``) the same as arrays aligned with
+        its 'labels'
+    """
+    if group is not None and group not in DISTRIBUTION_GROUPS:
+        raise ValueError(f"group must be one of: {', '.join(DISTRIBUTION_GROUPS)}")
+
+    def build():
+        codes = facet_codes(index)
+        if group == 'college':
+            ordinals = np.flatnonzero(codes['college'] >= 0)
+            group_codes, labels = codes['college'][ordinals], codes['labels']['college']
+        elif group == 'field':
+            (ordinals, group_codes), labels = codes['pairs']['field'], codes['labels']['field']
+
+        distributions = {}
+        for metric in METRIC_COLUMNS:
+            values = index.columns[metric]
+            edges = np.asarray(HISTOGRAM_EDGES[metric], dtype=np.int64)
+            overall = _grouped_distribution(values, np.zeros(index.size, dtype=np.int64), 1, edges, include_zero)
+            overall = {key: value[0] for key, value in overall.items()}
+            overall['histogram'] = overall.pop('histograms')
+            overall['max'] = int(values.max()) if index.size else None
+
+            groups = None
+            if group is not None:
+                groups = _grouped_distribution(values[ordinals], group_codes, len(labels), edges, include_zero)
+                groups['labels'] = list(labels)
+
+            distributions[metric] = {'edges': list(HISTOGRAM_EDGES[metric]), 'overall': overall, 'groups': groups}
+        return distributions
+
+    return index.memo(('analytics', 'distributions', group, include_zero), build)
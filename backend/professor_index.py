@@ -0,0 +1,325 @@
+"""
+In-memory professor index.
+This module keeps an immutable snapshot of the professor table keyed by
+professor ordinal, with per-college and per-domain bitmaps so that filter
+combinations can be answered with bitwise operations instead of SQL.
+"""
+
+import operator
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from field_classifier import classify_domain
+
+# Facets that are indexed as bitmaps
+FACETS = ('college', 'domain', 'field')
+
+# Numeric columns kept as NumPy arrays, mapped to the professor dict keys they come from
+METRIC_COLUMNS = {
+    'citations': 'citations_count',
+    'h_index': 'h_index',
+    'i10_index': 'i10_index',
+}
+FLAG_COLUMNS = {
+    'has_gs': 'has_google_scholar',
+    'has_ss': 'has_semantic_scholar',
+}
+
+_DOMAIN_SPLIT_PATTERN = re.compile(r'\s*[|,;]\s*')
+
+_COMPARISONS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '=': operator.eq,
+}
+
+
+def normalize_key(value) -> str:
+    """Normalize a facet value for case and whitespace insensitive lookups"""
+    return " ".join(str(value or "").strip().lower().split())
+
+
+def split_domains(professor: Dict) -> List[str]:
+    """
+    Return the list of domains for a professor.
+
+    The database returns domains joined with ' | ' while the JSON/Excel data
+    uses commas, so both separators are accepted.
+    """
+    raw = professor.get('expertise_array') or [professor.get('domain_expertise') or '']
+    domains = []
+    seen = set()
+    for entry in raw:
+        for domain in _DOMAIN_SPLIT_PATTERN.split(str(entry or '')):
+            domain = " ".join(domain.split())
+            key = domain.lower()
+            if domain and key not in seen:
+                seen.add(key)
+                domains.append(domain)
+    return domains
+
+
+def popcount(bits: int) -> int:
+    """Number of set bits in a bitmap"""
+    return bin(bits).count('1')
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Yield the ordinals of the set bits in ascending order"""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+def bits_from_ordinals(ordinals: Iterable[int]) -> int:
+    """Build a bitmap from an iterable of ordinals"""
+    bits = 0
+    for ordinal in ordinals:
+        bits |= 1 << ordinal
+    return bits
+
+
+def mask_to_bits(mask: np.ndarray) -> int:
+    """Convert a boolean NumPy mask into an int bitmap (bit i = mask[i])"""
+    if not len(mask):
+        return 0
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+
+def bits_to_mask(bits: int, size: int) -> np.ndarray:
+    """Convert an int bitmap into a boolean NumPy mask of length ``size``"""
+    raw = bits.to_bytes((size + 7) // 8, 'little')
+    return np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder='little')[:size].astype(bool)
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class ProfessorIndex:
+    """
+    Immutable snapshot of professor data with bitmap indexes.
+
+    Every professor is assigned an ordinal (its position in ``professors``).
+    For each facet value a Python int is kept whose bit ``i`` is set when
+    professor ``i`` has that value, so intersections are a single ``&``.
+    """
+
+    def __init__(self, professors: List[Dict], version: int = 0):
+        self.version = version
+        self.professors = list(professors)
+        self.size = len(self.professors)
+        self.all_bits = (1 << self.size) - 1
+        self.ids = [str(p.get('id', '')) for p in self.professors]
+        self.ordinal_by_id = {pid: i for i, pid in enumerate(self.ids)}
+        self.domains = [split_domains(p) for p in self.professors]
+
+        # facet -> normalized key -> bitmap, and facet -> normalized key -> display label
+        self.bitmaps: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        self.labels: Dict[str, Dict[str, str]] = {facet: {} for facet in FACETS}
+
+        for ordinal, professor in enumerate(self.professors):
+            bit = 1 << ordinal
+            college = " ".join(str(professor.get('college') or '').split())
+            if college:
+                self._add('college', college, bit)
+            for domain in self.domains[ordinal]:
+                self._add('domain', domain, bit)
+                self._add('field', classify_domain(domain), bit)
+
+        # Columnar metrics: professor ordinal -> value
+        self.columns: Dict[str, np.ndarray] = {}
+        for column, key in METRIC_COLUMNS.items():
+            self.columns[column] = np.fromiter(
+                (_to_int(p.get(key)) for p in self.professors), dtype=np.int64, count=self.size
+            )
+        for column, key in FLAG_COLUMNS.items():
+            self.columns[column] = np.fromiter(
+                (bool(p.get(key)) for p in self.professors), dtype=bool, count=self.size
+            )
+
+        # Memoized bitmaps for query terms, valid for the lifetime of this snapshot
+        self._term_cache: Dict[tuple, Any] = {}
+        self._scores: Optional[np.ndarray] = None
+
+    def _add(self, facet: str, label: str, bit: int):
+        key = normalize_key(label)
+        bitmaps = self.bitmaps[facet]
+        if key not in bitmaps:
+            bitmaps[key] = 0
+            self.labels[facet][key] = label
+        bitmaps[key] |= bit
+
+    def memo(self, key: tuple, build: Callable[[], Any]) -> Any:
+        """
+        Value of ``build()`` memoized under ``key`` for the lifetime of this
+        snapshot, for per-snapshot lookups computed outside this class
+        """
+        if key not in self._term_cache:
+            self._term_cache[key] = build()
+        return self._term_cache[key]
+
+    def facet_bitmap(self, facet: str, value: str) -> int:
+        """Bitmap of professors having ``value`` for ``facet`` (0 if unknown)"""
+        return self.bitmaps.get(facet, {}).get(normalize_key(value), 0)
+
+    def filter_bitmap(self, facet: str, values: Iterable[str]) -> int:
+        """Union of the bitmaps for several values of the same facet"""
+        bits = 0
+        for value in values:
+            bits |= self.facet_bitmap(facet, value)
+        return bits
+
+    def matching_keys(self, facet: str, phrase: str) -> List[str]:
+        """
+        Normalized ``facet`` values containing ``phrase`` as whole words,
+        e.g. 'vision' matches 'Computer Vision' but 'ai' does not match
+        'Blockchain'. Results are memoized per snapshot.
+        """
+        phrase = normalize_key(phrase)
+        cache_key = ('keys', facet, phrase)
+        if cache_key not in self._term_cache:
+            pattern = re.compile(r'(?<!\w)' + re.escape(phrase) + r'(?!\w)')
+            self._term_cache[cache_key] = [key for key in self.bitmaps.get(facet, {}) if pattern.search(key)]
+        return self._term_cache[cache_key]
+
+    def match_bitmap(self, facet: str, phrase: str) -> int:
+        """Bitmap of professors with a ``facet`` value matching ``phrase`` (see matching_keys)"""
+        cache_key = ('match', facet, normalize_key(phrase))
+        if cache_key not in self._term_cache:
+            bits = 0
+            for key in self.matching_keys(facet, phrase):
+                bits |= self.bitmaps[facet][key]
+            self._term_cache[cache_key] = bits
+        return self._term_cache[cache_key]
+
+    def flag_bitmap(self, column: str) -> int:
+        """Bitmap of professors whose boolean ``column`` is set"""
+        cache_key = ('flag', column)
+        if cache_key not in self._term_cache:
+            self._term_cache[cache_key] = mask_to_bits(self.columns[column])
+        return self._term_cache[cache_key]
+
+    def threshold_mask(self, column: str, op: str, value: int) -> np.ndarray:
+        """Boolean mask of professors whose numeric ``column`` satisfies ``op value``"""
+        return _COMPARISONS[op](self.columns[column], value)
+
+    def threshold_bitmap(self, column: str, op: str, value: int) -> int:
+        """Bitmap version of threshold_mask, memoized per snapshot"""
+        cache_key = ('threshold', column, op, value)
+        if cache_key not in self._term_cache:
+            self._term_cache[cache_key] = mask_to_bits(self.threshold_mask(column, op, value))
+        return self._term_cache[cache_key]
+
+    def top_k(self, column: str, mask: Optional[np.ndarray] = None, k: Optional[int] = None,
+              descending: bool = True) -> np.ndarray:
+        """
+        Ordinals of the professors in ``mask`` ordered by ``column``.
+        When ``k`` is given only the best k are selected, using argpartition so
+        the cost is O(N) plus O(k log k) for ordering the selected rows.
+        Ties are broken by ordinal to keep the order stable.
+        """
+        candidates = np.flatnonzero(mask) if mask is not None else np.arange(self.size)
+        values = self.columns[column][candidates]
+        if descending:
+            values = -values
+
+        if k is not None and 0 <= k < len(candidates):
+            if k == 0:
+                return candidates[:0]
+            selected = np.argpartition(values, k - 1)[:k]
+            candidates, values = candidates[selected], values[selected]
+
+        order = np.lexsort((candidates, values))
+        return candidates[order]
+
+    def professors_for(self, bits: int, offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """Return professor dicts for the set bits, in ordinal order"""
+        results = []
+        for position, ordinal in enumerate(iter_bits(bits)):
+            if position < offset:
+                continue
+            if limit is not None and len(results) >= limit:
+                break
+            results.append(self.professors[ordinal])
+        return results
+
+    def facet_counts(self, facet: str, bits: int) -> List[Dict]:
+        """Counts of every value of ``facet`` within ``bits``, most frequent first"""
+        counts = []
+        labels = self.labels[facet]
+        for key, bitmap in self.bitmaps[facet].items():
+            count = popcount(bitmap & bits)
+            if count:
+                counts.append({'name': labels[key], 'count': count})
+        counts.sort(key=lambda x: (-x['count'], x['name'].lower()))
+        return counts
+
+    def faceted_search(self, filters: Dict[str, List[str]], offset: int = 0,
+                       limit: Optional[int] = None) -> Dict:
+        """
+        Intersect the requested facet filters and count every facet.
+
+        Values of the same facet are OR-ed and different facets are AND-ed.
+        Counts for a facet are computed against the filters of all *other*
+        facets, so the client can show how many hits selecting another value
+        would give.
+        """
+        facet_bits = {}
+        for facet in FACETS:
+            values = [v for v in filters.get(facet, []) if v]
+            facet_bits[facet] = self.filter_bitmap(facet, values) if values else self.all_bits
+
+        hits = self.all_bits
+        for bits in facet_bits.values():
+            hits &= bits
+
+        facets = {}
+        for facet in FACETS:
+            others = self.all_bits
+            for other, bits in facet_bits.items():
+                if other != facet:
+                    others &= bits
+            facets[facet] = self.facet_counts(facet, others)
+
+        return {
+            'hits': hits,
+            'total_count': popcount(hits),
+            'professors': self.professors_for(hits, offset, limit),
+            'facets': facets,
+        }
+
+    @property
+    def scores(self) -> np.ndarray:
+        """
+        Composite score in [0, 1] per ordinal.
+        Citations (log-scaled), h-index and i10-index are each normalized by the
+        faculty maximum and weighted 0.5 / 0.3 / 0.2. Metrics nobody has data
+        for are left out and the remaining weights rescaled, so missing i10
+        data does not cap every score.
+        """
+        if self._scores is None:
+            weighted = []
+            for values, weight in ((np.log1p(self.columns['citations']), 0.5),
+                                   (self.columns['h_index'], 0.3),
+                                   (self.columns['i10_index'], 0.2)):
+                values = values.astype(np.float64)
+                peak = values.max() if len(values) else 0.0
+                if peak > 0:
+                    weighted.append((values / peak, weight))
+
+            total_weight = sum(weight for _, weight in weighted)
+            scores = np.zeros(self.size)
+            for values, weight in weighted:
+                scores += values * (weight / total_weight)
+            self._scores = np.round(scores, 4)
+        return self._scores
+
@@ -4,18 +4,29 @@ This module contains all Flask routes related to professor management using MySQ
 """
 
 from flask import Blueprint, request, jsonify
-from domain_expertise_analyzer import DomainExpertiseAnalyzer
+from domain_expertise_analyzer import DomainExpertiseAnalyzer, EXPERTISE_LEVELS
 import logging
 import time
 import os
 import sys
 import re
 import json
+import hashlib
+import threading
+import numpy as np
 from gemma_service import parse_search_query_with_gemma, analyze_project_description
 # Import the database module for MySQL access
 import database
 # Import citations cache functionality
-from extract_citations import get_cached_citations, get_extraction_status, load_teachers_data
+from extract_citations import get_cached_citations, get_extraction_status, load_teachers_data, CACHE_FILE as CITATIONS_CACHE_FILE
+from professor_index import ProfessorIndex, FACETS, bits_to_mask
+from expertise_query import compile_query, QuerySyntaxError
+from similar_professors import build_similarity_lists, load_similarity_lists, data_signature
+import research_communities
+from field_classifier import FIELD_CLASSIFIER
+from team_builder import build_teams, DEFAULT_MAX_TEAM_SIZE, DEFAULT_ALTERNATIVES
+from professor_analytics import college_heatmap, heatmap_view, metric_distributions
+from popularity_tracker import PopularityTracker, KINDS as POPULARITY_KINDS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -485,41 +496,304 @@ def load_teachers_data():
         logger.error(traceback.format_exc())
         return []
 
+def attach_citation_data(professor, citations_cache, id_mapping):
+    """Copy citation metrics from the citations cache onto a professor dict"""
+    db_id = str(professor.get('id', ''))
+    json_id = id_mapping.get(db_id)
+    
+    # If we have a matching JSON ID and it's in the citation cache
+    if json_id and json_id in citations_cache:
+        citation_data = citations_cache[json_id]
+        professor['citations_count'] = citation_data.get('citations', 0)
+        professor['h_index'] = citation_data.get('h_index', 0)
+        professor['i10_index'] = citation_data.get('i10_index', 0)
+        # Add the JSON ID for reference
+        professor['json_id'] = json_id
+    return professor
+
+# Decayed popularity of professor views and searches; set POPULARITY_SHARED_DIR
+# to a directory shared by all workers to merge their counts
+_popularity_tracker = PopularityTracker(shared_dir=os.getenv('POPULARITY_SHARED_DIR') or None)
+
+def record_popularity(kind, key):
+    """Count a professor view ('professor') or a search ('query'); never fails the request"""
+    try:
+        _popularity_tracker.record(kind, key)
+    except Exception as e:
+        logger.warning(f"Could not record {kind} popularity: {e}")
+
+# In-memory professor index, rebuilt when the professor data or the citations cache changes
+_professor_index = None
+_professor_index_key = None
+_professor_index_lock = threading.Lock()
+
+# Content hash of the last professor list seen, computed once per reload of the list
+_rows_signature = (None, None)
+
+def professor_rows_signature(professors):
+    """
+    Content hash of the professor rows.
+    The database list is re-fetched every CACHE_TIMEOUT seconds; hashing its
+    contents keeps an unchanged reload from rebuilding the index.
+    """
+    global _rows_signature
+    
+    cached_rows, signature = _rows_signature
+    if cached_rows is professors:
+        return signature
+    
+    digest = hashlib.sha1()
+    for professor in professors:
+        digest.update(repr(sorted(professor.items(), key=lambda item: item[0])).encode('utf-8'))
+    signature = digest.hexdigest()
+    # Keep a reference to the list so its id cannot be reused by another object
+    _rows_signature = (professors, signature)
+    return signature
+
+def _citations_cache_mtime():
+    """Modification time of the citations cache file, used as its version"""
+    try:
+        return os.path.getmtime(CITATIONS_CACHE_FILE)
+    except OSError:
+        return 0
+
+def get_professor_index():
+    """
+    Get the in-memory professor index.
+    The index is rebuilt only when the content of the professor rows or the
+    citations cache file changes; its version is bumped on every rebuild.
+    """
+    global _professor_index, _professor_index_key
+    
+    professors = load_teachers_data()
+    key = (professor_rows_signature(professors), _citations_cache_mtime())
+    if _professor_index is not None and _professor_index_key == key:
+        return _professor_index
+    
+    with _professor_index_lock:
+        if _professor_index is not None and _professor_index_key == key:
+            return _professor_index
+        
+        citations_cache = get_cached_citations()
+        id_mapping = get_id_mapping() if citations_cache else {}
+        snapshot = [attach_citation_data(dict(p), citations_cache, id_mapping) for p in professors]
+        
+        version = _professor_index.version + 1 if _professor_index is not None else 1
+        index = ProfessorIndex(snapshot, version=version)
+        _professor_index = index
+        _professor_index_key = key
+        logger.info(f"Built professor index v{version} with {_professor_index.size} professors")
+        return _professor_index
+
+# Expertise analyzer bound to the current index snapshot
+_expertise_analyzer = None
+
+def get_expertise_analyzer():
+    """Get the expertise analyzer for the current data version, creating it when the index changes"""
+    global _expertise_analyzer
+    
+    index = get_professor_index()
+    analyzer = _expertise_analyzer
+    if analyzer is None or analyzer.index is not index:
+        analyzer = DomainExpertiseAnalyzer(index)
+        _expertise_analyzer = analyzer
+    return analyzer
+
+@professor_bp.route('/api/professors/facets', methods=['GET'])
+def api_faceted_search():
+    """
+    Faceted professor search answered from in-memory bitmaps
+    
+    Query Parameters:
+        - college: College filter, may be repeated (values are OR-ed)
+        - domain: Domain filter, may be repeated (values are OR-ed)
+        - field: Research field filter, may be repeated (values are OR-ed)
+        - limit: Maximum number of professors to return (default 50)
+        - offset: Number of matching professors to skip (default 0)
+        
+    Returns:
+        JSON response with matching professors and counts for every facet
+    """
+    try:
+        limit = request.args.get('limit', 50, type=int)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        filters = {facet: request.args.getlist(facet) for facet in FACETS}
+        
+        index = get_professor_index()
+        result = index.faceted_search(filters, offset=offset, limit=limit if limit and limit > 0 else None)
+        
+        return jsonify({
+            'professors': result['professors'],
+            'total_count': result['total_count'],
+            'facets': result['facets'],
+            'filters': {facet: values for facet, values in filters.items() if values},
+            'offset': offset,
+            'data_version': index.version
+        })
+        
+    except Exception as e:
+        logging.error(f"Error in faceted search: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@professor_bp.route('/api/professors/query', methods=['GET'])
+def api_expertise_query():
+    """
+    Boolean expertise search evaluated in memory
+    
+    Query Parameters:
+        - q: Query such as (computer vision OR image processing) AND college:"X" AND NOT blockchain
+             Supports domain:, college:, has_scholar: and citations/h_index/i10_index comparisons
+        - limit: Maximum number of professors to return (default 50)
+        - offset: Number of ranked professors to skip (default 0)
+        
+    Returns:
+        JSON response with ranked matching professors
+    """
+    query = request.args.get('q', '').strip()
+    
+    if not query:
+        return jsonify({
+            'error': 'Query parameter q is required'
+        }), 400
+    
+    try:
+        compiled = compile_query(query)
+    except QuerySyntaxError as e:
+        return jsonify({'error': f'Invalid query: {str(e)}'}), 400
+    
+    record_popularity('query', query)
+    
+    try:
+        limit = request.args.get('limit', 50, type=int)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        
+        index = get_professor_index()
+        result = compiled.search(index, offset=offset, limit=limit if limit and limit > 0 else None)
+        
+        return jsonify({
+            'query': query,
+            'parsed_query': str(compiled),
+            'professors': result['professors'],
+            'total_count': result['total_count'],
+            'offset': offset,
+            'data_version': index.version
+        })
+        
+    except Exception as e:
+        logging.error(f"Error in expertise query: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @professor_bp.route('/api/professors/domain-experts', methods=['GET'])
 def api_get_domain_experts():
     """
     API endpoint to search for professors with expertise in a specific domain
     
     Query Parameters:
-        - domain: The domain/field to search for (required)
+        - domain: The domain/field to search for (required unless college is given)
+        - college: Restrict to a college, or rank a whole college when no domain is given
         - min_level: Minimum expertise level (Expert, Advanced, Intermediate, Basic)
+        - limit: Page size (default 20)
+        - offset: Number of ranked experts to skip (default 0)
         
     Returns:
-        JSON response with list of experts and domain statistics
+        JSON response with experts ordered by field-relative expertise score;
+        min_level is not applied when no citation data is loaded
     """
-    domain = request.args.get('domain')
+    domain = request.args.get('domain', '').strip()
+    college = request.args.get('college', '').strip()
     min_level = request.args.get('min_level', 'Advanced')
     
-    if not domain:
+    if not domain and not college:
         return jsonify({
             'error': 'Domain parameter is required'
         }), 400
     
+    if min_level not in EXPERTISE_LEVELS:
+        return jsonify({
+            'error': f"Invalid min_level '{min_level}'. Use one of: {', '.join(EXPERTISE_LEVELS)}"
+        }), 400
+    
     try:
-        # Get professors with the specified domain directly from database
-        experts = database.get_professors_by_domain(domain)
+        limit = max(request.args.get('limit', 20, type=int), 0)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        
+        # Leaderboards are ranked by the field-relative expertise score and memoized per
+        # data version, so the min_level cut is a binary search and paging is a slice
+        analyzer = get_expertise_analyzer()
+        index = analyzer.index
+        if domain:
+            within = index.match_bitmap('college', college) if college else None
+            board = analyzer.leaderboard('domain', domain, within=within)
+        else:
+            board = analyzer.leaderboard('college', college)
+        
+        # Without citation data every score is 0, so the level cut would drop every match
+        min_score = EXPERTISE_LEVELS[min_level] if analyzer.has_metrics else 0.0
+        total_experts = analyzer.count_at_least(board, min_score)
+        ordinals, scores = board
+        end = min(offset + limit, total_experts)
+        
+        experts = []
+        for rank in range(offset, end):
+            expert = dict(index.professors[ordinals[rank]])
+            expert['expertise_score'] = float(scores[rank])
+            expert['expertise_level'] = analyzer.get_expertise_level(float(scores[rank]))
+            expert['rank'] = rank + 1
+            experts.append(expert)
         
         return jsonify({
             'domain': domain,
+            'college': college or None,
             'min_level': min_level,
-            'total_experts': len(experts),
-            'experts': experts[:20]  # Limit to first 20
+            'total_experts': total_experts,
+            'total_in_domain': len(ordinals),
+            'offset': offset,
+            'limit': limit,
+            'experts': experts,
+            'statistics': analyzer.get_domain_statistics(domain) if domain else None,
+            'metrics_available': analyzer.has_metrics,
+            'data_version': index.version
         })
         
     except Exception as e:
         logging.error(f"Error in domain experts search: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@professor_bp.route('/api/professors/domain-statistics', methods=['GET'])
+def api_get_domain_statistics():
+    """
+    Expertise level distribution per domain, scored relative to each field
+    
+    Query Parameters:
+        - domain: Domain to analyze; when omitted statistics for every domain are returned
+        - include_experts: 'true' to also return the scored experts for the domain
+        - min_level: Minimum expertise level of the returned experts (default Basic)
+    """
+    try:
+        domain = request.args.get('domain', '').strip()
+        analyzer = get_expertise_analyzer()
+        
+        if not domain:
+            statistics = analyzer.get_all_domain_statistics()
+            return jsonify({
+                'domains': statistics,
+                'total': len(statistics),
+                'data_version': analyzer.version
+            })
+        
+        response = {
+            'domain': domain,
+            'statistics': analyzer.get_domain_statistics(domain),
+            'data_version': analyzer.version
+        }
+        if request.args.get('include_experts', 'false').lower() == 'true':
+            response['experts'] = analyzer.search_domain_experts(domain, request.args.get('min_level', 'Basic'))
+        return jsonify(response)
+        
+    except Exception as e:
+        logging.error(f"Error getting domain statistics: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @professor_bp.route('/api/ai/search-teachers', methods=['POST'])
 def api_ai_search_teachers():
     """AI-powered teacher search using Gemma"""
@@ -530,6 +804,8 @@ def api_ai_search_teachers():
         if not query or len(query) < 2:
             return jsonify({'teachers': [], 'query_analysis': None})
         
+        record_popularity('query', query)
+        
         # Use database search for professors
         filtered_teachers = database.search_professors(query)
         
@@ -618,6 +894,7 @@ def api_analyze_project():
         
         return jsonify({
             'analysis': analysis,
+            'required_fields': FIELD_CLASSIFIER.classify_terms(required_expertise),
             'professors': matching_professors[:20],  # Top 20 matches
             'total_matches': len(matching_professors)
         })
@@ -626,14 +903,142 @@ def api_analyze_project():
         logging.error(f"Error in project analysis: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@professor_bp.route('/api/project/team', methods=['POST'])
+def api_build_project_team():
+    """
+    Assemble a small team of professors that jointly covers a project's required expertise
+    
+    JSON Body:
+        - required_expertise: List of expertise terms (analyzed from 'description' when omitted)
+        - description: Project description
+        - college: College name or list of college names to restrict the team to
+        - max_team_size: Maximum number of members per team (default 5)
+        - alternatives: Number of alternative teams to return (default 3)
+    """
+    try:
+        data = request.get_json() or {}
+        required_expertise = data.get('required_expertise')
+        analysis = None
+        
+        if not required_expertise:
+            project_description = (data.get('description') or '').strip()
+            if not project_description:
+                return jsonify({'error': 'required_expertise or description is required'}), 400
+            try:
+                analysis = analyze_project_description(project_description)
+            except Exception as e:
+                logging.error(f"Error analyzing project for team building: {str(e)}")
+                return jsonify({'error': 'Could not analyze project description'}), 502
+            required_expertise = analysis.get('required_expertise', [])
+        
+        if isinstance(required_expertise, str):
+            required_expertise = re.split(r'[,;|]', required_expertise)
+        if not isinstance(required_expertise, list) or not all(isinstance(t, str) for t in required_expertise):
+            return jsonify({'error': 'required_expertise must be a list of strings'}), 400
+        
+        colleges = data.get('college')
+        if isinstance(colleges, str):
+            colleges = [colleges]
+        
+        try:
+            max_team_size = int(data.get('max_team_size', DEFAULT_MAX_TEAM_SIZE))
+            alternatives = int(data.get('alternatives', DEFAULT_ALTERNATIVES))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'max_team_size and alternatives must be integers'}), 400
+        if max_team_size < 1:
+            return jsonify({'error': 'max_team_size must be at least 1'}), 400
+        
+        index = get_professor_index()
+        result = build_teams(index, required_expertise, colleges=colleges,
+                             max_team_size=max_team_size, alternatives=max(0, min(alternatives, 10)))
+        if analysis is not None:
+            result['analysis'] = analysis
+        result['data_version'] = index.version
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        logging.error(f"Error building project team: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+# Columns of the professor index accepted by the sort parameter of /api/professors
+SORT_COLUMNS = {
+    'citations': 'citations',
+    'citations_count': 'citations',
+    'h_index': 'h_index',
+    'i10_index': 'i10_index',
+}
+
+def ranked_professors_response(college, limit, sort, order, min_citations, min_h_index):
+    """
+    Answer sorted/thresholded /api/professors requests from the columnar index.
+    Filters are vectorized boolean masks and the top rows are selected with
+    argpartition, so no per-professor Python loop runs before the final page.
+    """
+    if sort and sort not in SORT_COLUMNS:
+        return jsonify({
+            'error': f"Invalid sort '{sort}'. Use one of: {', '.join(sorted(SORT_COLUMNS))}"
+        }), 400
+    
+    index = get_professor_index()
+    mask = np.ones(index.size, dtype=bool)
+    if college:
+        mask &= bits_to_mask(index.facet_bitmap('college', college), index.size)
+    if min_citations is not None:
+        mask &= index.threshold_mask('citations', '>=', min_citations)
+    if min_h_index is not None:
+        mask &= index.threshold_mask('h_index', '>=', min_h_index)
+    
+    total_count = int(mask.sum())
+    k = limit if limit and limit > 0 else None
+    if sort:
+        ordinals = index.top_k(SORT_COLUMNS[sort], mask, k, descending=order != 'asc')
+    else:
+        ordinals = np.flatnonzero(mask)[:k]
+    
+    professors = []
+    for i, ordinal in enumerate(ordinals, 1):
+        professor = dict(index.professors[ordinal])
+        professor['row_number'] = i
+        professors.append(professor)
+    
+    return jsonify({
+        'professors': professors,
+        'total_count': total_count,
+        'filtered_count': len(professors),
+        'message': f'Successfully loaded {len(professors)} professors' + (f' from college {college}' if college else ''),
+        'citations_included': True,
+        'sort': sort or None,
+        'data_version': index.version
+    })
+
 @professor_bp.route('/api/professors', methods=['GET'])
 def api_get_all_professors():
-    """API endpoint to get all professors from MySQL database with optional filtering"""
+    """
+    API endpoint to get all professors from MySQL database with optional filtering
+    
+    Query Parameters:
+        - limit: Maximum number of professors to return
+        - college: Only professors from this college
+        - include_citations: Attach cached citation metrics (default true)
+        - sort: citations, h_index or i10_index; returns the top professors by that metric
+        - order: 'desc' (default) or 'asc' when sort is given
+        - min_citations: Only professors with at least this many citations
+        - min_h_index: Only professors with at least this h-index
+    """
     try:
         # Get query parameters
         limit = request.args.get('limit', type=int)
         college = request.args.get('college', '').strip()
         include_citations = request.args.get('include_citations', 'true').lower() == 'true'
+        sort = request.args.get('sort', '').strip().lower()
+        order = request.args.get('order', 'desc').strip().lower()
+        min_citations = request.args.get('min_citations', type=int)
+        min_h_index = request.args.get('min_h_index', type=int)
+        
+        # Leaderboard-style requests are served from the in-memory columnar index
+        if sort or min_citations is not None or min_h_index is not None:
+            return ranked_professors_response(college, limit, sort, order, min_citations, min_h_index)
         
         # Load professor data
         professors = database.load_professors_data()
@@ -661,21 +1066,7 @@ def api_get_all_professors():
             
             # Add citation data from cache if available
             if include_citations and citations_cache:
-                # Get database ID to JSON ID mapping
-                id_mapping = get_id_mapping()
-                
-                # Try to get the corresponding JSON ID
-                db_id = str(professor.get('id', ''))
-                json_id = id_mapping.get(db_id)
-                
-                # If we have a matching JSON ID and it's in the citation cache
-                if json_id and json_id in citations_cache:
-                    citation_data = citations_cache[json_id]
-                    professor['citations_count'] = citation_data.get('citations', 0)
-                    professor['h_index'] = citation_data.get('h_index', 0)
-                    professor['i10_index'] = citation_data.get('i10_index', 0)
-                    # Add the JSON ID for reference
-                    professor['json_id'] = json_id
+                attach_citation_data(professor, citations_cache, get_id_mapping())
         
         return jsonify({
             'professors': professors,
@@ -689,6 +1080,262 @@ def api_get_all_professors():
         logging.error(f"Error fetching professors: {str(e)}")
         return jsonify({'professors': [], 'total_count': 0, 'error': 'Internal error'}), 500
 
+# Neighbour lists computed in-process when the persisted file is missing or stale
+_similarity_state = {'index': None, 'signature': None, 'lists': None}
+_similarity_lock = threading.Lock()
+
+def get_similarity_lists():
+    """
+    Get similar-professor neighbour lists for the current data.
+    Lists persisted by the similar_professors.py batch job are used when their
+    signature matches the current snapshot; otherwise they are computed once
+    for this snapshot and kept in memory.
+    
+    Returns:
+        Tuple of (neighbour lists, source) where source is 'precomputed' or 'computed'
+    """
+    index = get_professor_index()
+    with _similarity_lock:
+        if _similarity_state['index'] is not index:
+            _similarity_state.update({'index': index, 'signature': data_signature(index.professors), 'lists': None})
+        
+        persisted = load_similarity_lists()
+        if persisted and persisted.get('signature') == _similarity_state['signature']:
+            return persisted, 'precomputed'
+        
+        if _similarity_state['lists'] is None:
+            logger.warning("Persisted neighbour lists are missing or stale; computing them in-process")
+            _similarity_state['lists'] = build_similarity_lists(index.professors)
+        return _similarity_state['lists'], 'computed'
+
+@professor_bp.route('/api/professors/<int:professor_id>/similar', methods=['GET'])
+def api_get_similar_professors(professor_id):
+    """
+    Get professors with similar domains and thesis topics
+    
+    Query Parameters:
+        - limit: Maximum number of similar professors (default 10)
+    """
+    try:
+        limit = request.args.get('limit', 10, type=int)
+        index = get_professor_index()
+        
+        ordinal = index.ordinal_by_id.get(str(professor_id))
+        if ordinal is None:
+            return jsonify({'error': 'Professor not found'}), 404
+        
+        lists, source = get_similarity_lists()
+        own_domains = {d.lower() for d in index.domains[ordinal]}
+        
+        similar = []
+        for neighbor in lists['neighbors'].get(str(professor_id), [])[:max(limit, 0)]:
+            other = index.ordinal_by_id.get(neighbor['id'])
+            if other is None:
+                continue
+            professor = dict(index.professors[other])
+            professor['similarity_score'] = neighbor['score']
+            professor['shared_domains'] = [d for d in index.domains[other] if d.lower() in own_domains]
+            similar.append(professor)
+        
+        return jsonify({
+            'professor_id': professor_id,
+            'similar': similar,
+            'total': len(similar),
+            'source': source,
+            'data_version': index.version
+        })
+        
+    except Exception as e:
+        logging.error(f"Error getting similar professors: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+# Research communities for the current snapshot
+_communities_state = {'index': None, 'result': None}
+_communities_lock = threading.Lock()
+
+def get_communities():
+    """
+    Get research-community assignments for the current data.
+    Assignments persisted by the research_communities.py batch job are reused
+    when the data has not changed; otherwise label propagation is re-run
+    incrementally from them and the result kept in memory only.
+    """
+    index = get_professor_index()
+    with _communities_lock:
+        if _communities_state['index'] is index:
+            return _communities_state['result']
+        
+        previous = _communities_state['result'] or research_communities.load_communities()
+        if previous and previous.get('signature') == research_communities.data_signature(index.professors):
+            result = previous
+        else:
+            result = research_communities.detect_communities(index.professors, previous)
+        
+        _communities_state.update({'index': index, 'result': result})
+        return result
+
+@professor_bp.route('/api/communities', methods=['GET'])
+def api_get_communities():
+    """
+    List research communities detected over the co-expertise graph
+    
+    Query Parameters:
+        - min_size: Only communities with at least this many professors (default 2)
+        - limit: Maximum number of communities (default 50)
+    """
+    try:
+        min_size = request.args.get('min_size', 2, type=int)
+        limit = request.args.get('limit', 50, type=int)
+        result = get_communities()
+        
+        communities = [
+            {key: value for key, value in community.items() if key != 'member_ids'}
+            for community in result['communities'] if community['size'] >= min_size
+        ]
+        
+        return jsonify({
+            'communities': communities[:max(limit, 0)],
+            'total': len(communities),
+            'generated': result.get('generated'),
+            'incremental': result.get('incremental', False)
+        })
+        
+    except Exception as e:
+        logging.error(f"Error getting communities: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@professor_bp.route('/api/communities/<community_id>', methods=['GET'])
+def api_get_community(community_id):
+    """Get a research community with its member professors"""
+    try:
+        result = get_communities()
+        community = next((c for c in result['communities'] if c['id'] == community_id), None)
+        
+        if not community:
+            return jsonify({'error': 'Community not found'}), 404
+        
+        index = get_professor_index()
+        members = [
+            index.professors[index.ordinal_by_id[pid]]
+            for pid in community['member_ids'] if pid in index.ordinal_by_id
+        ]
+        members.sort(key=lambda p: p.get('citations_count', 0) or 0, reverse=True)
+        
+        response = {key: value for key, value in community.items() if key != 'member_ids'}
+        response['members'] = members
+        return jsonify(response)
+        
+    except Exception as e:
+        logging.error(f"Error getting community: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@professor_bp.route('/api/analytics/heatmap', methods=['GET'])
+def api_college_heatmap():
+    """
+    College x field expertise matrices: professors and citations per cell
+    
+    Query Parameters:
+        - columns: 'field' (default) or 'subfield'
+        - limit: Maximum number of columns, largest first (default all fields, 100 subfields)
+        - min_professors: Only columns with at least this many professors (default 0)
+    """
+    try:
+        columns = request.args.get('columns', 'field')
+        limit = request.args.get('limit', None if columns == 'field' else 100, type=int)
+        min_professors = request.args.get('min_professors', 0, type=int)
+        
+        index = get_professor_index()
+        try:
+            heatmap = college_heatmap(index, columns)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        response = heatmap_view(heatmap, limit=limit, min_professors=min_professors)
+        response['column_facet'] = columns
+        response['data_version'] = index.version
+        return jsonify(response)
+        
+    except Exception as e:
+        logging.error(f"Error building college heatmap: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@professor_bp.route('/api/analytics/distributions', methods=['GET'])
+def api_metric_distributions():
+    """
+    Histograms and p50/p90/p99 of citations, h-index and i10-index
+    
+    Query Parameters:
+        - group: 'field' or 'college' for per-group arrays (default: overall only)
+        - metrics: Comma-separated subset of citations,h_index,i10_index (default all)
+        - include_zero: Include professors without data in percentiles (default false)
+    """
+    try:
+        group = request.args.get('group') or None
+        include_zero = request.args.get('include_zero', 'false').lower() == 'true'
+        
+        index = get_professor_index()
+        try:
+            distributions = metric_distributions(index, group, include_zero)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        metrics = [m.strip() for m in request.args.get('metrics', '').split(',') if m.strip()]
+        unknown = [m for m in metrics if m not in distributions]
+        if unknown:
+            return jsonify({'error': f"Unknown metrics: {', '.join(unknown)}"}), 400
+        
+        return jsonify({
+            'group': group,
+            'include_zero': include_zero,
+            'metrics': {m: distributions[m] for m in (metrics or distributions)},
+            'data_version': index.version
+        })
+        
+    except Exception as e:
+        logging.error(f"Error building metric distributions: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@professor_bp.route('/api/analytics/trending', methods=['GET'])
+def api_trending():
+    """
+    Most viewed professors and most frequent searches, with decayed counts
+    
+    Query Parameters:
+        - window: 'hour', 'day' (default) or 'week' half-life of the counts
+        - kind: 'professor' or 'query' (default both)
+        - limit: Maximum entries per kind (default 10)
+    """
+    try:
+        window = request.args.get('window', 'day')
+        kind = request.args.get('kind')
+        limit = min(max(request.args.get('limit', 10, type=int), 0), 100)
+        kinds = [kind] if kind else list(POPULARITY_KINDS)
+        
+        try:
+            trending = {k: _popularity_tracker.trending(k, window, limit) for k in kinds}
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        response = {'window': window}
+        if 'professor' in trending:
+            index = get_professor_index()
+            professors = []
+            for professor_id, score in trending['professor']:
+                entry = {'id': professor_id, 'score': round(score, 3)}
+                ordinal = index.ordinal_by_id.get(professor_id)
+                if ordinal is not None:
+                    entry['name'] = index.professors[ordinal].get('name')
+                    entry['college'] = index.professors[ordinal].get('college')
+                professors.append(entry)
+            response['professors'] = professors
+        if 'query' in trending:
+            response['queries'] = [{'query': query, 'score': round(score, 3)} for query, score in trending['query']]
+        return jsonify(response)
+        
+    except Exception as e:
+        logging.error(f"Error getting trending: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @professor_bp.route('/api/professors/<int:professor_id>', methods=['GET'])
 def api_get_professor_details(professor_id):
     """Get detailed information about a specific professor"""
@@ -698,25 +1345,12 @@ def api_get_professor_details(professor_id):
         
         if not professor:
             return jsonify({'error': 'Professor not found'}), 404
+        record_popularity('professor', professor_id)
             
         # Add citation data from cache if available
         citations_cache = get_cached_citations()
         if citations_cache:
-            # Get database ID to JSON ID mapping
-            id_mapping = get_id_mapping()
-            
-            # Try to get the corresponding JSON ID
-            db_id = str(professor_id)
-            json_id = id_mapping.get(db_id)
-            
-            # If we have a matching JSON ID and it's in the citation cache
-            if json_id and json_id in citations_cache:
-                citation_data = citations_cache[json_id]
-                professor['citations_count'] = citation_data.get('citations', 0)
-                professor['h_index'] = citation_data.get('h_index', 0)
-                professor['i10_index'] = citation_data.get('i10_index', 0)
-                # Add the JSON ID for reference
-                professor['json_id'] = json_id
+            attach_citation_data(professor, citations_cache, get_id_mapping())
         
         # Enhance with scholar data if available and enabled
         if SCHOLAR_ENABLED:
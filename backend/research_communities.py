@@ -0,0 +1,305 @@
+"""
+Research-community detection over the co-expertise graph.
+
+Professors are linked when they share domains (weighted so that rare, specific
+domains count more than broad ones) and, when scraped publication data is
+available, when they appear as co-authors. Communities are found with weighted
+label propagation over a CSR adjacency. A previous assignment can be passed in
+so that only professors whose data changed, and their neighbours, are
+re-labelled. The batch job writes the assignments to PRISM_DATA_DIR
+(backend/data by default).
+
+Usage:
+    python research_communities.py [--output PATH] [--full]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from professor_index import normalize_key, split_domains
+
+logger = logging.getLogger("research_communities")
+
+# Batch job output, outside the source tree when PRISM_DATA_DIR is set
+DATA_DIR = os.getenv('PRISM_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+COMMUNITIES_FILE = os.path.join(DATA_DIR, 'research_communities.json')
+
+# Domains shared by more professors than this are too generic to define a community
+# and would add O(n^2) edges, so they are left out of the graph
+MAX_DOMAIN_SIZE = 300
+COAUTHOR_WEIGHT = 2.0
+MAX_SWEEPS = 30
+
+
+def professor_signature(professor: Dict) -> str:
+    """Hash of the fields that determine a professor's edges"""
+    return hashlib.sha1(repr((
+        sorted(normalize_key(d) for d in split_domains(professor)),
+        sorted(_publication_authors(professor)),
+    )).encode('utf-8')).hexdigest()[:16]
+
+
+def data_signature(professors: List[Dict]) -> str:
+    """Hash of every professor's id and edge signature"""
+    return hashlib.sha1(repr([
+        (str(p.get('id', '')), professor_signature(p)) for p in professors
+    ]).encode('utf-8')).hexdigest()
+
+
+def _author_key(name: str) -> Optional[str]:
+    """'Jane K. Doe' / 'JK Doe' -> 'j doe' (first initial + surname)"""
+    parts = [p for p in re.split(r'[\s.]+', str(name or '').strip().lower()) if p]
+    if len(parts) < 2:
+        return None
+    return f"{parts[0][0]} {parts[-1]}"
+
+
+def _publication_authors(professor: Dict) -> List[str]:
+    """Author keys from scraped publications, when the professor record has them"""
+    publications = (professor.get('academic_data') or {}).get('recent_publications') or []
+    keys = set()
+    for publication in publications:
+        for author in str(publication.get('authors', '')).split(','):
+            key = _author_key(author)
+            if key:
+                keys.add(key)
+    return sorted(keys)
+
+
+def build_adjacency(professors: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build a symmetric weighted professor graph in CSR form.
+
+    A shared domain with ``df`` members contributes ``1 / log(1 + df)`` to the
+    edge weight; co-authorship found in scraped publications adds COAUTHOR_WEIGHT.
+
+    Returns:
+        (indptr, neighbors, weights)
+    """
+    size = len(professors)
+    members: Dict[str, List[int]] = {}
+    for ordinal, professor in enumerate(professors):
+        for domain in split_domains(professor):
+            members.setdefault(normalize_key(domain), []).append(ordinal)
+
+    sources: List[np.ndarray] = []
+    targets: List[np.ndarray] = []
+    weights: List[np.ndarray] = []
+    for key, ordinals in members.items():
+        if len(ordinals) < 2 or len(ordinals) > MAX_DOMAIN_SIZE:
+            continue
+        ordinals = np.array(ordinals, dtype=np.int64)
+        left, right = np.meshgrid(ordinals, ordinals, indexing='ij')
+        off_diagonal = left != right
+        sources.append(left[off_diagonal])
+        targets.append(right[off_diagonal])
+        weights.append(np.full(off_diagonal.sum(), 1.0 / math.log(1 + len(ordinals))))
+
+    # Co-authors: match publication author keys against professor names
+    name_keys = {}
+    for ordinal, professor in enumerate(professors):
+        key = _author_key(professor.get('name'))
+        if key:
+            name_keys.setdefault(key, []).append(ordinal)
+    coauthor_pairs = set()
+    for ordinal, professor in enumerate(professors):
+        for key in _publication_authors(professor):
+            for other in name_keys.get(key, []):
+                if other != ordinal:
+                    coauthor_pairs.add((min(ordinal, other), max(ordinal, other)))
+    if coauthor_pairs:
+        pairs = np.array(sorted(coauthor_pairs), dtype=np.int64)
+        sources.extend([pairs[:, 0], pairs[:, 1]])
+        targets.extend([pairs[:, 1], pairs[:, 0]])
+        weights.extend([np.full(len(pairs), COAUTHOR_WEIGHT)] * 2)
+
+    if not sources:
+        return np.zeros(size + 1, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+    weights = np.concatenate(weights)
+
+    # Merge duplicate edges (professors sharing several domains) by summing weights
+    codes, inverse = np.unique(sources * size + targets, return_inverse=True)
+    merged = np.bincount(inverse, weights=weights)
+    sources, targets = codes // size, codes % size
+
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=size), out=indptr[1:])
+    return indptr, targets, merged
+
+
+def propagate_labels(indptr: np.ndarray, neighbors: np.ndarray, weights: np.ndarray,
+                     labels: List[str], active: Iterable[int], max_sweeps: int = MAX_SWEEPS) -> List[str]:
+    """
+    Asynchronous weighted label propagation restricted to an active set.
+
+    Each active node takes the label with the highest total edge weight among
+    its neighbours (keeping its own label on ties, otherwise the smallest
+    label). Nodes whose label changes activate their neighbours for the next
+    sweep, so an incremental update only touches the affected region.
+    """
+    labels = list(labels)
+    active = set(active)
+    for _ in range(max_sweeps):
+        if not active:
+            break
+        next_active = set()
+        for node in sorted(active):
+            start, stop = indptr[node], indptr[node + 1]
+            if start == stop:
+                continue
+            votes: Dict[str, float] = {}
+            for other, weight in zip(neighbors[start:stop].tolist(), weights[start:stop].tolist()):
+                votes[labels[other]] = votes.get(labels[other], 0.0) + weight
+            best_weight = max(votes.values())
+            current = labels[node]
+            if votes.get(current, 0.0) >= best_weight - 1e-12:
+                continue
+            labels[node] = min(label for label, weight in votes.items() if weight >= best_weight - 1e-12)
+            next_active.update(neighbors[start:stop].tolist())
+        active = next_active
+    return labels
+
+
+def detect_communities(professors: List[Dict], previous: Optional[Dict] = None) -> Dict:
+    """
+    Assign every professor to a research community.
+
+    Args:
+        professors: Professor dicts (with domains and, optionally, scraped publications)
+        previous: An earlier result of this function; unchanged professors keep
+                  their community and only changed ones and their neighbours are
+                  re-labelled
+
+    Returns:
+        Dictionary with 'assignments' (professor id -> community id), per-professor
+        'signatures' and 'communities' summaries
+    """
+    start_time = time.time()
+    ids = [str(p.get('id', '')) for p in professors]
+    signatures = [professor_signature(p) for p in professors]
+    indptr, neighbors, weights = build_adjacency(professors)
+
+    previous_assignments = (previous or {}).get('assignments', {})
+    previous_signatures = (previous or {}).get('signatures', {})
+
+    # Community ids are the id of the professor whose label spread, so they stay stable
+    labels = []
+    changed = []
+    for ordinal, (pid, signature) in enumerate(zip(ids, signatures)):
+        if pid in previous_assignments and previous_signatures.get(pid) == signature:
+            labels.append(previous_assignments[pid])
+        else:
+            labels.append(f"c-{pid}")
+            changed.append(ordinal)
+
+    if previous is None:
+        active = range(len(professors))
+    else:
+        # Members of communities that lost professors must re-check their labels too
+        removed = set(previous_assignments) - set(ids)
+        orphaned = {previous_assignments[pid] for pid in removed}
+        active = set(changed)
+        for ordinal in changed:
+            active.update(neighbors[indptr[ordinal]:indptr[ordinal + 1]].tolist())
+        active.update(i for i, label in enumerate(labels) if label in orphaned)
+
+    labels = propagate_labels(indptr, neighbors, weights, labels, active)
+
+    result = {
+        'signature': data_signature(professors),
+        'generated': time.time(),
+        'incremental': previous is not None,
+        'relabelled': len(active) if previous is not None else len(professors),
+        'assignments': dict(zip(ids, labels)),
+        'signatures': dict(zip(ids, signatures)),
+        'communities': summarize_communities(professors, labels),
+    }
+    logger.info(f"Detected {len(result['communities'])} communities for {len(professors)} professors "
+                f"(relabelled {result['relabelled']}) in {time.time() - start_time:.2f}s")
+    return result
+
+
+def summarize_communities(professors: List[Dict], labels: List[str], top: int = 5) -> List[Dict]:
+    """Size, dominant domains, colleges and best-cited members of each community"""
+    groups: Dict[str, List[int]] = {}
+    for ordinal, label in enumerate(labels):
+        groups.setdefault(label, []).append(ordinal)
+
+    summaries = []
+    for label, ordinals in groups.items():
+        if len(ordinals) < 2:
+            continue
+        domains = Counter()
+        colleges = Counter()
+        for ordinal in ordinals:
+            domains.update(split_domains(professors[ordinal]))
+            if professors[ordinal].get('college'):
+                colleges[professors[ordinal]['college']] += 1
+        top_members = sorted(ordinals, key=lambda o: -(professors[o].get('citations_count') or 0))[:top]
+        top_domains = [name for name, _ in domains.most_common(top)]
+        summaries.append({
+            'id': label,
+            'label': " / ".join(top_domains[:2]) or 'Unlabelled',
+            'size': len(ordinals),
+            'top_domains': [{'name': name, 'count': count} for name, count in domains.most_common(top)],
+            'colleges': [{'name': name, 'count': count} for name, count in colleges.most_common(top)],
+            'college_count': len(colleges),
+            'top_members': [str(professors[o].get('id', '')) for o in top_members],
+            'member_ids': [str(professors[o].get('id', '')) for o in ordinals],
+        })
+    summaries.sort(key=lambda c: (-c['size'], c['id']))
+    return summaries
+
+
+def load_communities(path: str = COMMUNITIES_FILE) -> Optional[Dict]:
+    """Load persisted community assignments"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_communities(result: Dict, path: str = COMMUNITIES_FILE):
+    """Persist community assignments atomically"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+    os.replace(temp_path, path)
+    logger.info(f"Saved communities to {path}")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Detect research communities over the co-expertise graph")
+    parser.add_argument('--output', default=COMMUNITIES_FILE, help='Where to write the communities')
+    parser.add_argument('--full', action='store_true', help='Ignore the previous assignment and recompute everything')
+    args = parser.parse_args()
+
+    import database
+    professors = database.load_professors_data()
+    if not professors:
+        logger.error("No professors loaded; nothing to do")
+        return
+    previous = None if args.full else load_communities(args.output)
+    save_communities(detect_communities(professors, previous), args.output)
+
+
+if __name__ == "__main__":
+    main()
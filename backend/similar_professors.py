@@ -0,0 +1,237 @@
+"""
+Precomputed "similar professors" neighbour lists.
+
+Each professor is described by a sparse TF-IDF vector over their domains and
+PhD thesis words. Cosine top-k neighbours are computed in row blocks so only
+a block_size x N score matrix is ever held in memory, and the resulting lists
+are persisted to JSON so the API can serve them in O(k). The file lives in
+PRISM_DATA_DIR (backend/data by default).
+
+Usage:
+    python similar_professors.py [--k 10] [--block-size 256] [--output PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from professor_index import normalize_key, split_domains
+
+logger = logging.getLogger("similar_professors")
+
+# Batch job output, outside the source tree when PRISM_DATA_DIR is set
+DATA_DIR = os.getenv('PRISM_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+NEIGHBORS_FILE = os.path.join(DATA_DIR, 'similar_professors.json')
+DEFAULT_K = 10
+DEFAULT_BLOCK_SIZE = 256
+
+# Domains are curated labels, so they weigh more than free-text thesis words
+DOMAIN_WEIGHT = 2.0
+THESIS_WEIGHT = 1.0
+
+_WORD_PATTERN = re.compile(r'[a-z][a-z0-9\-]{2,}')
+STOPWORDS = {
+    'the', 'and', 'for', 'with', 'using', 'based', 'from', 'into', 'its', 'are', 'was',
+    'this', 'that', 'their', 'towards', 'through', 'under', 'over', 'some', 'study',
+    'analysis', 'approach', 'approaches', 'techniques', 'technique', 'novel', 'new',
+    'design', 'development', 'system', 'systems', 'efficient', 'improved', 'thesis',
+}
+
+
+def professor_features(professor: Dict) -> Dict[str, float]:
+    """Raw term frequencies for one professor, keyed by feature name"""
+    features: Dict[str, float] = {}
+    for domain in split_domains(professor):
+        key = 'd:' + normalize_key(domain)
+        features[key] = features.get(key, 0.0) + DOMAIN_WEIGHT
+    for word in _WORD_PATTERN.findall(str(professor.get('phd_thesis') or '').lower()):
+        if word not in STOPWORDS:
+            key = 't:' + word
+            features[key] = features.get(key, 0.0) + THESIS_WEIGHT
+    return features
+
+
+def data_signature(professors: List[Dict]) -> str:
+    """Content hash of the fields the feature vectors depend on"""
+    digest = hashlib.sha1()
+    for professor in professors:
+        digest.update(repr((
+            str(professor.get('id', '')),
+            split_domains(professor),
+            professor.get('phd_thesis') or '',
+        )).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def build_feature_matrix(professors: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Build an L2-normalized TF-IDF matrix in CSR form.
+
+    Returns:
+        (indptr, indices, data, feature_count)
+    """
+    vocabulary: Dict[str, int] = {}
+    indptr = [0]
+    indices: List[int] = []
+    data: List[float] = []
+    for professor in professors:
+        for feature, weight in professor_features(professor).items():
+            indices.append(vocabulary.setdefault(feature, len(vocabulary)))
+            data.append(weight)
+        indptr.append(len(indices))
+
+    indptr = np.array(indptr, dtype=np.int64)
+    indices = np.array(indices, dtype=np.int64)
+    data = np.array(data, dtype=np.float64)
+    feature_count = len(vocabulary)
+
+    # Inverse document frequency, then L2 normalization of every row
+    document_frequency = np.bincount(indices, minlength=feature_count)
+    idf = np.log((1 + len(professors)) / (1 + document_frequency)) + 1.0
+    data = data * idf[indices]
+
+    rows = np.repeat(np.arange(len(professors)), np.diff(indptr))
+    norms = np.sqrt(np.bincount(rows, weights=data ** 2, minlength=len(professors)))
+    data = data / np.where(norms > 0, norms, 1.0)[rows]
+    return indptr, indices, data, feature_count
+
+
+def compute_neighbors(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, feature_count: int,
+                      k: int = DEFAULT_K, block_size: int = DEFAULT_BLOCK_SIZE) -> List[List[Tuple[int, float]]]:
+    """
+    Cosine top-k neighbours of every row of a CSR matrix.
+
+    The product X . X^T is evaluated one block of rows at a time by joining the
+    block's non-zeros with the column postings (X^T in CSR form), so memory
+    stays at O(block_size x N) whatever the number of professors.
+    """
+    row_count = len(indptr) - 1
+    rows = np.repeat(np.arange(row_count), np.diff(indptr))
+
+    # Transpose: for every feature, the rows containing it and their weights
+    order = np.argsort(indices, kind='stable')
+    posting_rows = rows[order]
+    posting_data = data[order]
+    posting_ptr = np.zeros(feature_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=feature_count), out=posting_ptr[1:])
+
+    neighbors: List[List[Tuple[int, float]]] = []
+    for start in range(0, row_count, block_size):
+        stop = min(start + block_size, row_count)
+        entry_start, entry_stop = indptr[start], indptr[stop]
+        entry_rows = rows[entry_start:entry_stop] - start
+        entry_features = indices[entry_start:entry_stop]
+        entry_data = data[entry_start:entry_stop]
+
+        # Expand every (row, feature) entry against the feature's posting list
+        lengths = posting_ptr[entry_features + 1] - posting_ptr[entry_features]
+        total = int(lengths.sum())
+        block_rows = stop - start
+        if total:
+            offsets = np.repeat(posting_ptr[entry_features] - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+            flat = np.repeat(entry_rows, lengths) * row_count + posting_rows[offsets]
+            weights = np.repeat(entry_data, lengths) * posting_data[offsets]
+            scores = np.bincount(flat, weights=weights, minlength=block_rows * row_count).reshape(block_rows, row_count)
+        else:
+            scores = np.zeros((block_rows, row_count))
+
+        # A professor is never their own neighbour
+        scores[np.arange(block_rows), np.arange(start, stop)] = 0.0
+
+        top = min(k, row_count)
+        if top <= 0:
+            neighbors.extend([] for _ in range(block_rows))
+            continue
+        candidates = np.argpartition(-scores, top - 1, axis=1)[:, :top] if top < row_count else np.tile(np.arange(row_count), (block_rows, 1))
+        for local, row_candidates in enumerate(candidates):
+            row_scores = scores[local, row_candidates]
+            ranked = np.lexsort((row_candidates, -row_scores))
+            neighbors.append([
+                (int(row_candidates[i]), round(float(row_scores[i]), 4))
+                for i in ranked if row_scores[i] > 0
+            ])
+    return neighbors
+
+
+def build_similarity_lists(professors: List[Dict], k: int = DEFAULT_K,
+                           block_size: int = DEFAULT_BLOCK_SIZE) -> Dict:
+    """Compute the neighbour lists for a professor list, keyed by professor id"""
+    start_time = time.time()
+    indptr, indices, data, feature_count = build_feature_matrix(professors)
+    neighbors = compute_neighbors(indptr, indices, data, feature_count, k=k, block_size=block_size)
+
+    ids = [str(p.get('id', '')) for p in professors]
+    result = {
+        'signature': data_signature(professors),
+        'generated': time.time(),
+        'k': k,
+        'feature_count': feature_count,
+        'neighbors': {
+            ids[row]: [{'id': ids[other], 'score': score} for other, score in row_neighbors]
+            for row, row_neighbors in enumerate(neighbors)
+        },
+    }
+    logger.info(f"Computed {k} nearest neighbours for {len(professors)} professors "
+                f"({feature_count} features) in {time.time() - start_time:.2f}s")
+    return result
+
+
+def save_similarity_lists(result: Dict, path: str = NEIGHBORS_FILE):
+    """Persist neighbour lists atomically"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+    os.replace(temp_path, path)
+    logger.info(f"Saved neighbour lists to {path}")
+
+
+_loaded_lists: Optional[Dict] = None
+_loaded_mtime = None
+
+
+def load_similarity_lists(path: str = NEIGHBORS_FILE) -> Optional[Dict]:
+    """Load persisted neighbour lists, re-reading the file only when it changes"""
+    global _loaded_lists, _loaded_mtime
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _loaded_lists is None or mtime != _loaded_mtime:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                _loaded_lists = json.load(f)
+            _loaded_mtime = mtime
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading neighbour lists: {e}")
+            return None
+    return _loaded_lists
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Precompute similar-professor neighbour lists")
+    parser.add_argument('--k', type=int, default=DEFAULT_K, help='Neighbours per professor')
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE, help='Rows per similarity block')
+    parser.add_argument('--output', default=NEIGHBORS_FILE, help='Where to write the neighbour lists')
+    args = parser.parse_args()
+
+    import database
+    professors = database.load_professors_data()
+    if not professors:
+        logger.error("No professors loaded; nothing to do")
+        return
+    save_similarity_lists(build_similarity_lists(professors, k=args.k, block_size=args.block_size), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Team assembly for projects.
+Finds a small set of professors that jointly covers a project's required
+expertise. This is weighted set cover, solved with the greedy algorithm and a
+lazy priority queue: a candidate's gain can only shrink as the team grows, so
+stale heap entries are re-scored only when they reach the top.
+"""
+
+import heapq
+import re
+from typing import Dict, List, Optional
+
+from professor_index import ProfessorIndex, iter_bits, normalize_key, popcount
+
+DEFAULT_MAX_TEAM_SIZE = 5
+DEFAULT_ALTERNATIVES = 3
+
+
+_WORD_CHAR = re.compile(r'\w')
+
+
+def word_spans(phrase: str) -> List[str]:
+    """
+    Every substring of ``phrase`` that starts and ends on a word boundary,
+    i.e. every string that occurs in it as whole words
+    """
+    starts = [i for i in range(len(phrase)) if i == 0 or not _WORD_CHAR.match(phrase[i - 1])]
+    ends = [j for j in range(1, len(phrase) + 1) if j == len(phrase) or not _WORD_CHAR.match(phrase[j])]
+    return [phrase[i:j] for i in starts for j in ends if j > i]
+
+
+def term_bitmap(index: ProfessorIndex, term: str) -> int:
+    """
+    Professors whose expertise covers ``term``.
+    A domain covers a term when either contains the other as whole words, so
+    'machine learning' is covered by 'Machine Learning and AI' and the term
+    'deep learning for medical imaging' is covered by 'Deep Learning'.
+    Domains inside the term are found by looking up the term's word spans in
+    the domain bitmaps, so the cost does not grow with the number of domains.
+    """
+    phrase = normalize_key(term)
+
+    def build():
+        bits = index.match_bitmap('domain', phrase)
+        domains = index.bitmaps['domain']
+        for span in word_spans(phrase):
+            bits |= domains.get(span, 0)
+        return bits
+
+    return index.memo(('covers', phrase), build)
+
+
+def professor_cost(index: ProfessorIndex, ordinal: int) -> float:
+    """Cost of adding a professor; stronger profiles are cheaper (between 0.5 and 1)"""
+    return 1.0 - 0.5 * float(index.scores[ordinal])
+
+
+def greedy_cover(coverage: Dict[int, int], costs: Dict[int, float], required: int,
+                 max_team_size: Optional[int] = None, excluded=frozenset()) -> List[int]:
+    """
+    Greedy weighted set cover with lazy evaluation.
+
+    Args:
+        coverage: ordinal -> bitmap of the required terms the professor covers
+        costs: ordinal -> cost of selecting the professor
+        required: bitmap of all coverable terms
+        max_team_size: stop after this many members
+        excluded: ordinals that may not be selected
+
+    Returns:
+        Selected ordinals in pick order
+    """
+    heap = [
+        (-popcount(bits) / costs[ordinal], ordinal)
+        for ordinal, bits in coverage.items() if ordinal not in excluded and bits
+    ]
+    heapq.heapify(heap)
+
+    uncovered = required
+    team = []
+    while heap and uncovered and (max_team_size is None or len(team) < max_team_size):
+        negative_ratio, ordinal = heapq.heappop(heap)
+        gain = popcount(coverage[ordinal] & uncovered)
+        if not gain:
+            continue
+        ratio = gain / costs[ordinal]
+        # Gains never grow, so a fresh score still at the top of the heap is the best choice
+        if heap and ratio < -heap[0][0] - 1e-12:
+            heapq.heappush(heap, (-ratio, ordinal))
+            continue
+        team.append(ordinal)
+        uncovered &= ~coverage[ordinal]
+    return team
+
+
+def build_teams(index: ProfessorIndex, required_expertise: List[str], colleges: Optional[List[str]] = None,
+                max_team_size: Optional[int] = DEFAULT_MAX_TEAM_SIZE,
+                alternatives: int = DEFAULT_ALTERNATIVES) -> Dict:
+    """
+    Build a team covering the required expertise plus alternative teams.
+
+    Alternatives are found by re-running the solver with one member of the
+    best team excluded at a time, keeping distinct teams.
+    """
+    terms = []
+    seen = set()
+    for term in required_expertise:
+        key = normalize_key(term)
+        if key and key not in seen:
+            seen.add(key)
+            terms.append(term.strip())
+
+    allowed = index.all_bits
+    if colleges:
+        allowed = index.filter_bitmap('college', colleges)
+
+    coverage: Dict[int, int] = {}
+    coverable = 0
+    for position, term in enumerate(terms):
+        bits = term_bitmap(index, term) & allowed
+        if bits:
+            coverable |= 1 << position
+        for ordinal in iter_bits(bits):
+            coverage[ordinal] = coverage.get(ordinal, 0) | (1 << position)
+    costs = {ordinal: professor_cost(index, ordinal) for ordinal in coverage}
+
+    def describe(team: List[int]) -> Dict:
+        covered = 0
+        members = []
+        for ordinal in team:
+            professor = dict(index.professors[ordinal])
+            professor['covers'] = [terms[i] for i in iter_bits(coverage[ordinal])]
+            professor['adds'] = [terms[i] for i in iter_bits(coverage[ordinal] & ~covered)]
+            covered |= coverage[ordinal]
+            members.append(professor)
+        return {
+            'members': members,
+            'size': len(members),
+            'covered': [terms[i] for i in iter_bits(covered)],
+            'uncovered': [terms[i] for i in iter_bits(coverable & ~covered)],
+            'coverage': round(popcount(covered) / len(terms), 4) if terms else 0,
+            'total_cost': round(sum(costs[o] for o in team), 4),
+        }
+
+    teams = []
+    best = greedy_cover(coverage, costs, coverable, max_team_size)
+    if best:
+        teams.append(describe(best))
+        seen_teams = {frozenset(best)}
+        for member in best:
+            if len(teams) > alternatives:
+                break
+            team = greedy_cover(coverage, costs, coverable, max_team_size, excluded=frozenset([member]))
+            if team and frozenset(team) not in seen_teams:
+                seen_teams.add(frozenset(team))
+                teams.append(describe(team))
+
+    return {
+        'required_expertise': terms,
+        'uncoverable': [terms[i] for i in range(len(terms)) if not coverable >> i & 1],
+        'candidates': len(coverage),
+        'teams': teams,
+    }
@@ -0,0 +1,39 @@
+from canonicalize_domains import acronyms_of, domain_key, find_duplicates, is_acronym_name
+
+def domains(*names):
+    # Earlier names have more links
+    return [{'id': i, 'name': name, 'links': len(names) - i} for i, name in enumerate(names)]
+
+def merged(result):
+    return {(m['alias'], m['canonical'], m['rule']) for m in result}
+
+def test_keys_and_acronyms():
+    assert domain_key('  Machine-Learning ') == domain_key('machine learning') == 'machine learning'
+    assert domain_key('C++') != domain_key('C#')
+    assert acronyms_of('internet of things') == {'iot', 'it'}
+    assert is_acronym_name('IoT') and is_acronym_name('nlp')
+    assert not is_acronym_name('Robotics') and not is_acronym_name('Machine Learning')
+
+def test_variants_merge_into_most_linked_name():
+    result = find_duplicates(domains('Machine Learning', 'machine-learning ', 'Machine Learnings', 'ML', 'Deep Learning'))
+    assert merged(result) == {
+        ('machine-learning ', 'Machine Learning', 'exact'),
+        ('Machine Learnings', 'Machine Learning', 'ngram'),
+        ('ML', 'Machine Learning', 'acronym'),
+    }
+
+def test_guards_against_wrong_merges():
+    result = find_duplicates(domains('Industry 4.0', 'Industry 5.0', 'Computer Vision', 'Curriculum Vitae', 'CV',
+                                     'Data Mining', 'Data Science'))
+    # Different numbers, an ambiguous acronym and merely similar names all stay
+    assert result == []
+
+def test_no_chains_through_aliases():
+    # Aliases are only compared with canonical names, never with other aliases
+    result = find_duplicates(domains('Neural Networks', 'Neural Network', 'Neural Networking'), threshold=0.7)
+    assert {m['canonical'] for m in result} == {'Neural Networks'}
+
+def test_recorded_aliases_are_reused():
+    result = find_duplicates(domains('Artificial Intelligence', 'Machine Intelligence'),
+                             known_aliases={'machine intelligence': 0})
+    assert merged(result) == {('Machine Intelligence', 'Artificial Intelligence', 'alias')}
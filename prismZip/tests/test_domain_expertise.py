@@ -1,109 +1,165 @@
 import pytest
-from domain_expertise_analyzer import DomainExpertiseAnalyzer
-import sqlite3
-import os
+import numpy as np
+from domain_expertise_analyzer import DomainExpertiseAnalyzer, group_percentiles
+from professor_index import ProfessorIndex
 
 @pytest.fixture
-def test_db():
-    """Create a test database with sample data"""
-    db_path = "test_professors.db"
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Create tables
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS professors (
-            id INTEGER PRIMARY KEY,
-            name TEXT,
-            email TEXT,
-            research_interests TEXT,
-            citations INTEGER,
-            h_index INTEGER,
-            google_scholar_url TEXT
-        )
-    """)
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS publications (
-            id INTEGER PRIMARY KEY,
-            professor_id INTEGER,
-            title TEXT,
-            FOREIGN KEY (professor_id) REFERENCES professors (id)
-        )
-    """)
-    
-    # Insert sample data
-    cursor.execute("""
-        INSERT INTO professors (name, email, research_interests, citations, h_index)
-        VALUES 
-            ('Dr. Smith', 'smith@example.com', 'Artificial Intelligence, Machine Learning', 5000, 30),
-            ('Dr. Jones', 'jones@example.com', 'Natural Language Processing, Deep Learning', 10000, 45),
-            ('Dr. Wilson', 'wilson@example.com', 'Computer Vision, Pattern Recognition', 2000, 20)
-    """)
-    
-    cursor.execute("""
-        INSERT INTO publications (professor_id, title)
-        VALUES 
-            (1, 'Advanced Machine Learning Techniques'),
-            (1, 'AI in Healthcare'),
-            (2, 'Deep Learning for NLP'),
-            (3, 'Computer Vision Applications')
-    """)
-    
-    conn.commit()
-    conn.close()
-    
-    yield db_path
-    
-    # Cleanup
-    os.remove(db_path)
+def test_index():
+    """Create an in-memory professor index with sample data"""
+    return ProfessorIndex([
+        {'id': 1, 'name': 'Dr. Smith', 'email': 'smith@example.com',
+         'expertise_array': ['Artificial Intelligence', 'Machine Learning'],
+         'citations_count': 5000, 'h_index': 30},
+        {'id': 2, 'name': 'Dr. Jones', 'email': 'jones@example.com',
+         'expertise_array': ['Natural Language Processing', 'Deep Learning', 'Machine Learning'],
+         'citations_count': 10000, 'h_index': 45},
+        {'id': 3, 'name': 'Dr. Wilson', 'email': 'wilson@example.com',
+         'expertise_array': ['Computer Vision', 'Pattern Recognition', 'Machine Learning'],
+         'citations_count': 2000, 'h_index': 20},
+        {'id': 4, 'name': 'Dr. Brown', 'email': 'brown@example.com',
+         'expertise_array': ['Machine Learning'],
+         'citations_count': 0, 'h_index': 0},
+    ])
 
 def test_calculate_expertise_score():
     analyzer = DomainExpertiseAnalyzer()
-    
-    # Test cases
-    assert analyzer.calculate_expertise_score(50000, 50) == 0.5  # Mid-level
-    assert analyzer.calculate_expertise_score(100000, 100) == 1.0  # Max score
+
+    # Test cases (field-relative percentiles)
+    assert analyzer.calculate_expertise_score(0.5, 0.5) == 0.5  # Mid-level
+    assert analyzer.calculate_expertise_score(1.0, 1.0) == 1.0  # Max score
     assert analyzer.calculate_expertise_score(0, 0) == 0.0  # Min score
-    assert analyzer.calculate_expertise_score(25000, 25) == 0.25  # Quarter score
+    assert analyzer.calculate_expertise_score(0.25, 0.25) == 0.25  # Quarter score
 
 def test_get_expertise_level():
     analyzer = DomainExpertiseAnalyzer()
-    
+
     assert analyzer.get_expertise_level(0.9) == "Expert"
     assert analyzer.get_expertise_level(0.7) == "Advanced"
     assert analyzer.get_expertise_level(0.4) == "Intermediate"
     assert analyzer.get_expertise_level(0.2) == "Basic"
 
-def test_search_domain_experts(test_db):
-    analyzer = DomainExpertiseAnalyzer(test_db)
-    
+def test_group_percentiles():
+    groups = np.array([0, 0, 0, 0, 1, 1])
+    values = np.array([10, 30, 20, 30, 0, 5])
+
+    assert group_percentiles(groups, values).tolist() == [0.25, 1.0, 0.5, 1.0, 0.0, 1.0]
+
+def test_search_domain_experts(test_index):
+    analyzer = DomainExpertiseAnalyzer(test_index)
+
     # Test searching for AI experts
     ai_experts = analyzer.search_domain_experts("Artificial Intelligence")
     assert len(ai_experts) > 0
     assert any(expert["name"] == "Dr. Smith" for expert in ai_experts)
-    
+
     # Test searching for NLP experts
     nlp_experts = analyzer.search_domain_experts("Natural Language Processing")
     assert len(nlp_experts) > 0
     assert any(expert["name"] == "Dr. Jones" for expert in nlp_experts)
-    
+
     # Test minimum expertise level filtering
     advanced_experts = analyzer.search_domain_experts("Machine Learning", "Expert")
     basic_experts = analyzer.search_domain_experts("Machine Learning", "Basic")
     assert len(advanced_experts) <= len(basic_experts)
+    assert [expert["name"] for expert in basic_experts] == ['Dr. Jones', 'Dr. Smith', 'Dr. Wilson', 'Dr. Brown']
+
+def test_scores_are_field_relative(test_index):
+    analyzer = DomainExpertiseAnalyzer(test_index)
+
+    # Computer Vision has one professor, so Dr. Wilson is ranked within the AI field
+    cv_experts = analyzer.search_domain_experts("Computer Vision", "Basic")
+    assert cv_experts[0]["name"] == "Dr. Wilson"
+    assert cv_experts[0]["expertise_score"] == 0.5
+
+    ml_experts = {e["name"]: e for e in analyzer.search_domain_experts("Machine Learning", "Basic")}
+    assert ml_experts["Dr. Wilson"]["expertise_level"] == "Intermediate"
+    assert ml_experts["Dr. Brown"]["expertise_score"] == 0.0
+
+def test_get_domain_statistics(test_index):
+    analyzer = DomainExpertiseAnalyzer(test_index)
 
-def test_get_domain_statistics(test_db):
-    analyzer = DomainExpertiseAnalyzer(test_db)
-    
     # Test statistics for AI domain
     ai_stats = analyzer.get_domain_statistics("Artificial Intelligence")
     assert ai_stats["total_experts"] > 0
     assert "expertise_distribution" in ai_stats
     assert "average_citations" in ai_stats
     assert "average_h_index" in ai_stats
-    
+
+    ml_stats = analyzer.get_domain_statistics("machine learning")
+    assert ml_stats["total_experts"] == 4
+    assert sum(ml_stats["expertise_distribution"].values()) == 4
+    assert ml_stats["average_citations"] == 4250
+
     # Test statistics for non-existent domain
     empty_stats = analyzer.get_domain_statistics("Non Existent Domain")
     assert empty_stats["total_experts"] == 0
-    assert empty_stats["expertise_distribution"] == {}
\ No newline at end of file
+    assert empty_stats["expertise_distribution"] == {}
+
+def test_all_domain_statistics_are_cached(test_index):
+    analyzer = DomainExpertiseAnalyzer(test_index)
+
+    statistics = analyzer.get_all_domain_statistics()
+    assert set(statistics) == {label for label in test_index.labels['domain'].values()}
+    assert analyzer.get_all_domain_statistics() is statistics
+
+def test_leaderboards_use_field_relative_scores(test_index):
+    analyzer = DomainExpertiseAnalyzer(test_index)
+
+    ordinals, scores = analyzer.leaderboard('domain', 'Machine Learning')
+    assert ordinals.tolist() == [1, 0, 2, 3]
+    assert scores[0] == 1.0 and list(scores) == sorted(scores, reverse=True)
+
+    # Alone in Computer Vision, Dr. Wilson is scored against the whole AI field
+    ordinals, scores = analyzer.leaderboard('domain', 'vision')
+    assert ordinals.tolist() == [2] and scores[0] == 0.5
+
+    # Boards can be restricted to a bitmap, and the level cut is a prefix
+    ordinals, _ = analyzer.leaderboard('domain', 'Machine Learning', within=0b1100)
+    assert ordinals.tolist() == [2, 3]
+    board = analyzer.leaderboard('domain', 'Machine Learning')
+    assert analyzer.count_at_least(board, 0.0) == 4
+    assert analyzer.count_at_least(board, 1.1) == 0
+
+def test_leaderboard_levels_match_statistics(test_index):
+    analyzer = DomainExpertiseAnalyzer(test_index)
+
+    _, scores = analyzer.leaderboard('domain', 'Machine Learning')
+    levels = {}
+    for score in scores:
+        level = analyzer.get_expertise_level(float(score))
+        levels[level] = levels.get(level, 0) + 1
+    assert levels == analyzer.get_domain_statistics('Machine Learning')['expertise_distribution']
+
+def test_field_and_college_leaderboards():
+    index = ProfessorIndex([
+        {'id': 1, 'college': 'X', 'expertise_array': ['Computer Vision'], 'citations_count': 10, 'h_index': 2},
+        {'id': 2, 'college': 'X', 'expertise_array': ['Natural Language Processing'], 'citations_count': 500, 'h_index': 9},
+        {'id': 3, 'college': 'Y', 'expertise_array': ['Blockchain'], 'citations_count': 50, 'h_index': 4},
+    ])
+    analyzer = DomainExpertiseAnalyzer(index)
+
+    ordinals, scores = analyzer.leaderboard('field', 'Artificial Intelligence')
+    # Both domains are too small, so both are ranked within the field
+    assert ordinals.tolist() == [1, 0] and scores.tolist() == [1.0, 0.5]
+    assert analyzer.leaderboard('college', 'X')[0].tolist() == [1, 0]
+
+def test_singleton_domain_is_not_an_automatic_expert():
+    professors = [
+        {'id': i, 'expertise_array': ['Machine Learning'], 'citations_count': 1000 + i * 100, 'h_index': 10 + i}
+        for i in range(6)
+    ]
+    professors.append({'id': 99, 'expertise_array': ['Quantum Machine Learning'], 'citations_count': 1, 'h_index': 1})
+    analyzer = DomainExpertiseAnalyzer(ProfessorIndex(professors))
+
+    niche = analyzer.search_domain_experts('Quantum Machine Learning', 'Basic')
+    assert [expert['id'] for expert in niche] == [99]
+    assert niche[0]['expertise_level'] == 'Basic'
+    # Large enough domains are still ranked within the domain
+    assert analyzer.search_domain_experts('Machine Learning', 'Expert')[0]['id'] == 5
+
+def test_no_citation_data_has_no_metrics():
+    index = ProfessorIndex([{'id': 1, 'expertise_array': ['Machine Learning']}])
+    analyzer = DomainExpertiseAnalyzer(index)
+
+    assert not analyzer.has_metrics
+    assert analyzer.leaderboard('domain', 'Machine Learning')[1].tolist() == [0.0]
@@ -0,0 +1,38 @@
+import numpy as np
+from domain_relations import incidence_matrix, cooccurrence_counts, related_domains, get_related_domains
+
+MEMBERSHIPS = [
+    ['ml', 'cv', 'chain'],
+    ['ml', 'cv'],
+    ['chain', 'security'],
+    ['chain', 'security', 'robotics'],
+    ['robotics', 'robotics'],
+    [],
+]
+
+def test_cooccurrence_matches_dense_product():
+    rows, cols, keys = incidence_matrix(MEMBERSHIPS)
+    dense = np.zeros((len(MEMBERSHIPS), len(keys)))
+    dense[rows, cols] = 1
+    expected = dense.T @ dense
+
+    left, right, counts = cooccurrence_counts(rows, cols, len(keys))
+    assert (left < right).all()
+    actual = np.zeros_like(expected)
+    actual[left, right] = counts
+    assert np.array_equal(np.triu(expected, 1), actual)
+
+def test_related_domains_keep_strong_pairs():
+    edges = related_domains(MEMBERSHIPS)
+    assert [(e['source'], e['target'], e['count']) for e in edges] == [('ml', 'cv', 2), ('chain', 'security', 2)]
+    assert edges[0]['score'] >= edges[1]['score'] > 0
+
+    jaccard = related_domains(MEMBERSHIPS, metric='jaccard', min_count=1)
+    assert {(e['source'], e['target']): e['score'] for e in jaccard}[('ml', 'cv')] == 1.0
+
+def test_related_domains_are_cached_per_version_and_memberships():
+    edges = get_related_domains(MEMBERSHIPS, version=7)
+    assert get_related_domains([list(m) for m in MEMBERSHIPS], version=7) is edges
+    # Other memberships under the same version are not served stale edges
+    assert get_related_domains([], version=7) == []
+    assert get_related_domains([], version=8) == []
@@ -0,0 +1,59 @@
+import pytest
+from expertise_query import compile_query, QuerySyntaxError
+from professor_index import ProfessorIndex, iter_bits
+
+@pytest.fixture
+def index():
+    return ProfessorIndex([
+        {'id': 1, 'name': 'Dr. Smith', 'college': 'X College',
+         'expertise_array': ['Computer Vision', 'Machine Learning'],
+         'citations_count': 5000, 'h_index': 30, 'has_google_scholar': True},
+        {'id': 2, 'name': 'Dr. Jones', 'college': 'Y College',
+         'expertise_array': ['Image Processing'],
+         'citations_count': 10000, 'h_index': 45, 'has_semantic_scholar': True},
+        {'id': 3, 'name': 'Dr. Wilson', 'college': 'X College',
+         'expertise_array': ['Image Processing', 'Blockchain'],
+         'citations_count': 2000, 'h_index': 20},
+        {'id': 4, 'name': 'Dr. Brown', 'college': 'X College',
+         'expertise_array': ['Blockchain'],
+         'citations_count': 100, 'h_index': 3},
+    ])
+
+def names(index, query):
+    return [index.professors[i]['name'] for i in iter_bits(compile_query(query).evaluate(index))]
+
+def test_boolean_operators(index):
+    query = '(computer vision OR image processing) AND college:"X College" AND NOT blockchain'
+    assert names(index, query) == ['Dr. Smith']
+    assert names(index, 'blockchain OR machine learning') == ['Dr. Smith', 'Dr. Wilson', 'Dr. Brown']
+    assert names(index, 'NOT blockchain') == ['Dr. Smith', 'Dr. Jones']
+
+def test_predicates(index):
+    assert names(index, 'has_scholar:true') == ['Dr. Smith', 'Dr. Jones']
+    assert names(index, 'has_scholar:false') == ['Dr. Wilson', 'Dr. Brown']
+    assert names(index, 'citations>=5000') == ['Dr. Smith', 'Dr. Jones']
+    assert names(index, 'image processing h_index:<30') == ['Dr. Wilson']
+    assert names(index, 'college:"Y College" blockchain') == []
+
+def test_search_ranks_by_matched_terms_then_citations(index):
+    result = compile_query('image processing OR blockchain').search(index)
+    assert result['total_count'] == 3
+    assert [p['name'] for p in result['professors']] == ['Dr. Wilson', 'Dr. Jones', 'Dr. Brown']
+    assert result['professors'][0]['matched_terms'] == 2
+
+@pytest.mark.parametrize('query', ['', '(blockchain', 'blockchain AND', 'has_scholar:maybe', 'rating>3'])
+def test_invalid_queries(query):
+    with pytest.raises(QuerySyntaxError):
+        compile_query(query)
+
+def test_parsed_query_description():
+    assert str(compile_query('a OR b c AND NOT d')) == '(domain:"a" OR (domain:"b c" AND NOT domain:"d"))'
+
+def test_lowercase_operators_are_part_of_phrases():
+    index = ProfessorIndex([
+        {'id': 1, 'name': 'Dr. Rao', 'expertise_array': ['Signal and Image Processing']},
+        {'id': 2, 'name': 'Dr. Lee', 'expertise_array': ['Signal Processing', 'Image Processing']},
+    ])
+    assert str(compile_query('signal and image processing')) == 'domain:"signal and image processing"'
+    assert names(index, 'signal and image processing') == ['Dr. Rao']
+    assert names(index, 'signal processing AND image processing') == ['Dr. Lee']
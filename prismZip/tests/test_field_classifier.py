@@ -0,0 +1,33 @@
+from field_classifier import FieldClassifier, SUBFIELD_TO_FIELD_MAP, DEFAULT_FIELD, classify_domain
+
+def naive_classify(domain):
+    domain_lower = domain.lower()
+    for keyword, field in SUBFIELD_TO_FIELD_MAP.items():
+        if keyword in domain_lower:
+            return field
+    return DEFAULT_FIELD
+
+def test_matches_first_keyword_in_map_order():
+    domains = [
+        'Deep Learning for Medical Imaging',
+        'Wireless Sensor Networks',
+        'Blockchain and Cryptography',
+        'Big Data Analytics',
+        'IoT Security',
+        'NoSQL Databases',
+        'Quantum Poetry',
+        '',
+    ]
+    for domain in domains:
+        assert classify_domain(domain) == naive_classify(domain), domain
+
+def test_priority_is_map_order_not_position():
+    classifier = FieldClassifier({'she': 'A', 'he': 'B', 'hers': 'C'}, default='none')
+    assert classifier.classify('ushers') == 'A'
+    assert classifier.classify('he') == 'B'
+    assert classifier.classify('rs') == 'none'
+    assert classifier.classify('HERS') == 'B'
+
+def test_classify_terms_groups_by_field():
+    groups = FieldClassifier({'vision': 'AI', 'ledger': 'Security'}).classify_terms(['Computer Vision', 'Ledgers', 'Poetry'])
+    assert groups == {'AI': ['Computer Vision'], 'Security': ['Ledgers'], DEFAULT_FIELD: ['Poetry']}
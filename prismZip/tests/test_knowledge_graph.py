@@ -11,7 +11,7 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from flask import Flask
-from knowledge_graph_routes import knowledge_graph_bp, mapToCytoscapeElements_test
+from knowledge_graph_routes import knowledge_graph_bp
 
 @pytest.fixture
 def app():
@@ -0,0 +1,79 @@
+import copy
+from knowledge_graph_builder import DynamicKnowledgeGraph
+from field_classifier import classify_domain
+from knowledge_graph_routes import graph_view
+
+PROFESSORS = [
+    {'id': 1, 'name': 'A', 'domain_expertise': 'Machine Learning, Computer Vision', 'citations_count': 100},
+    {'id': 2, 'name': 'B', 'domain_expertise': 'Machine learning | Blockchain', 'citations_count': 300},
+    {'id': 3, 'name': 'C', 'domain_expertise': 'Blockchain, Network Security', 'citations_count': 50},
+    {'id': 4, 'name': 'D', 'domain_expertise': 'Quantum Poetry', 'citations_count': 10},
+    {'id': 5, 'name': 'E', 'domain_expertise': ''},
+]
+
+def fields_by_label(graph):
+    return {field['label']: field for field in graph['@graph']}
+
+def test_builds_field_subfield_person_hierarchy():
+    graph = DynamicKnowledgeGraph()
+    graph.update(PROFESSORS, version=1)
+    fields = fields_by_label(graph.graph)
+
+    assert classify_domain('Quantum Poetry') == 'General Computing'
+    assert set(fields) == {'Artificial Intelligence', 'Cybersecurity', 'General Computing'}
+    ml = next(s for s in fields['Artificial Intelligence']['children'] if s['id'] == 'subfield-machine-learning')
+    # Spelling variants share one subfield, people sorted by citations
+    assert [p['label'] for p in ml['children']] == ['B', 'A']
+    assert ml['totalCitations'] == 400
+    assert fields['Cybersecurity']['professorCount'] == 3
+    assert graph.graph['metadata']['totalProfessors'] == 4
+    assert graph.graph['metadata']['dataVersion'] == 1
+
+def test_update_rebuilds_only_affected_nodes():
+    graph = DynamicKnowledgeGraph()
+    graph.update(PROFESSORS, version=1)
+    before = fields_by_label(graph.graph)
+
+    professors = copy.deepcopy(PROFESSORS)
+    professors[2]['citations_count'] = 500
+    changes = graph.update(professors, version=2)
+    after = fields_by_label(graph.graph)
+
+    assert changes['updated'] == [3] and changes['added'] == [] and changes['removed'] == []
+    assert changes['fields'] == {'Cybersecurity'}
+    assert after['Artificial Intelligence'] is before['Artificial Intelligence']
+    assert after['Cybersecurity'] is not before['Cybersecurity']
+    assert after['Cybersecurity']['totalCitations'] == 300 + 500 + 500
+    # The previous graph object is left untouched
+    assert before['Cybersecurity']['totalCitations'] == 300 + 50 + 50
+
+    changes = graph.update(professors[:3], version=3)
+    assert changes['removed'] == [4]
+    assert 'General Computing' not in fields_by_label(graph.graph)
+
+def test_graph_view_does_not_mutate_cached_graph():
+    graph = DynamicKnowledgeGraph()
+    graph.update(PROFESSORS, version=1)
+    snapshot = copy.deepcopy(graph.graph)
+
+    collapsed = graph_view(graph.graph, expand='none')
+    assert all('children' not in node and node['hasChildren'] for node in collapsed['@graph'])
+    filtered = graph_view(graph.graph, field_filter='field-cybersecurity')
+    assert [node['id'] for node in filtered['@graph']] == ['field-cybersecurity']
+    assert graph.graph == snapshot
+
+def test_compact_graph_references_each_person_once():
+    graph = DynamicKnowledgeGraph()
+    graph.update(PROFESSORS, version=1)
+
+    compact = graph.compact()
+    assert compact is graph.compact()
+    assert set(compact['people']) == {'person-1', 'person-2', 'person-3', 'person-4'}
+    assert all('professorData' not in person for person in compact['people'].values())
+    ml = next(s for f in compact['@graph'] for s in f['children'] if s['id'] == 'subfield-machine-learning')
+    assert ml['members'] == ['person-2', 'person-1'] and 'children' not in ml
+
+    columnar = graph.compact(columnar=True)
+    ml = next(s for f in columnar['@graph'] for s in f['children'] if s['id'] == 'subfield-machine-learning')
+    assert [columnar['people']['label'][row] for row in ml['members']] == ['B', 'A']
+    assert len(columnar['people']['id']) == 4
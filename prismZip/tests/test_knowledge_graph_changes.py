@@ -0,0 +1,130 @@
+import copy
+from flask import Flask
+from knowledge_graph_builder import DynamicKnowledgeGraph
+from knowledge_graph_changes import ChangeLog, diff_graphs
+from knowledge_graph_routes import knowledge_graph_bp
+
+def node(node_id, children=None, **attributes):
+    result = dict({'id': node_id, 'type': 'Subfield'}, **attributes)
+    if children is not None:
+        result['children'] = children
+    return result
+
+def apply(graph, patches):
+    """Reference client: apply patches to a copy of a graph"""
+    graph = copy.deepcopy(graph)
+    nodes, parents = {}, {}
+    def index(children, parent):
+        for child in children:
+            nodes[child['id']] = child
+            parents.setdefault(child['id'], []).append(parent)
+            index(child.get('children', []), child['id'])
+    index(graph['@graph'], None)
+    def children_of(parent):
+        return graph['@graph'] if parent is None else nodes[parent].setdefault('children', [])
+    for patch in patches:
+        for op in patch['operations']:
+            kind = op['op']
+            if kind == 'remove':
+                children_of(op['parent'])[:] = [c for c in children_of(op['parent']) if c['id'] != op['id']]
+            elif kind in ('add', 'move'):
+                parent = op['parent'] if kind == 'add' else op['to']
+                if kind == 'move':
+                    children_of(op['from'])[:] = [c for c in children_of(op['from']) if c['id'] != op['id']]
+                target = nodes.get(op['id'])
+                if target is None or 'node' in op:
+                    target = dict(op.get('node', {}), children=target.get('children', []) if target else [])
+                    nodes[op['id']] = target
+                children_of(parent).append(target)
+            elif kind == 'update':
+                nodes[op['id']].update(op['node'])
+            elif kind == 'order':
+                by_id = {c['id']: c for c in children_of(op['id'])}
+                children_of(op['id'])[:] = [by_id[i] for i in op['children']]
+            elif kind == 'relationships':
+                removed = {tuple(pair) for pair in op['removed']}
+                edges = {(e['source'], e['target']): e for e in graph['relationships']
+                         if (e['source'], e['target']) not in removed}
+                edges.update({(e['source'], e['target']): e for e in op['added']})
+                graph['relationships'] = list(edges.values())
+    return graph
+
+def shape(graph):
+    def visit(children):
+        return [(c['id'], c.get('label'), visit(c.get('children', []))) for c in children]
+    return visit(graph['@graph']), sorted((e['source'], e['target'], e.get('weight')) for e in graph['relationships'])
+
+def test_diff_reports_adds_removes_moves_updates_and_order():
+    person = node('p1', type='Person', label='P1')
+    old = {'@graph': [
+        node('a', [node('a1', [person]), node('a2', []), node('a0', [])], label='A'),
+        node('b', [node('b1', [node('p2', type='Person', label='P2')])], label='B'),
+    ], 'relationships': [{'source': 'a1', 'target': 'b1', 'weight': 1}]}
+    new = {'@graph': [
+        node('b', [node('b1', [node('p2', type='Person', label='P2 renamed')])], label='B'),
+        node('a', [node('a1', []), node('a2', [person]), node('a3', [])], label='A'),
+    ], 'relationships': [{'source': 'a2', 'target': 'b1', 'weight': 1}]}
+
+    operations = diff_graphs(old, new)
+    kinds = {(op['op'], op.get('id')) for op in operations}
+    assert ('remove', 'a0') in kinds and ('add', 'a3') in kinds
+    assert ('update', 'p2') in kinds and ('order', None) in kinds
+    # p1 left a1 and joined a2 unchanged: a move without data
+    move = next(op for op in operations if op['op'] == 'move')
+    assert move == {'op': 'move', 'id': 'p1', 'from': 'a1', 'to': 'a2'}
+    assert shape(apply(old, [{'operations': operations}])) == shape(new)
+
+def test_unchanged_shared_subtrees_are_skipped():
+    shared = node('a', [node('a1', [node('p1', type='Person')])])
+    old = {'@graph': [shared], 'relationships': []}
+    new = {'@graph': [shared, node('b', [])], 'relationships': []}
+    assert diff_graphs(old, new) == [{'op': 'add', 'id': 'b', 'parent': None, 'node': {'id': 'b', 'type': 'Subfield'}}]
+
+def test_change_log_replays_or_asks_for_reload():
+    log = ChangeLog(max_patches=2, max_operations=3)
+    log.record(1, 2, [{'op': 'remove', 'id': 'x', 'parent': None}])
+    log.record(2, 3, [{'op': 'remove', 'id': 'y', 'parent': None}])
+    assert [patch['to'] for patch in log.since(1)] == [2, 3]
+    log.record(3, 4, [{'op': 'remove', 'id': 'z', 'parent': None}] * 3)
+    # Version 1 dropped out of the log, and 2 -> 4 is over the operation limit
+    assert log.since(1) is None
+    assert log.since(2) is None
+    assert [patch['to'] for patch in log.since(3)] == [4]
+
+def test_dynamic_graph_patches_match_rebuilt_graph():
+    rows = [{'id': i, 'name': f'Prof {i}', 'domain_expertise': domain, 'citations_count': i}
+            for i, domain in enumerate(['Machine Learning', 'Computer Vision, Machine Learning', 'Databases', 'NLP'])]
+    graph = DynamicKnowledgeGraph()
+    graph.update(rows, 1)
+    before = copy.deepcopy(graph.graph)
+
+    rows = copy.deepcopy(rows)
+    rows[0]['citations_count'] = 500
+    rows[1]['domain_expertise'] = 'Computer Vision'
+    rows[3]['domain_expertise'] = 'Databases'
+    rows.append({'id': 9, 'name': 'Prof 9', 'domain_expertise': 'Robotics'})
+    graph.update(rows, 2)
+
+    assert graph.last_update['operations']
+    patched = apply(before, graph.changes.since(1))
+    assert shape(patched) == shape(graph.graph)
+
+def test_changes_endpoint(monkeypatch):
+    import professor_routes
+    current = {'rows': [{'id': 1, 'name': 'A', 'domain_expertise': 'Machine Learning'}]}
+    monkeypatch.setattr(professor_routes, 'load_teachers_data', lambda: current['rows'])
+    monkeypatch.setattr(professor_routes, 'get_cached_citations', lambda: None)
+    app = Flask(__name__)
+    app.register_blueprint(knowledge_graph_bp)
+    client = app.test_client()
+
+    version = client.get('/api/knowledge-graph?source=dynamic').get_json()['metadata']['dataVersion']
+    assert client.get('/api/knowledge-graph/changes').status_code == 400
+    assert client.get(f'/api/knowledge-graph/changes?since={version}').get_json()['patches'] == []
+
+    current['rows'] = current['rows'] + [{'id': 2, 'name': 'B', 'domain_expertise': 'Databases'}]
+    data = client.get(f'/api/knowledge-graph/changes?since={version}').get_json()
+    assert data['reload'] is False and data['version'] == version + 1
+    added = [op['id'] for op in data['patches'][0]['operations'] if op['op'] == 'add']
+    assert 'person-2' in added
+    assert client.get('/api/knowledge-graph/changes?since=-5').get_json()['reload'] is True
@@ -0,0 +1,63 @@
+import json
+import xml.etree.ElementTree as ET
+from knowledge_graph_export import cytoscape_elements, iter_cytoscape_json, iter_graphml, parse_collapsed
+
+GRAPH = {
+    '@graph': [
+        {'id': 'field-a', 'type': 'Field', 'label': 'A & B', 'children': [
+            {'id': 'sub-1', 'type': 'Subfield', 'label': 'One', 'children': [
+                {'id': 'p-1', 'type': 'Person', 'label': 'P1', 'citations': 10},
+                {'id': 'p-2', 'type': 'Person', 'label': 'P2'},
+            ]},
+            {'id': 'sub-2', 'type': 'Subfield', 'label': 'Two', 'children': [
+                {'id': 'p-1', 'type': 'Person', 'label': 'P1', 'citations': 10},
+            ]},
+        ]},
+    ],
+    'relationships': [
+        {'source': 'sub-1', 'target': 'sub-2', 'type': 'RELATED_TO', 'label': 'shares'},
+        {'source': 'p-2', 'target': 'sub-2', 'type': 'RELATED_TO'},
+    ],
+}
+
+def test_shared_person_becomes_one_node_with_two_edges():
+    elements = cytoscape_elements(GRAPH)
+    ids = [node['data']['id'] for node in elements['nodes']]
+    assert ids == ['field-a', 'sub-1', 'p-1', 'p-2', 'sub-2']
+    relations = {edge['data']['id']: edge['data']['relation'] for edge in elements['edges']}
+    assert relations['field-a->sub-1'] == 'HAS_SUBFIELD'
+    assert relations['sub-1->p-1'] == 'HAS_MEMBER'
+    assert relations['sub-2->p-1'] == 'HAS_MEMBER'
+    assert relations['sub-1->sub-2-rel'] == 'RELATED_TO'
+    p1 = elements['nodes'][2]['data']
+    assert p1['depth'] == 2 and p1['citations'] == 10 and p1['childCount'] == 0
+
+def test_collapsed_nodes_hide_children_and_dangling_relationships():
+    elements = cytoscape_elements(GRAPH, collapsed={'sub-1'})
+    ids = [node['data']['id'] for node in elements['nodes']]
+    assert ids == ['field-a', 'sub-1', 'sub-2', 'p-1']
+    sub1 = elements['nodes'][1]
+    assert sub1['data']['isCollapsed'] and sub1['classes'] == 'collapsed'
+    assert sub1['data']['childCount'] == 2
+    edge_ids = {edge['data']['id'] for edge in elements['edges']}
+    assert 'p-2->sub-2-rel' not in edge_ids
+    assert 'sub-1->sub-2-rel' in edge_ids
+
+def test_streamed_json_matches_elements():
+    elements = cytoscape_elements(GRAPH)
+    chunks = list(iter_cytoscape_json(elements, chunk_size=2))
+    assert len(chunks) > 3
+    assert json.loads(''.join(chunks)) == json.loads(json.dumps(elements))
+
+def test_graphml_is_well_formed():
+    elements = cytoscape_elements(GRAPH)
+    root = ET.fromstring(''.join(iter_graphml(elements, chunk_size=2)))
+    ns = {'g': 'http://graphml.graphdrawing.org/xmlns'}
+    assert len(root.findall('.//g:node', ns)) == 5
+    assert len(root.findall('.//g:edge', ns)) == len(elements['edges'])
+    label = root.find(".//g:node[@id='field-a']/g:data[@key='label']", ns)
+    assert label.text == 'A & B'
+
+def test_parse_collapsed():
+    assert parse_collapsed(None) == frozenset()
+    assert parse_collapsed('a, b,,') == {'a', 'b'}
@@ -0,0 +1,67 @@
+import json
+from flask import Flask
+from knowledge_graph_index import GraphIndex
+from knowledge_graph_routes import knowledge_graph_bp, load_knowledge_graph
+
+GRAPH = {
+    '@graph': [
+        {'id': 'field-a', 'type': 'Field', 'label': 'A', 'children': [
+            {'id': 'sub-1', 'type': 'Subfield', 'label': 'One', 'children': [
+                {'id': 'person-1', 'type': 'Person', 'label': 'P1'},
+                {'id': 'person-2', 'type': 'Person', 'label': 'P2'},
+            ]},
+            {'id': 'sub-2', 'type': 'Subfield', 'label': 'Two', 'children': [
+                {'id': 'person-1', 'type': 'Person', 'label': 'P1'},
+            ]},
+            {'id': 'sub-3', 'type': 'Subfield', 'label': 'Three'},
+        ]},
+        {'id': 'field-b', 'type': 'Field', 'label': 'B', 'children': []},
+    ]
+}
+
+def test_index_records_parents_and_depth():
+    index = GraphIndex(GRAPH)
+    assert index.depths == {'field-a': 1, 'sub-1': 2, 'person-1': 3, 'person-2': 3, 'sub-2': 2, 'sub-3': 2, 'field-b': 1}
+    assert index.parents['person-1'] == ['sub-1', 'sub-2']
+    assert index.path('person-2') == ['field-a', 'sub-1']
+    assert index.max_depth == 3
+
+def test_subtree_depth_and_child_pagination():
+    index = GraphIndex(GRAPH)
+
+    node = index.subtree('field-a', depth=1, offset=1, limit=1)
+    assert [child['id'] for child in node['children']] == ['sub-2']
+    assert node['children'][0] == {'id': 'sub-2', 'type': 'Subfield', 'label': 'Two', 'hasChildren': True, 'childCount': 1}
+    assert node['childCount'] == 3 and node['hasMore'] is True
+
+    node = index.subtree('sub-1')
+    assert [child['id'] for child in node['children']] == ['person-1', 'person-2']
+    assert node['parentId'] == 'field-a' and node['hasMore'] is False
+    assert 'children' not in index.subtree('field-a', depth=0)
+    assert index.subtree('missing') is None
+    # The indexed graph is untouched
+    assert 'parentId' not in GRAPH['@graph'][0] and len(GRAPH['@graph'][0]['children']) == 3
+
+def test_field_endpoint_serves_static_subtrees():
+    app = Flask(__name__)
+    app.register_blueprint(knowledge_graph_bp)
+    client = app.test_client()
+
+    field_id = load_knowledge_graph()['@graph'][0]['id']
+    response = client.get(f'/api/knowledge-graph/field/{field_id}?depth=0')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['id'] == field_id and data['depth'] == 1 and 'children' not in data
+
+    assert client.get('/api/knowledge-graph/field/does-not-exist').status_code == 404
+
+def test_unbounded_subtree_is_a_copy():
+    graph = {'@graph': [{'id': 'f', 'children': [
+        {'id': 's', 'children': [{'id': 'p', 'professorData': {'name': 'A'}}]},
+    ]}]}
+    node = GraphIndex(graph).subtree('f')
+    node['children'][0]['children'][0]['professorData']['name'] = 'B'
+    node['children'][0]['children'].clear()
+
+    subfield = graph['@graph'][0]['children'][0]
+    assert subfield['children'][0]['professorData']['name'] == 'A'
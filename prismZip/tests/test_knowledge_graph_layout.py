@@ -0,0 +1,53 @@
+import math
+from knowledge_graph_layout import radial_layout
+
+GRAPH = {
+    '@graph': [
+        {'id': 'field-a', 'children': [
+            {'id': 'sub-1', 'children': [{'id': 'p-1'}, {'id': 'p-2'}, {'id': 'p-3'}]},
+            {'id': 'sub-2', 'children': [{'id': 'p-1'}]},
+        ]},
+        {'id': 'field-b', 'children': [{'id': 'sub-3'}]},
+    ]
+}
+
+def positions(layout):
+    return {node_id: (x, y) for node_id, x, y in zip(layout['ids'], layout['x'], layout['y'])}
+
+def test_nodes_sit_on_depth_rings_once():
+    layout = radial_layout(GRAPH)
+    assert layout['ids'] == ['field-a', 'sub-1', 'p-1', 'p-2', 'p-3', 'sub-2', 'field-b', 'sub-3']
+    radii = {node_id: math.hypot(x, y) for node_id, (x, y) in positions(layout).items()}
+    ring = radii['field-a']
+    assert math.isclose(radii['sub-1'], 2 * ring, rel_tol=1e-3)
+    assert math.isclose(radii['p-2'], 3 * ring, rel_tol=1e-3)
+
+def test_subtrees_get_disjoint_wedges():
+    layout = radial_layout(GRAPH)
+    angle = {node_id: math.atan2(y, x) % (2 * math.pi) for node_id, (x, y) in positions(layout).items()}
+    # sub-1 has three leaves, centred on its middle leaf; siblings keep their order
+    assert math.isclose(angle['sub-1'], angle['p-2'], abs_tol=1e-3)
+    assert angle['p-1'] < angle['p-2'] < angle['p-3'] < angle['sub-2'] < angle['sub-3']
+
+def test_empty_graph():
+    assert radial_layout({'@graph': []})['ids'] == []
+
+def test_layout_endpoint_on_fresh_snapshot():
+    import threading
+    from flask import Flask
+    from knowledge_graph_routes import knowledge_graph_bp, _static_graph
+    from knowledge_graph_store import GraphSnapshot
+
+    app = Flask(__name__)
+    app.register_blueprint(knowledge_graph_bp)
+    # A snapshot whose index is not built yet: the layout has to build it
+    snapshot = _static_graph.snapshot()
+    _static_graph._snapshot = GraphSnapshot(snapshot.graph, snapshot.version, snapshot.source)
+
+    responses = []
+    worker = threading.Thread(target=lambda: responses.append(app.test_client().get('/api/knowledge-graph/layout')), daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+    assert responses, "layout request did not finish"
+    assert responses[0].status_code == 200
+    assert responses[0].get_json()['ids']
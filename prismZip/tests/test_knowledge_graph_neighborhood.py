@@ -0,0 +1,60 @@
+from flask import Flask
+from knowledge_graph_neighborhood import AdjacencyIndex
+from knowledge_graph_routes import knowledge_graph_bp
+
+GRAPH = {
+    '@graph': [
+        {'id': 'field-a', 'type': 'Field', 'children': [
+            {'id': 'sub-1', 'type': 'Subfield', 'children': [
+                {'id': 'p-1', 'type': 'Person'}, {'id': 'p-2', 'type': 'Person'}, {'id': 'p-3', 'type': 'Person'},
+            ]},
+            {'id': 'sub-2', 'type': 'Subfield', 'children': [{'id': 'p-1', 'type': 'Person'}]},
+        ]},
+        {'id': 'field-b', 'type': 'Field', 'children': [
+            {'id': 'sub-3', 'type': 'Subfield', 'children': []},
+            {'id': 'sub-4', 'type': 'Subfield', 'children': []},
+        ]},
+    ],
+    'relationships': [
+        {'source': 'sub-1', 'target': 'sub-3', 'type': 'RELATED_TO', 'weight': 0.2},
+        {'source': 'sub-4', 'target': 'sub-1', 'type': 'RELATED_TO', 'weight': 0.9},
+    ],
+}
+
+def ids(result):
+    return {node['id']: node['distance'] for node in result['nodes']}
+
+def test_neighbours_cover_children_parents_and_related():
+    adjacency = AdjacencyIndex(GRAPH)
+    assert [n[0] for n in adjacency.neighbours['sub-1']] == ['p-1', 'p-2', 'p-3', 'field-a', 'sub-4', 'sub-3']
+
+    result = adjacency.neighborhood('sub-1', depth=1)
+    assert ids(result) == {'sub-1': 0, 'p-1': 1, 'p-2': 1, 'p-3': 1, 'field-a': 1, 'sub-4': 1, 'sub-3': 1}
+    edges = {(e['source'], e['target'], e['relation']) for e in result['edges']}
+    assert ('field-a', 'sub-1', 'HAS_SUBFIELD') in edges
+    assert ('sub-4', 'sub-1', 'RELATED_TO') in edges
+    assert not result['truncated']
+    assert 'children' not in result['nodes'][0] and result['nodes'][0]['childCount'] == 3
+
+def test_fan_out_and_node_caps():
+    adjacency = AdjacencyIndex(GRAPH)
+    result = adjacency.neighborhood('sub-1', depth=1, limit=2)
+    assert ids(result) == {'sub-1': 0, 'p-1': 1, 'p-2': 1}
+    assert result['truncated']
+
+    result = adjacency.neighborhood('p-1', depth=3, limit=10, max_nodes=4)
+    assert len(result['nodes']) == 4 and result['truncated']
+
+def test_depth_two_reaches_the_shared_persons_other_subfield():
+    result = AdjacencyIndex(GRAPH).neighborhood('sub-2', depth=2)
+    assert ids(result)['sub-1'] == 2
+    assert ('sub-1', 'p-1', 'HAS_MEMBER') in {(e['source'], e['target'], e['relation']) for e in result['edges']}
+    assert AdjacencyIndex(GRAPH).neighborhood('missing') is None
+
+def test_neighborhood_endpoint():
+    app = Flask(__name__)
+    app.register_blueprint(knowledge_graph_bp)
+    client = app.test_client()
+    data = client.get('/api/knowledge-graph/neighborhood/field-cloud-computing?depth=1').get_json()
+    assert data['center'] == 'field-cloud-computing' and len(data['nodes']) > 1
+    assert client.get('/api/knowledge-graph/neighborhood/missing').status_code == 404
@@ -0,0 +1,93 @@
+import pytest
+from flask import Flask
+from knowledge_graph_index import GraphIndex
+from knowledge_graph_pagination import PersonPages, decode_cursor, encode_cursor, trim_people
+from knowledge_graph_routes import knowledge_graph_bp
+
+def person(number, citations, h_index):
+    return {'id': f'person-{number}', 'type': 'Person', 'label': f'P{number}', 'citations': citations, 'hIndex': h_index}
+
+PEOPLE = [person(1, 50, 3), person(2, 40, 9), person(3, 30, 1), person(4, 30, 5), person(5, 10, 7)]
+GRAPH = {'@graph': [
+    {'id': 'field-a', 'type': 'Field', 'children': [
+        {'id': 'sub-1', 'type': 'Subfield', 'children': PEOPLE},
+        {'id': 'sub-2', 'type': 'Subfield', 'children': [person(1, 50, 3)]},
+    ]},
+]}
+
+def all_pages(pages, order, limit):
+    ids, cursor = [], None
+    while True:
+        page = pages.page('sub-1', order=order, limit=limit, cursor=cursor)
+        ids += [p['id'] for p in page['people']]
+        cursor = page['nextCursor']
+        if cursor is None:
+            return ids
+
+def test_cursor_pages_cover_every_person_once():
+    pages = PersonPages(GraphIndex(GRAPH))
+    assert all_pages(pages, 'citations', 2) == ['person-1', 'person-2', 'person-3', 'person-4', 'person-5']
+    assert all_pages(pages, 'hIndex', 2) == ['person-2', 'person-5', 'person-4', 'person-1', 'person-3']
+    assert all_pages(pages, 'name', 3) == ['person-1', 'person-2', 'person-3', 'person-4', 'person-5']
+
+def test_cursor_keeps_its_place_after_changes():
+    pages = PersonPages(GraphIndex(GRAPH))
+    cursor = pages.page('sub-1', limit=2)['nextCursor']
+    # A new, highly cited person appears before the cursor and does not shift the next page
+    changed = {'@graph': [{'id': 'field-a', 'type': 'Field', 'children': [
+        {'id': 'sub-1', 'type': 'Subfield', 'children': PEOPLE + [person(6, 99, 1)]},
+    ]}]}
+    page = PersonPages(GraphIndex(changed)).page('sub-1', limit=2, cursor=cursor)
+    assert [p['id'] for p in page['people']] == ['person-3', 'person-4']
+
+def test_invalid_cursors_and_orders():
+    pages = PersonPages(GraphIndex(GRAPH))
+    with pytest.raises(ValueError):
+        pages.page('sub-1', cursor='not-a-cursor')
+    with pytest.raises(ValueError):
+        pages.page('sub-1', cursor=encode_cursor('citations', ('x', 'y', 'z')))
+    with pytest.raises(ValueError):
+        pages.page('sub-1', order='popularity')
+    assert decode_cursor(encode_cursor('name', ('p1', 'person-1'))) == ('name', ('p1', 'person-1'))
+    assert pages.page('missing') is None
+
+def test_trim_people_keeps_top_people_and_a_cursor():
+    pages = PersonPages(GraphIndex(GRAPH))
+    view = trim_people(GRAPH, pages, limit=2)
+    sub1, sub2 = view['@graph'][0]['children']
+    assert [p['id'] for p in sub1['children']] == ['person-1', 'person-2']
+    assert sub1['hasMore'] and sub1['childCount'] == 5
+    assert [p['id'] for p in pages.page('sub-1', limit=10, cursor=sub1['nextCursor'])['people']] == ['person-3', 'person-4', 'person-5']
+    # Small subfields are shared untouched, and the source graph is unchanged
+    assert sub2 is GRAPH['@graph'][0]['children'][1]
+    assert len(GRAPH['@graph'][0]['children'][0]['children']) == 5
+
+def test_people_endpoint_errors():
+    app = Flask(__name__)
+    app.register_blueprint(knowledge_graph_bp)
+    client = app.test_client()
+    assert client.get('/api/knowledge-graph/subfield/missing/people?source=static').status_code == 404
+    assert client.get('/api/knowledge-graph/subfield/subfield-saas/people?source=static&cursor=bad').status_code == 400
+    page = client.get('/api/knowledge-graph/subfield/subfield-saas/people?source=static').get_json()
+    assert page['people'] == [] and page['nextCursor'] is None
+
+def test_dynamic_graph_embeds_top_people(monkeypatch):
+    import professor_routes
+    rows = [{'id': i, 'name': f'Prof {i}', 'domain_expertise': 'Machine Learning', 'citations_count': i}
+            for i in range(30)]
+    monkeypatch.setattr(professor_routes, 'load_teachers_data', lambda: rows)
+    monkeypatch.setattr(professor_routes, 'get_cached_citations', lambda: None)
+    app = Flask(__name__)
+    app.register_blueprint(knowledge_graph_bp)
+    client = app.test_client()
+
+    graph = client.get('/api/knowledge-graph?source=dynamic').get_json()
+    subfield = graph['@graph'][0]['children'][0]
+    assert len(subfield['children']) == 20 and subfield['childCount'] == 30
+    rest = client.get(f"/api/knowledge-graph/subfield/{subfield['id']}/people?cursor={subfield['nextCursor']}").get_json()
+    assert len(rest['people']) == 10 and rest['nextCursor'] is None
+
+    full = client.get('/api/knowledge-graph?source=dynamic&people=all').get_json()
+    assert len(full['@graph'][0]['children'][0]['children']) == 30
+    compact = client.get('/api/knowledge-graph?source=dynamic&format=compact').get_json()
+    assert len(compact['people']) == 20
@@ -0,0 +1,65 @@
+from knowledge_graph_search import GraphSearchIndex
+from knowledge_graph_routes import load_knowledge_graph
+
+GRAPH = {
+    '@graph': [
+        {'id': 'field-ml', 'type': 'Field', 'label': 'Machine Learning', 'description': 'Learning from data', 'children': [
+            {'id': 'sub-dl', 'type': 'Subfield', 'label': 'Deep Learning', 'children': [
+                {'id': 'person-1', 'type': 'Person', 'label': 'Ada Learning'},
+            ]},
+            {'id': 'sub-ml-theory', 'type': 'Subfield', 'label': 'Machine Learning Theory'},
+            {'id': 'sub-vision', 'type': 'Subfield', 'label': 'Vision', 'description': 'Machine perception and learning'},
+        ]},
+        {'id': 'field-sys', 'type': 'Field', 'label': 'Systems', 'description': 'Relearning operating systems', 'children': [
+            {'id': 'person-1', 'type': 'Person', 'label': 'Ada Learning'},
+        ]},
+    ]
+}
+
+def brute_force(graph, query):
+    matches = set()
+    def walk(nodes):
+        for node in nodes:
+            if query in node.get('label', '').lower() or query in node.get('description', '').lower():
+                matches.add(node['id'])
+            walk(node.get('children', []))
+    walk(graph['@graph'])
+    return matches
+
+def test_ranking_tiers():
+    index = GraphSearchIndex(GRAPH)
+    result = index.search('Machine Learning')
+    assert [(r['id'], r['matchType']) for r in result['results']] == [
+        ('field-ml', 'exact'),
+        ('sub-ml-theory', 'prefix'),
+        ('sub-vision', 'token'),
+    ]
+    assert result['results'][2]['parentId'] == 'field-ml'
+
+def test_substring_matches_are_a_superset_of_a_tree_walk():
+    index = GraphSearchIndex(GRAPH)
+    for query in ('learning', 'earn', 'ys', 'a', 'perception and', 'zzz'):
+        found = {r['id'] for r in index.search(query, limit=None)['results']}
+        assert brute_force(GRAPH, query) <= found, query
+    # A person listed under two subfields is returned once
+    assert [r['id'] for r in index.search('ada')['results']] == ['person-1']
+
+def test_type_filter_and_facets():
+    index = GraphSearchIndex(GRAPH)
+    result = index.search('learning', node_type='Subfield')
+    assert {r['type'] for r in result['results']} == {'Subfield'}
+    assert result['facets'] == {'Field': 2, 'Subfield': 3, 'Person': 1}
+    assert result['total'] == 3
+
+def test_static_graph_search_finds_saas():
+    index = GraphSearchIndex(load_knowledge_graph())
+    assert index.search('saas')['results'][0]['label'].lower() == 'saas'
+
+def test_short_queries_use_gram_postings():
+    index = GraphSearchIndex({'@graph': [
+        {'id': 'a', 'type': 'Field', 'label': 'Learning'},
+        {'id': 'b', 'type': 'Field', 'label': 'Vision', 'description': 'Image AR'},
+    ]})
+    assert {r['id'] for r in index.search('ar')['results']} == {'a', 'b'}
+    assert [r['id'] for r in index.search('v')['results']] == ['b']
+    assert index.search('zq')['total'] == 0
@@ -0,0 +1,74 @@
+from flask import Flask
+from knowledge_graph_stats import graph_statistics
+from knowledge_graph_routes import knowledge_graph_bp
+
+GRAPH = {
+    '@graph': [
+        {'id': 'field-a', 'type': 'Field', 'label': 'A', 'children': [
+            {'id': 'sub-1', 'type': 'Subfield', 'label': 'One', 'children': [
+                {'id': 'p-1', 'type': 'Person', 'citations': 100},
+                {'id': 'p-2', 'type': 'Person', 'citations': 10},
+            ]},
+            {'id': 'sub-2', 'type': 'Subfield', 'label': 'Two', 'children': [
+                {'id': 'p-1', 'type': 'Person', 'citations': 100},
+            ]},
+        ]},
+        {'id': 'field-b', 'type': 'Field', 'label': 'B', 'children': [
+            {'id': 'sub-3', 'type': 'Subfield', 'label': 'Three', 'children': [
+                {'id': 'p-1', 'type': 'Person', 'citations': 100},
+            ]},
+        ]},
+    ],
+    'relationships': [{'source': 'sub-1', 'target': 'sub-2'}],
+}
+
+def test_counts_and_depth_histogram():
+    stats = graph_statistics(GRAPH)
+    assert stats['typeCounts'] == {'Field': 2, 'Subfield': 3, 'Person': 2}
+    assert stats['depthHistogram'] == [2, 3, 2]
+    assert stats['totalFields'] == 2 and stats['totalPeople'] == 2
+    assert stats['maxDepth'] == 3 and stats['totalRelationships'] == 1
+
+def test_people_counted_once_per_field():
+    fields = {field['id']: field for field in graph_statistics(GRAPH)['fields']}
+    assert fields['field-a']['professorCount'] == 2
+    assert fields['field-a']['totalCitations'] == 110
+    assert fields['field-a']['citationPercentiles']['p50'] == 55.0
+    assert fields['field-b']['totalCitations'] == 100
+    assert fields['field-a']['subfieldCount'] == 2
+
+def test_largest_subfields():
+    largest = graph_statistics(GRAPH, largest=2)['largestSubfields']
+    assert [(s['id'], s['fieldId'], s['childCount']) for s in largest] == [('sub-1', 'field-a', 2), ('sub-3', 'field-b', 1)]
+
+def test_empty_field_has_no_percentiles():
+    stats = graph_statistics({'@graph': [{'id': 'f', 'type': 'Field', 'children': []}]})
+    assert stats['fields'][0]['citationPercentiles']['p90'] is None
+
+def test_graph_response_carries_stats_and_etag():
+    app = Flask(__name__)
+    app.register_blueprint(knowledge_graph_bp)
+    client = app.test_client()
+
+    response = client.get('/api/knowledge-graph')
+    assert response.status_code == 200
+    assert response.get_json()['metadata']['stats']['totalFields'] > 0
+    etag = response.headers['ETag']
+
+    cached = client.get('/api/knowledge-graph', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    other = client.get('/api/knowledge-graph?expand=none', headers={'If-None-Match': etag})
+    assert other.status_code == 200
+
+def test_static_graph_survives_failing_professor_load(monkeypatch):
+    import knowledge_graph_routes
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(knowledge_graph_routes, 'get_dynamic_graph', fail)
+    app = Flask(__name__)
+    app.register_blueprint(knowledge_graph_bp)
+    response = app.test_client().get('/api/knowledge-graph?include_professors=true')
+    assert response.status_code == 200
+    assert 'professors' not in response.get_json()
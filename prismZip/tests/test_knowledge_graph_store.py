@@ -0,0 +1,56 @@
+import json
+import os
+import pytest
+from knowledge_graph_store import GraphFileLoader, freeze, thaw
+from knowledge_graph_routes import graph_view
+
+def write_graph(path, label, mtime):
+    path.write_text(json.dumps({'@graph': [{'id': 'field-a', 'type': 'Field', 'label': label, 'children': [{'id': 'sub-1'}]}]}))
+    os.utime(path, (mtime, mtime))
+
+def test_frozen_graph_is_read_only():
+    graph = freeze({'@graph': [{'id': 'a', 'children': [{'id': 'b'}]}]})
+    with pytest.raises(TypeError):
+        graph['@graph'][0]['label'] = 'changed'
+    with pytest.raises(TypeError):
+        graph.update({})
+    node = graph['@graph'][0]
+    with pytest.raises(TypeError):
+        node |= {'label': 'changed'}
+    assert 'label' not in graph['@graph'][0]
+    with pytest.raises(TypeError):
+        graph['@graph'][0] | {'label': 'changed'}
+    assert json.loads(json.dumps(graph)) == {'@graph': [{'id': 'a', 'children': [{'id': 'b'}]}]}
+
+    copy = thaw(graph)
+    copy['@graph'][0]['label'] = 'changed'
+    assert 'label' not in graph['@graph'][0]
+
+    collapsed = graph_view(graph, expand='none')
+    assert collapsed['@graph'][0]['childCount'] == 1 and 'children' in graph['@graph'][0]
+
+def test_loader_reloads_only_when_file_changes(tmp_path):
+    path = tmp_path / 'graph.json'
+    write_graph(path, 'First', 1000)
+    loader = GraphFileLoader(str(path), lambda: {'@graph': []}, poll_interval=0)
+
+    first = loader.snapshot()
+    assert first.graph['@graph'][0]['label'] == 'First'
+    assert loader.snapshot() is first
+    index = first.index
+    assert first.index is index
+
+    write_graph(path, 'Second', 2000)
+    second = loader.snapshot()
+    assert second is not first and second.version == first.version + 1
+    assert second.graph['@graph'][0]['label'] == 'Second'
+    # The old snapshot is unaffected for requests still holding it
+    assert first.graph['@graph'][0]['label'] == 'First'
+
+    path.write_text('{not json')
+    os.utime(path, (3000, 3000))
+    assert loader.snapshot() is second
+
+def test_loader_falls_back_when_file_is_missing(tmp_path):
+    loader = GraphFileLoader(str(tmp_path / 'missing.json'), lambda: {'@graph': [{'id': 'default'}]}, poll_interval=0)
+    assert loader.snapshot().graph['@graph'][0]['id'] == 'default'
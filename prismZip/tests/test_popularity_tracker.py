@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from popularity_tracker import CountMinSketch, DecayedHeavyHitters, PopularityTracker, normalize_query, sketch_indexes
+
+NOW = 1_000_000.0
+
+def test_normalize_query():
+    assert normalize_query('  Machine   LEARNING?! ') == 'machine learning'
+    assert normalize_query(None) == ''
+    assert len(normalize_query('x' * 500)) == 100
+
+def test_sketch_never_undercounts():
+    sketch = CountMinSketch(width=64, depth=4)
+    truth = {f'key-{i}': i % 7 + 1 for i in range(300)}
+    for key, count in truth.items():
+        sketch.add(sketch_indexes(key, 4, 64), count)
+    assert all(sketch.estimate(sketch_indexes(key, 4, 64)) >= count for key, count in truth.items())
+
+def test_heavy_hitters_find_hot_keys_in_bounded_memory():
+    counter = DecayedHeavyHitters(half_life=3600, width=256, capacity=10, landmark=NOW)
+    rng = np.random.default_rng(3)
+    hot = ['alpha', 'beta', 'gamma']
+    for step in range(5000):
+        key = hot[step % 3] if step % 2 else f'rare-{rng.integers(0, 10_000)}'
+        counter.add(key, sketch_indexes(key, 4, 256), NOW + step * 0.01)
+    assert len(counter.candidates) <= 10
+    assert {key for key, _ in counter.top(NOW + 50, 3)} == set(hot)
+
+def test_counts_decay_with_the_half_life():
+    counter = DecayedHeavyHitters(half_life=100, landmark=NOW)
+    for _ in range(8):
+        counter.add('old', sketch_indexes('old', 4, 2048), NOW)
+    for _ in range(3):
+        counter.add('new', sketch_indexes('new', 4, 2048), NOW + 300)
+    top = dict(counter.top(NOW + 300, 2))
+    assert top['old'] == pytest.approx(1.0) and top['new'] == pytest.approx(3.0)
+    # Far later events move the landmark without changing decayed counts
+    counter.add('new', sketch_indexes('new', 4, 2048), NOW + 100 * 70)
+    assert dict(counter.top(NOW + 100 * 70, 2))['new'] == pytest.approx(1.0 + 3.0 * 2 ** -67)
+
+def test_trending_merges_workers_through_the_shared_directory(tmp_path):
+    first = PopularityTracker(windows={'day': 86400}, shared_dir=str(tmp_path))
+    second = PopularityTracker(windows={'day': 86400}, shared_dir=str(tmp_path))
+    second.worker = 'other-worker'
+    now = first.counters[('query', 'day')].landmark
+    for _ in range(3):
+        first.record('query', 'Computer Vision', now)
+    for _ in range(4):
+        second.record('query', 'computer vision ', now)
+        second.record('query', 'robotics', now)
+    second.flush()
+
+    trending = dict(first.trending('query', 'day', 5, now))
+    assert trending['computer vision'] == pytest.approx(7.0)
+    assert trending['robotics'] == pytest.approx(4.0)
+    with pytest.raises(ValueError):
+        first.trending('query', 'year')
+
+def test_trending_endpoint(monkeypatch):
+    import professor_routes
+    from flask import Flask
+    rows = [{'id': 7, 'name': 'Ada', 'college': 'North', 'domain_expertise': 'Robotics'}]
+    monkeypatch.setattr(professor_routes, 'load_teachers_data', lambda: rows)
+    monkeypatch.setattr(professor_routes, 'get_cached_citations', lambda: None)
+    monkeypatch.setattr(professor_routes, '_popularity_tracker', PopularityTracker())
+    app = Flask(__name__)
+    app.register_blueprint(professor_routes.professor_bp)
+    client = app.test_client()
+
+    professor_routes.record_popularity('professor', 7)
+    client.get('/api/professors/query?q=robotics')
+    data = client.get('/api/analytics/trending?window=hour').get_json()
+    assert data['professors'][0]['id'] == '7' and data['professors'][0]['name'] == 'Ada'
+    assert data['queries'] == [{'query': 'robotics', 'score': 1.0}]
+    assert client.get('/api/analytics/trending?window=year').status_code == 400
@@ -0,0 +1,100 @@
+import numpy as np
+from professor_analytics import college_heatmap, heatmap_view, metric_distributions
+from professor_index import ProfessorIndex
+
+PROFESSORS = [
+    {'id': 1, 'college': 'North', 'domain_expertise': 'Machine Learning, Deep Learning', 'citations_count': 100},
+    {'id': 2, 'college': 'North', 'domain_expertise': 'Computer Vision', 'citations_count': 50},
+    {'id': 3, 'college': 'south ', 'domain_expertise': 'Machine Learning', 'citations_count': 10},
+    {'id': 4, 'college': 'South', 'domain_expertise': 'Databases', 'citations_count': 5},
+    {'id': 5, 'domain_expertise': 'Machine Learning', 'citations_count': 1000},
+]
+
+def cell(view, row, column, matrix='professors'):
+    return view[matrix][view['rows'].index(row)][view['columns'].index(column)]
+
+def test_subfield_heatmap_counts_and_sums_citations():
+    view = heatmap_view(college_heatmap(ProfessorIndex(PROFESSORS), 'subfield'))
+    assert view['rows'] == ['North', 'south']
+    assert view['columns'][0] == 'Machine Learning'
+    assert cell(view, 'North', 'Machine Learning') == 1 and cell(view, 'south', 'Machine Learning') == 1
+    assert cell(view, 'North', 'Machine Learning', 'citations') == 100
+    assert cell(view, 'south', 'Computer Vision') == 0
+    # Professors without a college are left out
+    assert view['column_totals'][0] == 2 and view['row_totals'] == [2, 2]
+
+def test_field_heatmap_counts_each_professor_once_per_field():
+    index = ProfessorIndex(PROFESSORS)
+    view = heatmap_view(college_heatmap(index, 'field'))
+    # Professor 1 has two subfields in one field and counts once
+    assert cell(view, 'North', 'Artificial Intelligence') == 2
+    assert cell(view, 'North', 'Artificial Intelligence', 'citations') == 150
+    assert cell(view, 'south', 'Database Systems', 'citations') == 5
+    assert college_heatmap(index, 'field') is college_heatmap(index, 'field')
+
+def test_heatmap_view_limits_columns():
+    view = heatmap_view(college_heatmap(ProfessorIndex(PROFESSORS), 'subfield'), limit=1, min_professors=1)
+    assert view['columns'] == ['Machine Learning'] and view['total_columns'] == 4
+    assert len(view['professors'][0]) == 1
+
+def test_heatmap_endpoint(monkeypatch):
+    import professor_routes
+    from flask import Flask
+    monkeypatch.setattr(professor_routes, 'load_teachers_data', lambda: PROFESSORS)
+    monkeypatch.setattr(professor_routes, 'get_cached_citations', lambda: None)
+    app = Flask(__name__)
+    app.register_blueprint(professor_routes.professor_bp)
+    client = app.test_client()
+    data = client.get('/api/analytics/heatmap?columns=subfield').get_json()
+    assert data['column_facet'] == 'subfield' and len(data['rows']) == 2
+    assert data['data_version'] == professor_routes.get_professor_index().version
+    assert client.get('/api/analytics/heatmap?columns=room').status_code == 400
+
+def test_distributions_match_numpy_percentiles():
+    rng = np.random.default_rng(7)
+    professors = [
+        {'id': i, 'college': f'C{i % 3}', 'domain_expertise': ['Machine Learning', 'Databases'][i % 2],
+         'citations_count': int(rng.integers(0, 5000)) if i % 5 else 0, 'h_index': int(rng.integers(0, 40))}
+        for i in range(200)
+    ]
+    index = ProfessorIndex(professors)
+    result = metric_distributions(index, 'college')['citations']
+    values = index.columns['citations']
+
+    overall = result['overall']
+    assert overall['count'] == 200 and overall['with_data'] == int((values > 0).sum())
+    assert sum(overall['histogram']) == 200 and overall['histogram'][0] == 200 - overall['with_data']
+    assert overall['p90'] == round(float(np.percentile(values[values > 0], 90)), 2)
+
+    groups = result['groups']
+    c1 = groups['labels'].index('C1')
+    sample = values[[i for i in range(200) if i % 3 == 1]]
+    assert groups['count'][c1] == len(sample)
+    assert groups['p50'][c1] == round(float(np.percentile(sample[sample > 0], 50)), 2)
+    assert groups['mean'][c1] == round(float(sample[sample > 0].mean()), 2)
+    with_zero = metric_distributions(index, 'college', include_zero=True)['citations']['groups']
+    assert with_zero['p99'][c1] == round(float(np.percentile(sample, 99)), 2)
+
+def test_distributions_by_field_and_without_data():
+    index = ProfessorIndex(PROFESSORS)
+    result = metric_distributions(index, 'field')
+    fields = result['citations']['groups']
+    ai = fields['labels'].index('Artificial Intelligence')
+    assert fields['count'][ai] == 4 and fields['p50'][ai] == 75.0
+    # Nobody has an h-index
+    assert result['h_index']['overall']['p50'] is None and result['h_index']['overall']['with_data'] == 0
+    assert metric_distributions(index)['citations']['groups'] is None
+
+def test_distributions_endpoint(monkeypatch):
+    import professor_routes
+    from flask import Flask
+    monkeypatch.setattr(professor_routes, 'load_teachers_data', lambda: PROFESSORS)
+    monkeypatch.setattr(professor_routes, 'get_cached_citations', lambda: None)
+    app = Flask(__name__)
+    app.register_blueprint(professor_routes.professor_bp)
+    client = app.test_client()
+    data = client.get('/api/analytics/distributions?group=field&metrics=citations').get_json()
+    assert list(data['metrics']) == ['citations'] and data['metrics']['citations']['groups']['labels']
+    assert data['include_zero'] is False and 'data_version' in data
+    assert client.get('/api/analytics/distributions?metrics=stars').status_code == 400
+    assert client.get('/api/analytics/distributions?group=planet').status_code == 400
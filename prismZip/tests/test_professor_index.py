@@ -0,0 +1,106 @@
+import pytest
+from professor_index import ProfessorIndex, split_domains, iter_bits, popcount
+
+@pytest.fixture
+def sample_professors():
+    """Small professor snapshot shaped like database.load_professors_data()"""
+    return [
+        {'id': 1, 'name': 'Dr. Smith', 'college': 'X College',
+         'expertise_array': ['Machine Learning', 'Computer Vision'],
+         'citations_count': 5000, 'h_index': 30, 'i10_index': 40, 'has_google_scholar': True},
+        {'id': 2, 'name': 'Dr. Jones', 'college': 'Y College',
+         'expertise_array': ['Natural Language Processing', 'Machine Learning'],
+         'citations_count': 10000, 'h_index': 45, 'i10_index': 80, 'has_google_scholar': True},
+        {'id': 3, 'name': 'Dr. Wilson', 'college': 'X College',
+         'domain_expertise': 'Computer Vision, Blockchain',
+         'citations_count': 2000, 'h_index': 20, 'i10_index': 15, 'has_google_scholar': False},
+        {'id': 4, 'name': 'Dr. Brown', 'college': 'Z College',
+         'expertise_array': ['Blockchain'],
+         'has_google_scholar': False},
+    ]
+
+def test_split_domains_accepts_both_separators():
+    assert split_domains({'domain_expertise': 'AI | Machine Learning'}) == ['AI', 'Machine Learning']
+    assert split_domains({'domain_expertise': 'AI, ai,  Data   Mining '}) == ['AI', 'Data Mining']
+    assert split_domains({}) == []
+
+def test_bit_helpers():
+    assert list(iter_bits(0b10110)) == [1, 2, 4]
+    assert popcount(0b10110) == 3
+
+def test_facet_bitmaps(sample_professors):
+    index = ProfessorIndex(sample_professors)
+
+    assert list(iter_bits(index.facet_bitmap('college', 'x college'))) == [0, 2]
+    assert list(iter_bits(index.facet_bitmap('domain', 'MACHINE LEARNING'))) == [0, 1]
+    assert index.facet_bitmap('domain', 'Unknown') == 0
+
+def test_faceted_search_intersects_filters(sample_professors):
+    index = ProfessorIndex(sample_professors)
+
+    result = index.faceted_search({'college': ['X College'], 'domain': ['Computer Vision']})
+    assert result['total_count'] == 2
+    assert [p['name'] for p in result['professors']] == ['Dr. Smith', 'Dr. Wilson']
+
+    result = index.faceted_search({'college': ['X College', 'Z College'], 'domain': ['Blockchain']})
+    assert [p['name'] for p in result['professors']] == ['Dr. Wilson', 'Dr. Brown']
+
+def test_facet_counts_ignore_own_filter(sample_professors):
+    index = ProfessorIndex(sample_professors)
+
+    result = index.faceted_search({'college': ['X College']})
+    colleges = {c['name']: c['count'] for c in result['facets']['college']}
+    domains = {d['name']: d['count'] for d in result['facets']['domain']}
+
+    # College counts are not restricted by the college filter itself
+    assert colleges == {'X College': 2, 'Y College': 1, 'Z College': 1}
+    # Domain counts only consider professors from X College
+    assert domains == {'Computer Vision': 2, 'Machine Learning': 1, 'Blockchain': 1}
+
+def test_faceted_search_pagination(sample_professors):
+    index = ProfessorIndex(sample_professors)
+
+    result = index.faceted_search({}, offset=1, limit=2)
+    assert result['total_count'] == 4
+    assert [p['id'] for p in result['professors']] == [2, 3]
+
+def test_match_bitmap_uses_whole_words(sample_professors):
+    index = ProfessorIndex(sample_professors)
+
+    assert list(iter_bits(index.match_bitmap('domain', 'vision'))) == [0, 2]
+    assert index.match_bitmap('domain', 'chain') == 0
+    assert list(iter_bits(index.threshold_bitmap('citations', '>=', 5000))) == [0, 1]
+
+def test_metric_columns(sample_professors):
+    index = ProfessorIndex(sample_professors)
+
+    assert index.columns['citations'].tolist() == [5000, 10000, 2000, 0]
+    assert index.columns['has_gs'].tolist() == [True, True, False, False]
+    assert list(iter_bits(index.flag_bitmap('has_gs'))) == [0, 1]
+
+def test_top_k(sample_professors):
+    index = ProfessorIndex(sample_professors)
+
+    assert index.top_k('citations').tolist() == [1, 0, 2, 3]
+    assert index.top_k('citations', k=2).tolist() == [1, 0]
+    assert index.top_k('h_index', k=2, descending=False).tolist() == [3, 2]
+
+    mask = index.threshold_mask('h_index', '>=', 20) & ~index.columns['has_gs']
+    assert index.top_k('citations', mask, k=5).tolist() == [2]
+
+def test_scores_ignore_metrics_without_data(sample_professors):
+    for professor in sample_professors:
+        professor.pop('i10_index', None)
+    index = ProfessorIndex(sample_professors)
+
+    # Dr. Jones leads citations and h-index, so no missing i10 column caps the score at 0.8
+    assert index.scores[1] == 1.0
+    assert index.scores[3] == 0.0
+
+def test_field_facet_groups_domains_by_research_field(sample_professors):
+    index = ProfessorIndex(sample_professors)
+
+    result = index.faceted_search({'field': ['Cybersecurity']})
+    assert sorted(p['name'] for p in result['professors']) == ['Dr. Brown', 'Dr. Wilson']
+    fields = {f['name']: f['count'] for f in result['facets']['field']}
+    assert fields['Artificial Intelligence'] == 3
@@ -0,0 +1,56 @@
+import pytest
+import professor_routes
+
+ROWS = [
+    {'id': 1, 'name': 'A', 'college': 'X', 'domain_expertise': 'Machine Learning'},
+    {'id': 2, 'name': 'B', 'college': 'Y', 'domain_expertise': 'Computer Vision'},
+]
+
+@pytest.fixture
+def rows(monkeypatch):
+    current = {'rows': [dict(row) for row in ROWS]}
+    monkeypatch.setattr(professor_routes, 'load_teachers_data', lambda: current['rows'])
+    monkeypatch.setattr(professor_routes, 'get_cached_citations', lambda: None)
+    monkeypatch.setattr(professor_routes, '_professor_index', None)
+    monkeypatch.setattr(professor_routes, '_professor_index_key', None)
+    return current
+
+def test_reloading_identical_rows_keeps_the_index(rows):
+    index = professor_routes.get_professor_index()
+    # A periodic reload returns a new list with the same content
+    rows['rows'] = [dict(row) for row in ROWS]
+    assert professor_routes.get_professor_index() is index
+
+def test_changed_rows_rebuild_the_index(rows):
+    index = professor_routes.get_professor_index()
+    rows['rows'] = [dict(row) for row in ROWS] + [{'id': 3, 'name': 'C', 'domain_expertise': 'NLP'}]
+    rebuilt = professor_routes.get_professor_index()
+    assert rebuilt is not index
+    assert rebuilt.version == index.version + 1
+    assert rebuilt.size == 3
+
+def test_domain_experts_without_citation_data_keeps_matches(rows):
+    from flask import Flask
+    app = Flask(__name__)
+    app.register_blueprint(professor_routes.professor_bp)
+
+    data = app.test_client().get('/api/professors/domain-experts?domain=Machine Learning').get_json()
+    assert data['metrics_available'] is False
+    assert data['total_experts'] == 1
+    assert data['experts'][0]['expertise_level'] == 'Basic'
+    assert data['statistics']['expertise_distribution'] == {'Basic': 1}
+
+def test_communities_endpoint_does_not_persist(rows, monkeypatch):
+    import research_communities
+    from flask import Flask
+
+    def fail(*args, **kwargs):
+        raise AssertionError("GET /api/communities must not write files")
+
+    monkeypatch.setattr(research_communities, 'save_communities', fail)
+    monkeypatch.setattr(research_communities, 'load_communities', lambda *args, **kwargs: None)
+    monkeypatch.setattr(professor_routes, '_communities_state', {'index': None, 'result': None})
+    app = Flask(__name__)
+    app.register_blueprint(professor_routes.professor_bp)
+
+    assert app.test_client().get('/api/communities').status_code == 200
@@ -0,0 +1,50 @@
+from research_communities import build_adjacency, detect_communities
+
+def professors():
+    return [
+        {'id': 1, 'name': 'Ann Lee', 'expertise_array': ['Computer Vision', 'Image Processing']},
+        {'id': 2, 'name': 'Bob Ray', 'expertise_array': ['Computer Vision', 'Image Processing']},
+        {'id': 3, 'name': 'Cid Roy', 'expertise_array': ['Image Processing']},
+        {'id': 4, 'name': 'Dee Kay', 'expertise_array': ['Blockchain', 'Cryptography']},
+        {'id': 5, 'name': 'Eve Moe', 'expertise_array': ['Blockchain', 'Cryptography']},
+        {'id': 6, 'name': 'Fay Orr', 'expertise_array': ['Cryptography']},
+        {'id': 7, 'name': 'Gus Poe', 'expertise_array': []},
+    ]
+
+def test_adjacency_is_symmetric():
+    indptr, neighbors, weights = build_adjacency(professors())
+    edges = {}
+    for node in range(len(indptr) - 1):
+        for other, weight in zip(neighbors[indptr[node]:indptr[node + 1]], weights[indptr[node]:indptr[node + 1]]):
+            edges[(node, int(other))] = weight
+    assert all(edges[(b, a)] == w for (a, b), w in edges.items())
+    # Sharing two domains weighs more than sharing one
+    assert edges[(0, 1)] > edges[(0, 2)]
+    assert indptr[7] == indptr[6]
+
+def test_coauthor_edges():
+    data = professors()
+    data[6]['academic_data'] = {'recent_publications': [{'authors': 'G Poe, A Lee'}]}
+    indptr, neighbors, _ = build_adjacency(data)
+    assert neighbors[indptr[6]:indptr[7]].tolist() == [0]
+
+def test_detect_communities():
+    result = detect_communities(professors())
+    assignments = result['assignments']
+
+    assert assignments['1'] == assignments['2'] == assignments['3']
+    assert assignments['4'] == assignments['5'] == assignments['6']
+    assert assignments['1'] != assignments['4']
+    assert sorted(c['size'] for c in result['communities']) == [3, 3]
+
+def test_incremental_update_only_relabels_affected_region():
+    previous = detect_communities(professors())
+
+    data = professors()
+    data.append({'id': 8, 'name': 'Hal Ng', 'expertise_array': ['Cryptography']})
+    result = detect_communities(data, previous)
+
+    assert result['incremental']
+    assert result['assignments']['8'] == result['assignments']['4']
+    assert result['assignments']['1'] == previous['assignments']['1']
+    assert result['relabelled'] < len(data)
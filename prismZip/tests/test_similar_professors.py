@@ -0,0 +1,40 @@
+import numpy as np
+from similar_professors import build_feature_matrix, compute_neighbors, build_similarity_lists
+
+PROFESSORS = [
+    {'id': 1, 'expertise_array': ['Machine Learning', 'Computer Vision'], 'phd_thesis': 'Deep networks for image segmentation'},
+    {'id': 2, 'expertise_array': ['Computer Vision'], 'phd_thesis': 'Image segmentation with graph cuts'},
+    {'id': 3, 'expertise_array': ['Blockchain'], 'phd_thesis': 'Consensus protocols for distributed ledgers'},
+    {'id': 4, 'expertise_array': ['Blockchain', 'Network Security'], 'phd_thesis': ''},
+    {'id': 5, 'expertise_array': [], 'phd_thesis': ''},
+]
+
+def dense(indptr, indices, data, feature_count):
+    matrix = np.zeros((len(indptr) - 1, feature_count))
+    for row in range(len(indptr) - 1):
+        matrix[row, indices[indptr[row]:indptr[row + 1]]] = data[indptr[row]:indptr[row + 1]]
+    return matrix
+
+def test_feature_rows_are_normalized():
+    indptr, indices, data, feature_count = build_feature_matrix(PROFESSORS)
+    norms = np.linalg.norm(dense(indptr, indices, data, feature_count), axis=1)
+    assert np.allclose(norms, [1, 1, 1, 1, 0])
+
+def test_blocked_neighbors_match_dense_product():
+    matrix = build_feature_matrix(PROFESSORS)
+    expected = dense(*matrix) @ dense(*matrix).T
+
+    for block_size in (1, 2, 64):
+        neighbors = compute_neighbors(*matrix, k=2, block_size=block_size)
+        for row, row_neighbors in enumerate(neighbors):
+            for other, score in row_neighbors:
+                assert other != row
+                assert np.isclose(score, expected[row, other], atol=1e-4)
+        assert [n[0][0] for n in neighbors[:4]] == [1, 0, 3, 2]
+        assert neighbors[4] == []
+
+def test_build_similarity_lists_keys_by_id():
+    result = build_similarity_lists(PROFESSORS, k=1)
+    assert result['neighbors']['1'][0]['id'] == '2'
+    assert result['neighbors']['5'] == []
+    assert result['signature'] == build_similarity_lists(PROFESSORS, k=1)['signature']
@@ -0,0 +1,49 @@
+from professor_index import ProfessorIndex
+from team_builder import build_teams, greedy_cover
+
+PROFESSORS = [
+    {'id': 1, 'name': 'A', 'college': 'X College', 'expertise_array': ['Machine Learning', 'Computer Vision', 'Robotics'], 'citations_count': 100, 'h_index': 5},
+    {'id': 2, 'name': 'B', 'college': 'X College', 'expertise_array': ['Machine Learning'], 'citations_count': 9000, 'h_index': 40},
+    {'id': 3, 'name': 'C', 'college': 'Y College', 'expertise_array': ['Blockchain', 'Network Security'], 'citations_count': 500, 'h_index': 10},
+    {'id': 4, 'name': 'D', 'college': 'Y College', 'expertise_array': ['Robotics', 'Blockchain'], 'citations_count': 50, 'h_index': 2},
+    {'id': 5, 'name': 'E', 'college': 'X College', 'expertise_array': ['Deep Learning'], 'citations_count': 10, 'h_index': 1},
+]
+
+def test_greedy_cover_prefers_cheapest_gain():
+    coverage = {0: 0b0111, 1: 0b0001, 2: 0b1000, 3: 0b1100}
+    costs = {0: 1.0, 1: 0.1, 2: 1.0, 3: 1.0}
+    assert greedy_cover(coverage, costs, 0b1111) == [1, 0, 3]
+    assert greedy_cover(coverage, costs, 0b1111, max_team_size=1) == [1]
+    assert greedy_cover(coverage, costs, 0b1111, excluded={0}) == [1, 3]
+
+def test_build_teams_covers_all_terms():
+    index = ProfessorIndex(PROFESSORS)
+    result = build_teams(index, ['machine learning', 'Robotics', 'blockchain', 'network security', 'quantum computing'])
+
+    assert result['uncoverable'] == ['quantum computing']
+    best = result['teams'][0]
+    assert best['uncovered'] == []
+    assert best['coverage'] == 0.8
+    assert {member['id'] for member in best['members']} == {1, 3}
+    assert len({frozenset(m['id'] for m in team['members']) for team in result['teams']}) == len(result['teams'])
+    assert len(result['teams']) > 1
+
+def test_term_containing_a_domain_is_covered():
+    index = ProfessorIndex(PROFESSORS)
+    result = build_teams(index, ['Deep Learning for medical imaging'])
+    assert [m['id'] for m in result['teams'][0]['members']] == [5]
+
+def test_build_teams_respects_constraints():
+    index = ProfessorIndex(PROFESSORS)
+    result = build_teams(index, ['machine learning', 'blockchain'], colleges=['X College'])
+    assert result['uncoverable'] == ['blockchain']
+    assert all(m['college'] == 'X College' for team in result['teams'] for m in team['members'])
+
+    result = build_teams(index, ['machine learning', 'blockchain', 'network security'], max_team_size=1)
+    assert all(team['size'] == 1 for team in result['teams'])
+
+def test_word_spans_are_whole_word_substrings():
+    from team_builder import word_spans
+    spans = word_spans('deep learning, c++')
+    assert {'deep', 'learning', 'deep learning', 'c', 'deep learning, c++'} <= set(spans)
+    assert 'eep' not in spans and 'learnin' not in spans